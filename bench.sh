@@ -0,0 +1,11 @@
+#!/usr/bin/env sh
+
+# Run all benchmarks for python modules
+for benchmark in bench/bench_*.py; do
+    echo "== $benchmark"
+    PYTHONPATH=src python3 "$benchmark"
+done
+
+# Run the pipeline benchmark suite and compare it with the stored baseline
+echo "== bench/suite.py"
+PYTHONPATH=src python3 bench/suite.py "$@"
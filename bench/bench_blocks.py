@@ -0,0 +1,50 @@
+#!/usr/bin/env python3
+'''Measures the per-block cost of block classification, compared with the former chain of uncompiled patterns'''
+
+import re
+import timeit
+
+from markdown_converter import classify_markdown_block
+
+BLOCKS = {
+    "paragraph": "Just a paragraph with **bold** text\nthat continues on a second line",
+    "heading": "### A third level heading",
+    "code": "```py\nprint('hello')\nprint('world')\n```",
+    "quote": "> To be or not to be\n> That is the question",
+    "horizontal rule": "- - -",
+    "unordered list": "- first\n- second\n- third\n- fourth",
+    "ordered list": "1. first\n2. second\n3. third\n4. fourth",
+}
+NUMBER = 100_000
+
+
+def chained_classify(markdown: str):
+    '''The former classification, including the second parse in markdown_block_to_html'''
+    if re.match(r"^#{1,6} .+$", markdown) is not None:
+        return re.findall(r"^(#{1,6}) (.+)$", markdown, )[0]
+    if re.match(r"^```\w*(?:\n.*)+\n```$", markdown):
+        return markdown.strip("`\n")
+    if re.match(r"^(?:>.*\n?)+$", markdown):
+        return " ".join([line.lstrip(">").strip() for line in markdown.split("\n")])
+    if re.match(r"^(?: *[*-] *){3,}$", markdown):
+        return None
+    if re.match(r"^(?:- .*\n?)+$", markdown):
+        return [line.lstrip("- ") for line in markdown.split("\n")]
+    for i, line in enumerate(markdown.split("\n")):
+        if line.split(".")[0] != f"{i + 1}":
+            return " ".join(markdown.split("\n"))
+    return [". ".join(line.split(". ")[1:]) for line in markdown.split("\n")]
+
+def ns_per_block(function, block: str) -> float:
+    return min(timeit.repeat(lambda: function(block), number=NUMBER, repeat=3)) / NUMBER * 1e9
+
+def main() -> None:
+    print(f"{'block type':>16} {'dispatch':>12} {'chained':>12} {'speedup':>8}")
+    for name, block in BLOCKS.items():
+        dispatch = ns_per_block(classify_markdown_block, block)
+        chained = ns_per_block(chained_classify, block)
+        print(f"{name:>16} {dispatch:>9.0f} ns {chained:>9.0f} ns {chained / dispatch:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,41 @@
+#!/usr/bin/env python3
+'''Measures the throughput of convert_many in documents per second, compared with one markdown_to_html_nodes call per document'''
+
+import os
+import timeit
+
+from corpus import CorpusGenerator
+from block_cache import BlockCache
+from markdown_converter import markdown_to_html_nodes, convert_many
+
+DOCUMENTS = 2000
+DOCUMENT_SIZE = 2000
+
+
+def documents_per_second(function, documents: list[str]) -> float:
+    return len(documents) / min(timeit.repeat(lambda: function(documents), number=1, repeat=3))
+
+def main() -> None:
+    generator = CorpusGenerator(seed=0)
+    # Submitted documents often share snippets, e.g. signatures or templates
+    shared = [generator.block() for _ in range(20)]
+    documents = [
+        "\n\n".join([generator.page(DOCUMENT_SIZE // 2), *generator.rng.sample(shared, 5)])
+        for _ in range(DOCUMENTS)
+    ]
+
+    results = {
+        "markdown_to_html_nodes": documents_per_second(lambda docs: [markdown_to_html_nodes(md).to_html() for md in docs], documents),
+        "convert_many, no cache": documents_per_second(lambda docs: convert_many(docs, cache=BlockCache(0)), documents),
+        "convert_many": documents_per_second(convert_many, documents),
+    }
+    jobs = os.cpu_count() or 1
+    if jobs > 1:
+        results[f"convert_many, {jobs} jobs"] = documents_per_second(lambda docs: convert_many(docs, jobs=jobs), documents)
+
+    for name, rate in results.items():
+        print(f"{name:>28} {rate:>10.0f} documents/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+'''
+Compares the single-pass inline tokenizer with the former chain of split passes on link-heavy paragraphs,
+and times paragraphs of brackets without urls, which must stay linear in their length
+'''
+
+import timeit
+
+from textnode import TextNode, TextType
+from text_converter import text_to_textnodes, split_nodes_image, split_nodes_link, split_nodes_delimiter
+
+LINK_COUNTS = [500, 1000, 2000, 4000, 8000]
+
+
+def chained_text_to_textnodes(text: str) -> list[TextNode]:
+    nodes = [TextNode(text.strip(), TextType.PLAIN)]
+    nodes = split_nodes_image(nodes)
+    nodes = split_nodes_link(nodes)
+    nodes = split_nodes_delimiter(nodes, "**", TextType.BOLD)
+    nodes = split_nodes_delimiter(nodes, "__", TextType.BOLD)
+    nodes = split_nodes_delimiter(nodes, "*", TextType.ITALIC)
+    nodes = split_nodes_delimiter(nodes, "_", TextType.ITALIC)
+    nodes = split_nodes_delimiter(nodes, "`", TextType.CODE)
+    return nodes
+
+def link_paragraph(links: int) -> str:
+    return " ".join(f"see **page** [number {i}](/pages/{i}) and _more_" for i in range(links))
+
+def bracket_paragraph(brackets: int, marker: str) -> str:
+    return f"{marker}[x] " * brackets
+
+def best_time(function, text: str) -> float:
+    return min(timeit.repeat(lambda: function(text), number=1, repeat=3))
+
+def main() -> None:
+    print(f"{'links':>8} {'single pass':>14} {'chained':>14} {'us/link':>9} {'speedup':>8}")
+    for links in LINK_COUNTS:
+        text = link_paragraph(links)
+        assert text_to_textnodes(text) == chained_text_to_textnodes(text)
+        single = best_time(text_to_textnodes, text)
+        chained = best_time(chained_text_to_textnodes, text)
+        print(f"{links:>8} {single * 1000:>11.2f} ms {chained * 1000:>11.2f} ms {single / links * 1e6:>9.2f} {chained / single:>7.1f}x")
+
+    print()
+    print(f"{'brackets':>8} {'[x]':>14} {'![x]':>14} {'us/[x]':>9}")
+    for brackets in LINK_COUNTS:
+        links = best_time(text_to_textnodes, bracket_paragraph(brackets, ""))
+        images = best_time(text_to_textnodes, bracket_paragraph(brackets, "!"))
+        print(f"{brackets:>8} {links * 1000:>11.2f} ms {images * 1000:>11.2f} ms {links / brackets * 1e6:>9.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+'''
+Measures the peak RSS of converting a synthetic markdown corpus into html node trees.
+Pass `--src` with the source directory of another revision to compare node models.
+'''
+
+import os
+import sys
+import json
+import argparse
+import resource
+import subprocess
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+SRC_DIR = os.path.join(os.path.dirname(BENCH_DIR), "src")
+
+
+def peak_rss_mb() -> float:
+    # ru_maxrss is reported in kilobytes on Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+def count_nodes(node) -> int:
+    return 1 + sum(count_nodes(child) for child in node.children or ())
+
+def measure(size_mb: int) -> dict:
+    '''Runs in a fresh process, so the peak RSS belongs to this corpus only'''
+    from corpus import markdown_corpus
+    from markdown_converter import markdown_to_html_nodes
+
+    pages = markdown_corpus(size_mb * 1_000_000)
+    corpus_rss = peak_rss_mb()
+    trees = [markdown_to_html_nodes(page) for page in pages]
+    return {
+        "pages": len(pages),
+        "nodes": sum(count_nodes(tree) for tree in trees),
+        "corpus_rss_mb": round(corpus_rss, 1),
+        "peak_rss_mb": round(peak_rss_mb(), 1),
+    }
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--size-mb", type=int, default=50, help="size of the markdown corpus (default: 50)")
+    parser.add_argument("--src", default=SRC_DIR, help="source directory to measure (default: this tree)")
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(measure(args.size_mb)))
+        return
+
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join([os.path.abspath(args.src), BENCH_DIR]))
+    output = subprocess.run(
+        [sys.executable, __file__, "--child", "--size-mb", str(args.size_mb)],
+        env=env, capture_output=True, text=True, check=True,
+    ).stdout
+    result = json.loads(output)
+    node_rss = result["peak_rss_mb"] - result["corpus_rss_mb"]
+    print(f"{args.size_mb} MB corpus, {result['pages']} pages, {result['nodes']} html nodes")
+    print(f"peak RSS {result['peak_rss_mb']:.1f} MB, {node_rss:.1f} MB above the corpus itself ({node_rss * 1024 * 1024 / result['nodes']:.0f} bytes/node)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+'''Measures the startup of a build on a tree with 100k entries: the os.scandir build plan against the former os.listdir recursion'''
+
+import os
+import timeit
+import tempfile
+
+from plan import BuildPlan
+
+SECTIONS = 100
+PAGES_PER_SECTION = 300
+STATIC_FILES = 10_000
+
+
+def listdir_walk(src_dir: str, dst_dir: str, suffix: str | None = None) -> list[tuple[str, str]]:
+    '''The former walk of copy_dir and generate_pages_recursive, with separate stat calls per entry'''
+    if not os.path.isdir(src_dir):
+        raise IsADirectoryError(f"no such directory: '{src_dir}'")
+    files = []
+    for name in os.listdir(src_dir):
+        src_path = os.path.join(src_dir, name)
+        dst_path = os.path.join(dst_dir, name)
+        if os.path.isdir(src_path):
+            # The former code created missing destination directories here
+            os.path.exists(dst_path)
+            files.extend(listdir_walk(src_path, dst_path, suffix))
+        if os.path.isfile(src_path) and (suffix is None or src_path.endswith(suffix)):
+            files.append((src_path, dst_path))
+    return files
+
+def write_tree(root: str) -> int:
+    '''Writes a content tree of one directory, page and attachment per page, plus static files, returns the number of entries'''
+    entries = 0
+    for section in range(SECTIONS):
+        for page in range(PAGES_PER_SECTION):
+            path = os.path.join(root, "content", f"section{section}", f"page{page}")
+            os.makedirs(path)
+            for name in ("index.md", "notes.txt"):
+                open(os.path.join(path, name), 'w').close()
+            entries += 3
+    for i in range(STATIC_FILES):
+        path = os.path.join(root, "static", f"dir{i % 100}")
+        os.makedirs(path, exist_ok=True)
+        open(os.path.join(path, f"image{i}.png"), 'w').close()
+        entries += 1
+    return entries + SECTIONS + 100
+
+def main() -> None:
+    with tempfile.TemporaryDirectory() as root:
+        entries = write_tree(root)
+        content_dir, static_dir, dest_dir = (os.path.join(root, name) for name in ("content", "static", "docs"))
+
+        former = lambda: (listdir_walk(static_dir, dest_dir), listdir_walk(content_dir, dest_dir, ".md"))
+        planned = lambda: BuildPlan(content_dir, static_dir, dest_dir)
+        print(f"{entries} entries, {len(planned().pages)} pages")
+        for name, function in (("listdir recursion", former), ("scandir build plan", planned)):
+            seconds = min(timeit.repeat(function, number=1, repeat=3))
+            print(f"{name:>20} {seconds * 1000:>10.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+'''Compares rendering html trees with cached tags and escaping against the former per-node formatting, without and with an html.escape pass'''
+
+import html
+import timeit
+
+from htmlnode import HTMLNode, LeafNode, ParentNode
+
+PARAGRAPHS = [100, 1000, 10000]
+
+
+class FormerLeafNode(LeafNode):
+    '''The former rendering, formatting every tag and attribute per node, optionally with an escaping pass'''
+    __slots__ = ()
+    escape = None
+
+    def props_to_html(self) -> str:
+        attributes = ""
+        if self.props is not None:
+            for key, value in self.props.items():
+                attributes += f' {key}="{value if self.escape is None else self.escape(value)}"'
+        return attributes
+
+    def write_html(self, write) -> None:
+        value = self.value if self.escape is None else self.escape(self.value)
+        if self.tag is None:
+            write(value)
+        else:
+            write(f"<{self.tag}{self.props_to_html()}>{value}</{self.tag}>")
+
+class FormerParentNode(ParentNode):
+    __slots__ = ()
+    props_to_html = FormerLeafNode.props_to_html
+    escape = None
+
+    def write_html(self, write) -> None:
+        write(f'<{self.tag}{self.props_to_html()}>')
+        for child in self.children:
+            child.write_html(write)
+        write(f'</{self.tag}>')
+
+class EscapingLeafNode(FormerLeafNode):
+    __slots__ = ()
+    escape = staticmethod(html.escape)
+
+class EscapingParentNode(FormerParentNode):
+    __slots__ = ()
+    escape = staticmethod(html.escape)
+
+
+def document(paragraphs: int, leaf=LeafNode, parent=ParentNode) -> ParentNode:
+    children = []
+    for i in range(paragraphs):
+        children.append(parent("p", [
+            leaf(None, "Some text with "),
+            leaf("b", "bold"),
+            leaf(None, " words, "),
+            leaf("a", "a link", {"href": f"/pages/{i}"}),
+            leaf(None, " and "),
+            leaf("code", "a < b"),
+        ]))
+        children.append(parent("p", [leaf("img", "", {"src": f"/images/{i}.png", "alt": "Image"})]))
+    return parent("div", children)
+
+def count_nodes(node: HTMLNode) -> int:
+    return 1 + sum(count_nodes(child) for child in node.children or ())
+
+def best_time(function, node: HTMLNode) -> float:
+    return min(timeit.repeat(lambda: function(node), number=1, repeat=5))
+
+def main() -> None:
+    print(f"{'nodes':>8} {'cached':>12} {'former':>12} {'+ escape':>12} {'nodes/s':>12} {'vs former':>10} {'vs escape':>10}")
+    for paragraphs in PARAGRAPHS:
+        node = document(paragraphs)
+        nodes = count_nodes(node)
+        cached = best_time(HTMLNode.to_html, node)
+        former = best_time(HTMLNode.to_html, document(paragraphs, FormerLeafNode, FormerParentNode))
+        escaping = best_time(HTMLNode.to_html, document(paragraphs, EscapingLeafNode, EscapingParentNode))
+        print(f"{nodes:>8} {cached * 1000:>9.2f} ms {former * 1000:>9.2f} ms {escaping * 1000:>9.2f} ms {nodes / cached:>12,.0f} {former / cached:>9.2f}x {escaping / cached:>9.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+'''
+Measures how watch mode finds one changed page in a tree of 30k pages: a scan of every input,
+which the former watcher ran every 50 ms, against reading the inotify events and scanning only the reported paths
+'''
+
+import os
+import time
+import timeit
+import tempfile
+
+from inotify import Inotify
+from watcher import SiteWatcher
+
+SECTIONS = 100
+PAGES_PER_SECTION = 300
+STATIC_FILES = 2_000
+CHANGES = 20
+
+
+def write_tree(root: str) -> None:
+    for section in range(SECTIONS):
+        path = os.path.join(root, "content", f"section{section}")
+        os.makedirs(path)
+        for page in range(PAGES_PER_SECTION):
+            with open(os.path.join(path, f"page{page}.md"), 'w') as file:
+                file.write(f"# Page {page}\n")
+    for i in range(STATIC_FILES):
+        path = os.path.join(root, "static", f"dir{i % 20}")
+        os.makedirs(path, exist_ok=True)
+        open(os.path.join(path, f"image{i}.png"), 'w').close()
+    with open(os.path.join(root, "template.html"), 'w') as file:
+        file.write("<title>{{ Title }}</title>{{ Content }}")
+
+def touch_page(root: str, i: int) -> None:
+    with open(os.path.join(root, "content", f"section{i % SECTIONS}", "page0.md"), 'a') as file:
+        file.write("\nChanged.\n")
+
+def main() -> None:
+    with tempfile.TemporaryDirectory() as root:
+        write_tree(root)
+        site_watcher = SiteWatcher(*(os.path.join(root, name) for name in ("content", "static", "template.html", "docs")), "/")
+        print(f"{SECTIONS * PAGES_PER_SECTION} pages, {STATIC_FILES} static files")
+
+        seconds = min(timeit.repeat(site_watcher.poll, number=1, repeat=5))
+        print(f"{'scan of every input':>24} {seconds * 1000:>10.1f} ms per poll, {seconds / (seconds + 0.05) * 100:.0f}% of a core with the former 50 ms sleep")
+
+        with Inotify() as inotify:
+            start = time.perf_counter()
+            for path, recursive in site_watcher.watch_dirs():
+                inotify.watch(path, recursive)
+            print(f"{'inotify watch setup':>24} {(time.perf_counter() - start) * 1000:>10.1f} ms, {len(inotify.directories)} directories")
+
+            total = 0.0
+            for i in range(CHANGES):
+                touch_page(root, i)
+                start = time.perf_counter()
+                paths = inotify.read(1)
+                changes = site_watcher.poll_paths(paths)
+                total += time.perf_counter() - start
+                assert len(changes[site_watcher.content_dir][0]) == 1
+            print(f"{'inotify change':>24} {total / CHANGES * 1000:>10.3f} ms per change, nothing while idle")
+
+
+if __name__ == "__main__":
+    main()
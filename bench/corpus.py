@@ -0,0 +1,131 @@
+'''Deterministic generator for synthetic markdown corpora'''
+
+import os
+import random
+
+WORDS = (
+    "the ring of power was forged in the fires of mount doom by sauron lord of mordor "
+    "while elves dwarves and men fought in the last alliance against the dark tower"
+).split()
+
+# Relative weights of the generated block types
+DEFAULT_MIX = {
+    "paragraph": 60,
+    "heading": 10,
+    "unordered_list": 10,
+    "ordered_list": 10,
+    "quote": 5,
+    "code": 5,
+}
+TEMPLATE = '''<!doctype html>
+<html>
+  <head>
+    <title>{{ Title }}</title>
+    <link href="/index.css" rel="stylesheet" />
+  </head>
+  <body>
+    <article>{{ Content }}</article>
+  </body>
+</html>'''
+
+
+def parse_mix(text: str) -> dict[str, int]:
+    '''Parses a block mix like "paragraph=6,code=1"'''
+    mix = {}
+    for item in text.split(","):
+        name, weight = item.split("=")
+        if name not in DEFAULT_MIX:
+            raise ValueError(f"unknown block type '{name}'")
+        mix[name] = int(weight)
+    return mix
+
+
+class CorpusGenerator():
+    '''
+    Generates markdown pages with a configurable mix of block types and density of links.
+    The same seed always produces the same corpus.
+    '''
+    def __init__(self, seed: int = 0, mix: dict[str, int] | None = None, link_density: float = 0.1):
+        self.rng = random.Random(seed)
+        self.mix = mix if mix is not None else DEFAULT_MIX
+        self.link_density = link_density
+
+    def sentence(self, words: int) -> str:
+        return " ".join(self.rng.choice(WORDS) for _ in range(words))
+
+    def inline_text(self, words: int) -> str:
+        '''Returns a line of text mixing plain words with bold, italic, code and links'''
+        parts = []
+        while words > 0:
+            length = self.rng.randint(1, 6)
+            text = self.sentence(length)
+            kind = self.rng.random()
+            if kind < self.link_density:
+                text = f"[{text}](/pages/{self.rng.randint(0, 9999)})"
+            elif kind < self.link_density + 0.1:
+                text = f"**{text}**"
+            elif kind < self.link_density + 0.2:
+                text = f"_{text}_"
+            elif kind < self.link_density + 0.25:
+                text = f"`{text}`"
+            parts.append(text)
+            words -= length
+        return " ".join(parts)
+
+    def block(self) -> str:
+        kind = self.rng.choices(list(self.mix), weights=list(self.mix.values()))[0]
+        match kind:
+            case "heading":
+                return f"{'#' * self.rng.randint(2, 4)} {self.sentence(5)}"
+            case "unordered_list":
+                return "\n".join(f"- {self.inline_text(8)}" for _ in range(self.rng.randint(2, 8)))
+            case "ordered_list":
+                return "\n".join(f"{i + 1}. {self.inline_text(8)}" for i in range(self.rng.randint(2, 8)))
+            case "quote":
+                return "\n".join(f"> {self.inline_text(10)}" for _ in range(self.rng.randint(1, 4)))
+            case "code":
+                return "```\n" + "\n".join(self.sentence(6) for _ in range(self.rng.randint(2, 10))) + "\n```"
+            case _:
+                return "\n".join(self.inline_text(15) for _ in range(self.rng.randint(1, 6)))
+
+    def page(self, size: int) -> str:
+        '''Returns a page with a title and random blocks of roughly `size` characters'''
+        blocks = [f"# {self.sentence(4)}"]
+        length = len(blocks[0])
+        while length < size:
+            blocks.append(self.block())
+            length += len(blocks[-1]) + 2
+        return "\n\n".join(blocks)
+
+    def pages(self, count: int, size: int) -> list[str]:
+        return [self.page(size) for _ in range(count)]
+
+
+def markdown_corpus(total_size: int, page_size: int = 100_000, seed: int = 0) -> list[str]:
+    generator = CorpusGenerator(seed)
+    pages = []
+    while total_size > 0:
+        pages.append(generator.page(min(page_size, total_size)))
+        total_size -= len(pages[-1])
+    return pages
+
+def page_path(index: int, nesting: int, fanout: int = 10) -> str:
+    '''Spreads pages over `nesting` levels of directories with `fanout` entries each'''
+    parts = []
+    for _ in range(nesting):
+        parts.append(f"section{index % fanout}")
+        index //= fanout
+    return os.path.join(*parts, f"page{index}", "index.md") if parts else os.path.join(f"page{index}", "index.md")
+
+def write_site(root: str, pages: list[str], nesting: int = 1) -> None:
+    '''Writes a site in the layout main.py expects: content/, static/ and template.html'''
+    for i, page in enumerate(pages):
+        path = os.path.join(root, "content", page_path(i, nesting))
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'w') as file:
+            file.write(page)
+    os.makedirs(os.path.join(root, "static"), exist_ok=True)
+    with open(os.path.join(root, "static", "index.css"), 'w') as file:
+        file.write("body { margin: 0 }\n")
+    with open(os.path.join(root, "template.html"), 'w') as file:
+        file.write(TEMPLATE)
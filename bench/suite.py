@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+'''
+Benchmarks the conversion pipeline on a synthetic corpus and compares the results with a stored baseline.
+Runs offline, the corpus is generated from a fixed seed.
+'''
+
+import io
+import os
+import sys
+import json
+import timeit
+import argparse
+import platform
+import tempfile
+import contextlib
+
+from corpus import CorpusGenerator, DEFAULT_MIX, parse_mix, write_site
+from markdown_converter import markdown_to_blocks, classify_markdown_block, markdown_to_html_nodes, BlockType
+from text_converter import text_to_textnodes
+
+import main as site_main
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_BASELINE = os.path.join(BENCH_DIR, "baseline.json")
+INLINE_BLOCK_TYPES = (BlockType.PARAGRAPH, BlockType.HEADING, BlockType.QUOTE)
+
+
+def best_of(function, repeat: int) -> float:
+    return min(timeit.repeat(function, number=1, repeat=repeat))
+
+def inline_texts(pages: list[str]) -> list[str]:
+    '''Returns the text of every block that goes through inline parsing'''
+    texts = []
+    for page in pages:
+        for block in markdown_to_blocks(page):
+            block_type, data = classify_markdown_block(block)
+            if block_type in INLINE_BLOCK_TYPES:
+                texts.append(data[1] if block_type == BlockType.HEADING else data)
+            elif isinstance(data, list):
+                texts.extend(data)
+    return texts
+
+def build_site(root: str, jobs: int) -> None:
+    '''Runs a full build of main.py inside `root`'''
+    cwd, argv = os.getcwd(), sys.argv
+    try:
+        os.chdir(root)
+        sys.argv = ["main.py", "--jobs", str(jobs)]
+        with contextlib.redirect_stdout(io.StringIO()):
+            if site_main.main() != 0:
+                raise RuntimeError("site build failed")
+    finally:
+        os.chdir(cwd)
+        sys.argv = argv
+
+def run(args: argparse.Namespace) -> dict:
+    generator = CorpusGenerator(args.seed, args.mix, args.link_density)
+    pages = generator.pages(args.pages, args.page_size)
+    texts = inline_texts(pages)
+    trees = [markdown_to_html_nodes(page) for page in pages]
+    corpus_bytes = sum(len(page.encode()) for page in pages)
+
+    timings = {
+        "markdown_to_html_nodes": best_of(lambda: [markdown_to_html_nodes(page) for page in pages], args.repeat),
+        "text_to_textnodes": best_of(lambda: [text_to_textnodes(text) for text in texts], args.repeat),
+        "to_html": best_of(lambda: [tree.to_html() for tree in trees], args.repeat),
+    }
+    with tempfile.TemporaryDirectory() as root:
+        write_site(root, pages, args.nesting)
+        timings["main_build"] = best_of(lambda: build_site(root, args.jobs), args.repeat)
+
+    return {
+        "environment": {"python": platform.python_version(), "machine": platform.machine(), "cpus": os.cpu_count()},
+        "corpus": {
+            "pages": args.pages, "page_size": args.page_size, "bytes": corpus_bytes, "mix": args.mix,
+            "link_density": args.link_density, "nesting": args.nesting, "seed": args.seed, "inline_texts": len(texts),
+        },
+        "results": {
+            name: {"seconds": seconds, "mb_per_second": corpus_bytes / seconds / 1e6}
+            for name, seconds in timings.items()
+        },
+    }
+
+def find_regressions(results: dict, baseline: dict, threshold: float) -> list[str]:
+    '''
+    Returns a message for every benchmark that got slower than the baseline by more than `threshold`.
+    Raises ValueError naming the differences if the baseline was recorded for a different corpus.
+    '''
+    corpus, baseline_corpus = results["corpus"], baseline.get("corpus") or {}
+    if corpus != baseline_corpus:
+        differences = ", ".join(
+            f"{key} {baseline_corpus.get(key)!r} in the baseline, {corpus.get(key)!r} now"
+            for key in sorted(set(corpus) | set(baseline_corpus)) if corpus.get(key) != baseline_corpus.get(key)
+        )
+        raise ValueError(f"baseline was recorded for a different corpus: {differences}")
+    regressions = []
+    for name, result in results["results"].items():
+        if name not in baseline["results"]:
+            continue
+        ratio = result["seconds"] / baseline["results"][name]["seconds"]
+        if ratio > 1 + threshold:
+            regressions.append(f"{name}: {ratio:.2f}x the baseline time")
+    return regressions
+
+def parse_args(argv: list[str]) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--pages", type=int, default=200, help="number of pages (default: 200)")
+    parser.add_argument("--page-size", type=int, default=20_000, help="approximate characters per page (default: 20000)")
+    parser.add_argument("--mix", type=parse_mix, default=DEFAULT_MIX, help="block type weights, e.g. 'paragraph=6,code=1,heading=1'")
+    parser.add_argument("--link-density", type=float, default=0.1, help="share of inline fragments that are links (default: 0.1)")
+    parser.add_argument("--nesting", type=int, default=2, help="directory levels of the content tree (default: 2)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--repeat", type=int, default=3, help="runs per benchmark, the fastest counts (default: 3)")
+    parser.add_argument("--jobs", type=int, default=1, help="worker processes of the full build (default: 1)")
+    parser.add_argument("--output", help="write the results as json")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE, help="baseline to compare against (default: bench/baseline.json)")
+    parser.add_argument("--save-baseline", action="store_true", help="store the results as the new baseline")
+    parser.add_argument("--threshold", type=float, default=0.2, help="allowed slowdown against the baseline (default: 0.2)")
+    return parser.parse_args(argv)
+
+def main() -> int:
+    args = parse_args(sys.argv[1:])
+    results = run(args)
+    for name, result in results["results"].items():
+        print(f"{name:>24} {result['seconds'] * 1000:>10.1f} ms {result['mb_per_second']:>8.2f} MB/s")
+
+    if args.output is not None:
+        with open(args.output, 'w') as file:
+            json.dump(results, file, indent=1)
+    if args.save_baseline:
+        with open(args.baseline, 'w') as file:
+            json.dump(results, file, indent=1)
+        print(f"Saved baseline to '{args.baseline}'")
+        return 0
+    if not os.path.exists(args.baseline):
+        print(f"No baseline at '{args.baseline}', run with --save-baseline to record one")
+        return 0
+
+    with open(args.baseline, 'r') as file:
+        baseline = json.load(file)
+    try:
+        regressions = find_regressions(results, baseline, args.threshold)
+    except ValueError as error:
+        print(f"Cannot compare with '{args.baseline}': {error}")
+        print("Run with the options of the baseline, or with --save-baseline to record a new one")
+        return 2
+    for regression in regressions:
+        print(f"Regression in {regression}")
+    return 1 if len(regressions) > 0 else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
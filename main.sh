@@ -1,12 +1,10 @@
 #!/usr/bin/env sh
 
-# Run static site generater script
-python3 "./src/main.py"
+# Run static site generater script, then serve the generated html files
+# and rebuild changed pages until interrupted
+python3 "./src/main.py" --watch --port 8888
 
-# Run webserver to display the generated html files
-if [ $? -eq 0 ];
+if [ $? -ne 0 ];
 then
-    cd docs && python3 -m http.server 8888
-else
     echo "Page generation failed"
-fi
\ No newline at end of file
+fi
@@ -0,0 +1,89 @@
+import os
+import shutil
+
+from typing import Iterable
+
+
+def scan_files(path: str) -> dict[str, tuple[int, int]]:
+    '''Returns (mtime, size) of every file below `path`, or of `path` itself if it is a file'''
+    if os.path.isfile(path):
+        stat = os.stat(path)
+        return {path: (stat.st_mtime_ns, stat.st_size)}
+
+    files = {}
+    directories = [path]
+    while len(directories) > 0:
+        try:
+            entries = os.scandir(directories.pop())
+        except FileNotFoundError:
+            continue
+        with entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    directories.append(entry.path)
+                elif entry.is_file():
+                    stat = entry.stat()
+                    files[entry.path] = (stat.st_mtime_ns, stat.st_size)
+    return files
+
+def is_up_to_date(dst_path: str, mtime: int, size: int) -> bool:
+    try:
+        stat = os.stat(dst_path)
+    except FileNotFoundError:
+        return False
+    return stat.st_mtime_ns == mtime and stat.st_size == size
+
+def sync_file(src_path: str, dst_path: str, hardlink: bool = False) -> None:
+    '''
+    Links or copies a file and keeps its mtime, so later syncs can skip it.
+    shutil.copyfile already uses os.sendfile where the platform supports it.
+    '''
+    os.makedirs(os.path.dirname(dst_path), exist_ok=True)
+    if hardlink:
+        if os.path.lexists(dst_path):
+            os.remove(dst_path)
+        try:
+            os.link(src_path, dst_path)
+            return
+        except OSError:
+            # e.g. source and destination on different file systems
+            pass
+    shutil.copyfile(src_path, dst_path)
+    stat = os.stat(src_path)
+    os.utime(dst_path, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+
+def sync_dir(src_dir: str, dst_dir: str, previous_files: Iterable[str] = (), hardlink: bool = False, scanned_files: dict[str, tuple[int, int]] | None = None, dst_paths: dict[str, str] | None = None) -> tuple[list[str], int, int]:
+    '''
+    Copies new and changed files (by size and mtime) and removes the files of `previous_files`
+    that are gone from the source directory. Returns the synced relative paths and the copied and removed counts.
+    `scanned_files` are the results of an earlier `scan_files(src_dir)`, which spares walking the directory again.
+    Files of `dst_paths` are synced to the relative path they are mapped to as well, e.g. a fingerprinted name,
+    so urls the build does not rewrite, like `url(...)` in css or links from other sites, keep working.
+    '''
+    if scanned_files is None:
+        # Check if source directory exists
+        if not os.path.isdir(src_dir):
+            raise IsADirectoryError(f"no such directory: '{src_dir}'")
+        scanned_files = scan_files(src_dir)
+
+    files = []
+    copied = 0
+    for src_path, (mtime, size) in sorted(scanned_files.items()):
+        relative_paths = [os.path.relpath(src_path, src_dir)]
+        if dst_paths is not None and relative_paths[0] in dst_paths:
+            relative_paths.append(dst_paths[relative_paths[0]])
+        for relative_path in relative_paths:
+            files.append(relative_path)
+            dst_path = os.path.join(dst_dir, relative_path)
+            if not is_up_to_date(dst_path, mtime, size):
+                sync_file(src_path, dst_path, hardlink)
+                copied += 1
+
+    removed = 0
+    for relative_path in sorted(set(previous_files).difference(files)):
+        dst_path = os.path.join(dst_dir, relative_path)
+        if os.path.isfile(dst_path):
+            os.remove(dst_path)
+            removed += 1
+
+    return files, copied, removed
@@ -0,0 +1,39 @@
+from collections import OrderedDict
+
+
+class BlockCache():
+    '''
+    Least recently used cache of rendered html keyed by the markdown text of a block and the base path of its urls,
+    with the plain text of the block once it was needed for a site index.
+    Repeated blocks, e.g. footers, disclaimers or navigation lists, are parsed only once per process.
+    '''
+    def __init__(self, size: int, max_block_length: int = 1 << 16):
+        self.size = size
+        # Huge blocks are rarely repeated and would crowd out everything else
+        self.max_block_length = max_block_length
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def __repr__(self) -> str:
+        return f"BlockCache({len(self.entries)}/{self.size}, hits: {self.hits}, misses: {self.misses})"
+
+    def get(self, block: str, base_path: str = "/") -> tuple[str, str | None] | None:
+        '''Returns the html and the plain text of a block, the text is None if it was not stored'''
+        key = (base_path, block)
+        entry = self.entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self.entries.move_to_end(key)
+        return entry
+
+    def put(self, block: str, html: str, base_path: str = "/", text: str | None = None) -> None:
+        if self.size <= 0 or len(block) > self.max_block_length:
+            return
+        key = (base_path, block)
+        self.entries[key] = (html, text)
+        self.entries.move_to_end(key)
+        if len(self.entries) > self.size:
+            self.entries.popitem(last=False)
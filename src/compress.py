@@ -0,0 +1,110 @@
+import os
+import gzip
+
+from concurrent.futures import ProcessPoolExecutor
+from assets import scan_files
+from output import temp_path
+
+try:
+    import brotli
+except ImportError:
+    # Optional, only needed for `br` siblings
+    brotli = None
+
+# Suffixes of precompressed siblings by method
+SUFFIXES = {"gzip": ".gz", "br": ".br"}
+# Highest levels by default, files are compressed once and served many times
+DEFAULT_LEVELS = {"gzip": 9, "br": 11}
+# Text formats worth compressing, images like png are compressed already
+COMPRESSIBLE_SUFFIXES = frozenset((".html", ".css", ".js", ".mjs", ".json", ".xml", ".svg", ".txt", ".md", ".map"))
+
+
+def compress(data: bytes, method: str, level: int) -> bytes:
+    if method == "gzip":
+        # A fixed timestamp keeps the output reproducible
+        return gzip.compress(data, level, mtime=0)
+    return brotli.compress(data, quality=level)
+
+def compress_file(path: str, mtime: int, methods: dict[str, int]) -> int:
+    '''
+    Writes the compressed siblings of a file atomically, with methods mapped to levels.
+    Siblings get the mtime of the file, so later builds see which files changed since. Returns the number of siblings written.
+    '''
+    with open(path, 'rb') as file:
+        data = file.read()
+    for method, level in methods.items():
+        sibling_path = path + SUFFIXES[method]
+        tmp_path = temp_path(sibling_path)
+        try:
+            with open(tmp_path, 'wb') as file:
+                file.write(compress(data, method, level))
+            os.utime(tmp_path, ns=(mtime, mtime))
+            os.replace(tmp_path, sibling_path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+    return len(methods)
+
+def compress_file_in_worker(arguments: tuple[str, int, dict[str, int]]) -> int:
+    return compress_file(*arguments)
+
+def is_compressible(path: str) -> bool:
+    return os.path.splitext(path)[1] in COMPRESSIBLE_SUFFIXES
+
+def is_sibling(path: str) -> bool:
+    # e.g. `index.css.gz`, but not a `release.tar.gz` static file
+    base_path, suffix = os.path.splitext(path)
+    return suffix in SUFFIXES.values() and is_compressible(base_path)
+
+def plan_compression(files: dict[str, tuple[int, int]], methods: dict[str, int], static_paths: set[str] = frozenset(), previous_methods: dict[str, int] | None = None) -> tuple[list[tuple[str, int, dict[str, int]]], list[str]]:
+    '''
+    Returns the files whose siblings are missing or do not match their mtime, with the methods to write,
+    and the siblings whose file is gone. Files in `static_paths` were copied from the static directory,
+    e.g. a `data.json.gz` of its own, and are neither removed nor overwritten.
+    `previous_methods` are the methods and levels the existing siblings were written with, if they are known:
+    siblings of a method with another level are written again, and those of a method no longer used are removed.
+    '''
+    static_paths = {os.path.normpath(path) for path in static_paths}
+    changed_methods = set() if previous_methods is None else {method for method, level in methods.items() if previous_methods.get(method) != level}
+    dropped_suffixes = set() if previous_methods is None else {SUFFIXES[method] for method in previous_methods if method not in methods}
+    stale = []
+    orphans = []
+    for path, (mtime, _) in files.items():
+        if is_sibling(path) and os.path.normpath(path) not in static_paths:
+            if os.path.splitext(path)[0] not in files or os.path.splitext(path)[1] in dropped_suffixes:
+                orphans.append(path)
+            continue
+        if not is_compressible(path):
+            continue
+        stale_methods = {}
+        for method, level in methods.items():
+            sibling_path = path + SUFFIXES[method]
+            if os.path.normpath(sibling_path) in static_paths:
+                continue
+            sibling = files.get(sibling_path)
+            if sibling is None or sibling[0] != mtime or method in changed_methods:
+                stale_methods[method] = level
+        if len(stale_methods) > 0:
+            stale.append((path, mtime, stale_methods))
+    return stale, orphans
+
+def compress_dir(path: str, methods: dict[str, int], jobs: int = 1, static_paths: set[str] = frozenset(), previous_methods: dict[str, int] | None = None) -> tuple[int, int]:
+    '''
+    Brings the precompressed siblings below `path` up to date in a pool of `jobs` processes:
+    only files written since their siblings, or since the level of a method changed, are compressed,
+    and siblings of removed files are removed. Static files in `static_paths` are left alone.
+    Returns the numbers of written and removed siblings.
+    '''
+    stale, orphans = plan_compression(scan_files(path), methods, static_paths, previous_methods)
+    for sibling_path in orphans:
+        os.remove(sibling_path)
+    if jobs <= 1 or len(stale) <= 1:
+        return sum(map(compress_file_in_worker, stale)), len(orphans)
+    with ProcessPoolExecutor(max_workers=jobs) as executor:
+        chunksize = max(1, len(stale) // (jobs * 4))
+        return sum(executor.map(compress_file_in_worker, stale, chunksize=chunksize)), len(orphans)
+
+def compressed_outputs(outputs: set[str], methods: dict[str, int]) -> set[str]:
+    '''Returns the siblings the outputs of a build have, so pruning the output directory keeps them'''
+    return {path + SUFFIXES[method] for path in outputs if is_compressible(path) for method in methods}
@@ -0,0 +1,90 @@
+import os
+import re
+
+# Absolute links to other pages, images are static files and not pages
+PAGE_LINK_PATTERN = re.compile(r"(?<!!)\[[^\]]*\]\((/[^)\s#?]*)")
+# Absolute urls of images and links to files with a suffix, which may be fingerprinted static files
+ASSET_URL_PATTERN = re.compile(r"!?\[[^\]]*\]\((/[^)\s#?]*\.\w+)[)\s#?]")
+
+
+def scan_links(path: str) -> list[str]:
+    '''Returns the normalized targets of all absolute links in a markdown file'''
+    return scan_page(path)[0]
+
+def scan_page(path: str) -> tuple[list[str], list[str]]:
+    '''Returns the normalized targets of all absolute links and the urls of all static files a markdown file refers to'''
+    with open(path, 'r') as file:
+        markdown = file.read()
+    links = sorted({normalize_url(url) for url in PAGE_LINK_PATTERN.findall(markdown)})
+    return links, sorted({url for url in ASSET_URL_PATTERN.findall(markdown) if not url.endswith(".html")})
+
+def normalize_url(url: str) -> str:
+    url = url.removesuffix("index.html")
+    return url.rstrip("/") if url != "/" else url
+
+
+class DependencyGraph():
+    '''
+    Inputs every generated page depends on: the template it is rendered with, the urls of the pages it links to
+    and the urls of the static files it refers to, whose fingerprinted names end up in its html.
+    Link targets are stored as urls, so links to pages that do not exist yet are recorded as well.
+    '''
+    def __init__(self, content_dir: str, dependencies: dict[str, dict] | None = None):
+        self.content_dir = content_dir
+        self.dependencies = {}
+        self.dependents_of = {}
+        for page, inputs in (dependencies or {}).items():
+            self.add_page(page, inputs["template"], inputs["links"], inputs.get("assets"))
+
+    def __repr__(self) -> str:
+        return f"DependencyGraph({self.content_dir}, pages: {len(self.dependencies)})"
+
+    def page_url(self, src_path: str) -> str:
+        '''Returns the url a page is served at, e.g. `/blog/tom` for `content/blog/tom/index.md`'''
+        path = os.path.relpath(os.path.normpath(src_path), os.path.normpath(self.content_dir)).replace(os.sep, "/")
+        if os.path.basename(path) == "index.md":
+            return normalize_url("/" + path.removesuffix("index.md"))
+        return "/" + path.removesuffix(".md") + ".html"
+
+    def add_page(self, src_path: str, template_path: str, links: list[str], assets: list[str] | None = None) -> None:
+        '''Records the inputs of a page, `assets` is None for pages recorded before static files were tracked'''
+        page = os.path.normpath(src_path)
+        self.dependencies[page] = {"template": os.path.normpath(template_path), "links": links}
+        if assets is not None:
+            self.dependencies[page]["assets"] = assets
+        for name in (self.dependencies[page]["template"], *links, *(assets or ())):
+            self.dependents_of.setdefault(name, set()).add(page)
+
+    def links(self, src_path: str) -> list[str] | None:
+        inputs = self.dependencies.get(os.path.normpath(src_path))
+        return inputs["links"] if inputs is not None else None
+
+    def assets(self, src_path: str) -> list[str] | None:
+        inputs = self.dependencies.get(os.path.normpath(src_path))
+        return inputs.get("assets") if inputs is not None else None
+
+    def dependents(self, path: str) -> list[str]:
+        '''Returns the pages depending on a template, linking to a page or referring to the url of a static file'''
+        path = os.path.normpath(path)
+        pages = set(self.dependents_of.get(path, ()))
+        if path.endswith(".md"):
+            pages.update(self.dependents_of.get(self.page_url(path), ()))
+        return sorted(pages)
+
+    def linking_pages(self, src_path: str) -> list[str]:
+        '''Returns the pages linking to a page'''
+        return sorted(self.dependents_of.get(self.page_url(src_path), ()))
+
+    def what_rebuilds(self, path: str, change: str = "edited") -> list[str]:
+        '''
+        Returns the pages an incremental build regenerates if `path` is `edited`, `added` or `removed`.
+        A page is regenerated alone, or not at all if it was removed: links are rendered from their url,
+        so the html of pages linking to it is the same whether the target exists or not.
+        '''
+        path = os.path.normpath(path)
+        if not path.endswith(".md"):
+            return self.dependents(path)
+        return [path] if change != "removed" else []
+
+    def to_dict(self) -> dict[str, dict]:
+        return dict(sorted(self.dependencies.items()))
@@ -0,0 +1,43 @@
+import os
+
+from manifest import hash_file
+
+# Hex digits of the content hash in a fingerprinted name, e.g. `index.3f2a9c1d.css`
+FINGERPRINT_LENGTH = 8
+# Assets referenced from pages, files like `favicon.ico` or `robots.txt` are requested under fixed names
+FINGERPRINTED_SUFFIXES = frozenset((
+    ".css", ".js", ".mjs", ".png", ".jpg", ".jpeg", ".gif", ".webp", ".avif", ".svg", ".woff", ".woff2", ".ttf",
+))
+
+
+def fingerprinted_path(path: str, source_hash: str) -> str:
+    '''Returns the path with the start of the content hash before its suffix'''
+    root, suffix = os.path.splitext(path)
+    return f"{root}.{source_hash[:FINGERPRINT_LENGTH]}{suffix}"
+
+def fingerprint_assets(static_files: dict[str, tuple[int, int]], static_dir: str, previous: dict[str, dict] | None = None) -> dict[str, dict]:
+    '''
+    Returns the content hash of every fingerprinted static file by its relative path.
+    Files with the (mtime, size) recorded in `previous` keep their hash without being read.
+    '''
+    previous = previous or {}
+    fingerprints = {}
+    for src_path, (mtime, size) in sorted(static_files.items()):
+        relative_path = os.path.relpath(src_path, static_dir)
+        if os.path.splitext(relative_path)[1] not in FINGERPRINTED_SUFFIXES:
+            continue
+        old_entry = previous.get(relative_path)
+        if old_entry is not None and [old_entry.get("mtime"), old_entry.get("size")] == [mtime, size]:
+            source_hash = old_entry["hash"]
+        else:
+            source_hash = hash_file(src_path)
+        fingerprints[relative_path] = {"hash": source_hash, "mtime": mtime, "size": size}
+    return fingerprints
+
+def asset_paths(fingerprints: dict[str, dict]) -> dict[str, str]:
+    '''Returns the fingerprinted relative path of every asset by its relative path'''
+    return {path: fingerprinted_path(path, entry["hash"]) for path, entry in fingerprints.items()}
+
+def asset_urls(paths: dict[str, str]) -> dict[str, str]:
+    '''Returns the fingerprinted urls of assets by their plain urls, before the base path is applied'''
+    return {"/" + path.replace(os.sep, "/"): "/" + fingerprinted.replace(os.sep, "/") for path, fingerprinted in paths.items()}
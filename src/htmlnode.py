@@ -1,9 +1,41 @@
-import functools
+from typing import Callable, Sequence
+
+# Elements without content or closing tag
+VOID_TAGS = frozenset(("area", "base", "br", "col", "embed", "hr", "img", "input", "link", "meta", "source", "track", "wbr"))
+
+
+def escape_text(text: str) -> str:
+    # Checking for a character is much cheaper than replacing, and most text needs no escaping
+    if "&" in text or "<" in text or ">" in text:
+        return text.replace("&", "&amp;").replace("<", "&lt;").replace(">", "&gt;")
+    return text
+
+def escape_attribute(value: str) -> str:
+    value = escape_text(value)
+    return value.replace('"', "&quot;") if '"' in value else value
+
+def attributes_to_html(props: dict) -> str:
+    return "".join([f' {key}="{escape_attribute(value)}"' for key, value in props.items()])
+
+
+def tag_strings(tag: str) -> tuple[str, str, str | None]:
+    '''
+    Returns the open tag, the open tag without `>` and the close tag, built on first use instead of formatted for every node.
+    Void elements have no close tag.
+    '''
+    strings = TAGS[tag] = (f"<{tag}>", f"<{tag}", None if tag in VOID_TAGS else f"</{tag}>")
+    return strings
+
+
+# A plain dict, lookups in a dict subclass with __missing__ are slower
+TAGS = {}
 
-from typing import Sequence
 
 class HTMLNode():
-    def __init__(self, tag: str | None = None, value: str | None = None, children: Sequence["LeafNode" | "ParentNode"] | None = None, props: dict | None = None):
+    # Pages create a lot of nodes, slots avoid a __dict__ per instance
+    __slots__ = ("tag", "value", "children", "props")
+
+    def __init__(self, tag: str | None = None, value: str | None = None, children: Sequence["LeafNode | ParentNode"] | None = None, props: dict | None = None):
         self.tag = tag
         self.value = value
         self.children = children
@@ -17,50 +49,62 @@ class HTMLNode():
         return f'HTMLNode({self.tag}, {self.value}, children: {children}, {self.props})'
 
     def to_html(self) -> str:
+        buffer = []
+        self.write_html(buffer.append)
+        return "".join(buffer)
+
+    def write_html(self, write: Callable[[str], object]) -> None:
+        '''Passes the html of the node piece by piece to `write`, e.g. `file.write` or `list.append`'''
         raise NotImplementedError("to_html method not implemented")
 
     def props_to_html(self) -> str:
-        '''Returns the attributes as a string with a leading whitespace'''
-        attributes = ""
-        if self.props is not None:
-            for key, value in self.props.items():
-                attributes += f' {key}="{value}"'
-
-        return attributes
+        '''Returns the escaped attributes as a string with a leading whitespace'''
+        if self.props is None:
+            return ""
+        return attributes_to_html(self.props)
 
 
 class LeafNode(HTMLNode):
+    __slots__ = ()
+
     def __init__(self, tag:  str | None, value: str, props: dict | None = None):
         super().__init__(tag, value, None, props)
 
-    def to_html(self) -> str:
+    def write_html(self, write: Callable[[str], object]) -> None:
         if self.value is None:
             raise ValueError("missing value for leaf node")
 
-        if self.tag == None:
-            tag_open, tag_close = "", ""
+        value = self.value
+        # escape_text inlined, leaves are most of the nodes of a page
+        if "&" in value or "<" in value or ">" in value:
+            value = value.replace("&", "&amp;").replace("<", "&lt;").replace(">", "&gt;")
+        if self.tag is None:
+            write(value)
+            return
+        open_tag, start_tag, close_tag = TAGS.get(self.tag) or tag_strings(self.tag)
+        if self.props:
+            open_tag = f"{start_tag}{attributes_to_html(self.props)}>"
+        if close_tag is None:
+            write(open_tag)
         else:
-            tag_open = f'<{self.tag}{self.props_to_html()}>'
-            tag_close = f'</{self.tag}>'
-
-        return f"{tag_open}{self.value}{tag_close}"
-
+            write(f"{open_tag}{value}{close_tag}")
 
 class ParentNode(HTMLNode):
-    def __init__(self, tag: str, children: Sequence[LeafNode | "ParentNode"], props: dict | None = None):
+    __slots__ = ()
+
+    def __init__(self, tag: str, children: Sequence["LeafNode | ParentNode"], props: dict | None = None):
         super().__init__(tag, None, children, props)
 
-    def to_html(self) -> str:
+    def write_html(self, write: Callable[[str], object]) -> None:
         if self.tag is None:
             raise ValueError("missing tag for parent node")
         if self.children is None or len(self.children) == 0:
             raise ValueError("missing child nodes for parent node")
 
-        tag_open = f'<{self.tag}{self.props_to_html()}>'
-        tag_close = f'</{self.tag}>'
-        try:
-            child_html = functools.reduce(lambda aggregator, child: aggregator + child.to_html(), self.children, "")
-        except ValueError as error:
-            print(f"Could not parse children: {self.children}\n{error}")
-
-        return tag_open + child_html + tag_close
\ No newline at end of file
+        open_tag, start_tag, close_tag = TAGS.get(self.tag) or tag_strings(self.tag)
+        if self.props:
+            open_tag = f"{start_tag}{attributes_to_html(self.props)}>"
+        write(open_tag)
+        for child in self.children:
+            child.write_html(write)
+        write(close_tag)
\ No newline at end of file
@@ -0,0 +1,137 @@
+import os
+import sys
+import errno
+import ctypes
+import select
+import struct
+import ctypes.util
+
+# Constants of <sys/inotify.h>
+IN_MODIFY = 0x00000002
+IN_ATTRIB = 0x00000004
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ONLYDIR = 0x01000000
+IN_ISDIR = 0x40000000
+IN_NONBLOCK = os.O_NONBLOCK
+IN_CLOEXEC = os.O_CLOEXEC
+
+WATCH_MASK = IN_MODIFY | IN_ATTRIB | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE | IN_ONLYDIR
+# struct inotify_event: watch descriptor, mask, cookie and length of the name that follows
+EVENT_HEADER = struct.Struct("iIII")
+
+
+def load_libc() -> ctypes.CDLL:
+    '''Returns the C library with the inotify functions, raises OSError where there is none'''
+    if not sys.platform.startswith("linux"):
+        raise OSError(errno.ENOSYS, "inotify is only available on Linux")
+    libc = ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+    if not hasattr(libc, "inotify_init1"):
+        raise OSError(errno.ENOSYS, "the C library has no inotify_init1")
+    return libc
+
+
+class Inotify():
+    '''
+    Watches directory trees with the Linux inotify api and reports the paths that changed,
+    so a change costs a few system calls instead of a walk of every watched file.
+    Raises OSError where inotify is not available, e.g. on other platforms or when the watch limit is reached.
+    '''
+    def __init__(self):
+        self.libc = load_libc()
+        self.fd = self.libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), os.strerror(ctypes.get_errno()))
+        # Watch descriptor to directory path, and whether its subdirectories are watched too
+        self.directories: dict[int, tuple[str, bool]] = {}
+
+    def __repr__(self) -> str:
+        return f"Inotify({len(self.directories)} directories)"
+
+    def __enter__(self) -> "Inotify":
+        return self
+
+    def __exit__(self, *_) -> None:
+        self.close()
+
+    def close(self) -> None:
+        if self.fd >= 0:
+            os.close(self.fd)
+            self.fd = -1
+
+    def watch(self, path: str, recursive: bool = True) -> None:
+        '''Watches a directory, and all directories below it if `recursive` is set'''
+        directories = [path]
+        while len(directories) > 0:
+            directory = directories.pop()
+            wd = self.libc.inotify_add_watch(self.fd, os.fsencode(directory), WATCH_MASK)
+            if wd < 0:
+                error = ctypes.get_errno()
+                # Removed in the meantime
+                if error in (errno.ENOENT, errno.ENOTDIR) and directory != path:
+                    continue
+                raise OSError(error, os.strerror(error), directory)
+            self.directories[wd] = (directory, recursive)
+            if not recursive:
+                continue
+            try:
+                with os.scandir(directory) as entries:
+                    directories.extend(entry.path for entry in entries if entry.is_dir(follow_symlinks=False))
+            except (FileNotFoundError, NotADirectoryError):
+                pass
+
+    def unwatch_below(self, path: str) -> None:
+        '''Stops watching the directories below a directory that was moved away'''
+        prefix = os.path.join(path, "")
+        for wd, (directory, _) in list(self.directories.items()):
+            if directory == path or directory.startswith(prefix):
+                self.libc.inotify_rm_watch(self.fd, wd)
+                del self.directories[wd]
+
+    def read(self, timeout: float | None = None) -> dict[str, bool] | None:
+        '''
+        Waits up to `timeout` seconds for events and returns the changed paths, mapped to whether they are directories.
+        New directories are watched before they are reported, so files created in them right after are not missed.
+        Returns None if the kernel dropped events, the caller has to scan everything then.
+        '''
+        paths = {}
+        overflow = False
+        while len(select.select([self.fd], [], [], timeout)[0]) > 0:
+            try:
+                data = os.read(self.fd, 64 * 1024)
+            except BlockingIOError:
+                break
+            offset = 0
+            while offset < len(data):
+                wd, mask, _, length = EVENT_HEADER.unpack_from(data, offset)
+                name = os.fsdecode(data[offset + EVENT_HEADER.size:offset + EVENT_HEADER.size + length].rstrip(b"\0"))
+                offset += EVENT_HEADER.size + length
+                if mask & IN_Q_OVERFLOW:
+                    overflow = True
+                    continue
+                if mask & IN_IGNORED:
+                    self.directories.pop(wd, None)
+                    continue
+                if wd not in self.directories or name == "":
+                    continue
+                directory, recursive = self.directories[wd]
+                path = os.path.join(directory, name)
+                is_dir = (mask & IN_ISDIR) != 0
+                if is_dir and recursive:
+                    if mask & IN_MOVED_FROM:
+                        self.unwatch_below(path)
+                    elif mask & (IN_CREATE | IN_MOVED_TO):
+                        try:
+                            self.watch(path)
+                        except (FileNotFoundError, NotADirectoryError):
+                            # Removed again before it was read
+                            pass
+                paths[path] = paths.get(path, False) or is_dir
+            # Collect what is already queued, without waiting again
+            timeout = 0
+        return None if overflow else paths
@@ -2,95 +2,210 @@
 
 import sys
 import os
-import shutil
-
-from markdown_converter import extract_markdown_heading, markdown_to_html_nodes
-
-
-def copy_dir(src_dir: str, dst_dir: str) -> None:
-    # Check if source directory exists
-    if not os.path.isdir(src_dir):
-        raise IsADirectoryError(f"no such directory: '{src_dir}'")
-    # Create empty destination directory
-    if os.path.exists(dst_dir):
-        shutil.rmtree(dst_dir)
-    os.mkdir(dst_dir)
-
-    # Copy directory content recursively
-    dir_content = os.listdir(src_dir)
-    for name in dir_content:
-        src_path = os.path.join(src_dir, name)
-        dst_path = os.path.join(dst_dir, name)
-        if os.path.isdir(src_path):
-            if not os.path.exists(dst_path):
-                # Create directory, if not existing
-                os.mkdir(dst_path)
-            copy_dir(src_path, dst_path)
-        if os.path.isfile(src_path):
-            shutil.copyfile(src_path, dst_path)
-
-def generate_page(from_path: str, template_path: str, dest_path: str, base_path: str) -> None:
-    print(f"Generating page from '{from_path}' to '{dest_path}' using '{template_path}' as template...")
-
-    with open(from_path, 'r') as file:
-        markdown = file.read()
-    with open(template_path, 'r') as file:
-        template = file.read()
-    title = extract_markdown_heading(markdown)
-    content = markdown_to_html_nodes(markdown).to_html()
-    html = template.replace("{{ Title }}", title).replace("{{ Content }}", content)
-    html = html.replace('href="/', f'href="{base_path}')
-    html = html.replace('src="/', f'src="{base_path}')
-
-    if not os.path.exists(dest_path):
-        os.makedirs(os.path.dirname(dest_path), exist_ok=True)
-    with open(dest_path, 'w') as file:
-        file.write(html)
-
-def generate_pages_recursive(dir_path_content: str, template_path: str, dest_dir_path: str, base_path: str) -> None:
-    # Check if markdown directory exists
-    if not os.path.isdir(dir_path_content):
-        raise IsADirectoryError(f"no such directory: '{dir_path_content}'")
-    # Create empty destination directory
-    if not os.path.exists(dest_dir_path):
-        os.makedirs(dest_dir_path, exist_ok=True)
-
-    dir_content = os.listdir(dir_path_content)
-    for name in dir_content:
-        src_path = os.path.join(dir_path_content, name)
-        dst_path = os.path.join(dest_dir_path, name)
-        if os.path.isdir(src_path):
-            if not os.path.exists(dst_path):
-                # Create directory, if not existing
-                os.mkdir(dst_path)
-            generate_pages_recursive(src_path, template_path, dst_path, base_path)
-        if os.path.isfile(src_path) and src_path.endswith(".md"):
-            dst_path = dst_path.removesuffix(".md") + ".html"
-            generate_page(src_path, template_path, dst_path, base_path)
-
-def clean_dir(path: str) -> None:
-    if os.path.exists(path):
-        shutil.rmtree(path)
-    os.mkdir(path)
+import json
+import argparse
+import cProfile
 
-def main() -> int:
-    basepath = "/"
-    args = sys.argv
-    if len(args) > 1:
-        basepath = args[1]
-    print(args)
-    clean_dir("docs/")
+from page_generator import generate_pages_incremental, generate_pages, configure_block_cache
+from template import Template
+from watcher import SiteWatcher, watch
+from assets import sync_dir
+from manifest import load_manifest, save_manifest
+from profiler import BuildProfile, NULL_PROFILE
+from stats import BuildStats
+from render_cache import RenderCache
+from depgraph import DependencyGraph
+from output import prune_dir, output_counters, write_if_changed
+from plan import BuildPlan
+from site_index import SiteIndex
+from fingerprint import fingerprint_assets, asset_paths, asset_urls
+import compress
+
+MANIFEST_PATH = ".build_manifest.json"
+# Compression methods and levels the siblings in the output were written with, kept across full builds like the siblings
+COMPRESS_MANIFEST_PATH = ".compress_manifest.json"
+# Fingerprinted names of static files by their relative paths, for tools outside the build
+ASSET_MANIFEST_PATH = "docs/assets.json"
+
+
+def sync_static_dir(plan: BuildPlan, manifest_path: str | None = None, hardlink: bool = False, stats: BuildStats | None = None, fingerprint: bool = False) -> dict[str, str]:
+    '''
+    Copies only new and changed static files. With a manifest, static files deleted since the last build are removed as well.
+    With `fingerprint`, assets are also copied to names containing their content hash, which are returned by their relative paths.
+    '''
+    manifest = load_manifest(manifest_path) if manifest_path is not None else {}
+    fingerprints = fingerprint_assets(plan.static_files, plan.static_dir, manifest.get("fingerprints")) if fingerprint else {}
+    paths = asset_paths(fingerprints)
+    files, copied, removed = sync_dir(plan.static_dir, plan.dest_dir, manifest.get("assets", []), hardlink, plan.static_files, paths)
+    print(f"{copied} of {len(files)} static files copied, {removed} removed")
+    if manifest_path is not None:
+        save_manifest(manifest_path, dict(manifest, assets=files, fingerprints=fingerprints))
+    if stats is not None:
+        stats.merge({"files_written": copied, "files_skipped": len(files) - copied, "files_removed": removed})
+    if fingerprint:
+        write_asset_manifest(paths, stats)
+    return paths
+
+def write_asset_manifest(paths: dict[str, str], stats: BuildStats | None = None) -> None:
+    asset_manifest = {path.replace(os.sep, "/"): fingerprinted.replace(os.sep, "/") for path, fingerprinted in paths.items()}
+    written = write_if_changed(ASSET_MANIFEST_PATH, json.dumps(asset_manifest, indent=1, sort_keys=True))
+    if stats is not None:
+        stats.add("files_written" if written else "files_skipped")
+
+def write_site_index(index: SiteIndex, plan: BuildPlan, stats: BuildStats | None = None) -> None:
+    '''Writes the sitemap, the feed and the search index from the pages collected while rendering'''
+    before = output_counters()
+    index.write(plan)
+    print(f"Indexed {len(index.pages)} pages for sitemap, feed and search")
+    if stats is not None:
+        stats.merge({name: count - before[name] for name, count in output_counters().items()})
+
+def compress_output(path: str, levels: dict[str, int], jobs: int = 1, stats: BuildStats | None = None, static_paths: set[str] = frozenset(), manifest_path: str | None = None) -> None:
+    '''Compresses the changed outputs. With a manifest, siblings written with other methods or levels by the last build are replaced.'''
+    # Without a record of the last build, existing siblings may have any level
+    previous_levels = load_manifest(manifest_path).get("levels", {}) if manifest_path is not None else None
+    written, removed = compress.compress_dir(path, levels, jobs, static_paths, previous_levels)
+    if manifest_path is not None:
+        save_manifest(manifest_path, {"levels": levels})
+    print(f"{written} compressed files written, {removed} removed")
+    if stats is not None:
+        stats.merge({"files_compressed": written, "files_removed": removed})
+
+def parse_args(argv: list[str]) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Generate static html pages from markdown files.")
+    parser.add_argument("basepath", nargs="?", default="/", help="base path prepended to absolute links (default: '/')")
+    parser.add_argument("--incremental", action="store_true", help="only regenerate pages whose inputs changed since the last build")
+    parser.add_argument("--hardlink-static", action="store_true", help="hardlink instead of copying static files")
+    parser.add_argument("-j", "--jobs", type=int, default=1, metavar="N", help="generate pages in N worker processes (default: 1)")
+    parser.add_argument("--pipeline", nargs="?", type=int, const=16, default=0, metavar="DEPTH", help="overlap reading and writing pages with rendering in threads, with at most DEPTH pages queued between stages (default: 16)")
+    parser.add_argument("--block-cache", type=int, default=4096, metavar="N", help="keep the html of the N most recently used markdown blocks per process, 0 disables the cache (default: 4096)")
+    parser.add_argument("--render-cache", metavar="DIR", help="reuse rendered pages from a cache directory, which can be shared by concurrent builds")
+    parser.add_argument("--render-cache-size", type=int, default=512, metavar="MB", help="evict the least recently used pages when the render cache grows beyond MB megabytes (default: 512)")
+    parser.add_argument("--site-url", metavar="URL", help="write sitemap.xml, feed.xml and search_index.json for the site served at URL, e.g. https://example.com")
+    parser.add_argument("--compress", nargs="?", const="gzip", metavar="METHODS", help="write precompressed siblings of changed html, css, js and other text files, METHODS is gzip, br or gzip,br (default: gzip)")
+    parser.add_argument("--gzip-level", type=int, default=compress.DEFAULT_LEVELS["gzip"], choices=range(1, 10), metavar="N", help="gzip compression level from 1 to 9 (default: 9)")
+    parser.add_argument("--brotli-level", type=int, default=compress.DEFAULT_LEVELS["br"], choices=range(0, 12), metavar="N", help="brotli quality from 0 to 11 (default: 11)")
+    parser.add_argument("--fingerprint", action="store_true", help="also copy css, js, image and font files to names containing their content hash and point links at them, for immutable caching")
+    parser.add_argument("--profile", nargs="?", const="build_profile.json", metavar="REPORT", help="write per-stage timings of the build and every page to a json report (default: build_profile.json)")
+    parser.add_argument("--cprofile", metavar="STATS", help="write cProfile stats of the build, worker processes are not included")
+    parser.add_argument("--what-rebuilds", metavar="PATH", help="list the pages an incremental build regenerates if PATH, a page, the template or an asset url like /images/tom.png, changes, then exit")
+    parser.add_argument("--change", choices=("edited", "added", "removed"), default="edited", help="kind of change to PATH for --what-rebuilds, a removed page rebuilds nothing (default: edited)")
+    parser.add_argument("--watch", action="store_true", help="serve the output and rebuild changed pages and static files after the build")
+    parser.add_argument("--port", type=int, default=8888, help="port of the development server in watch mode (default: 8888)")
+    args = parser.parse_args(argv)
+    if args.fingerprint and args.watch:
+        parser.error("--fingerprint does not support --watch, changed static files would keep their old names")
+    args.compress_levels = {}
+    if args.compress is not None:
+        levels = {"gzip": args.gzip_level, "br": args.brotli_level}
+        for method in args.compress.split(","):
+            if method not in levels:
+                parser.error(f"unknown compression method '{method}', choose gzip or br")
+            if method == "br" and compress.brotli is None:
+                parser.error("brotli compression needs the brotli package")
+            args.compress_levels[method] = levels[method]
+    return args
+
+def build(args: argparse.Namespace, profile: BuildProfile | None = None, stats: BuildStats | None = None) -> int:
+    build_stages = profile if profile is not None else NULL_PROFILE
+    cache = RenderCache(args.render_cache, args.render_cache_size << 20) if args.render_cache is not None else None
+    index = SiteIndex(args.site_url, args.basepath) if args.site_url is not None else None
+    if not args.incremental:
+        # A full build leaves no record of its inputs behind
+        if os.path.exists(MANIFEST_PATH):
+            os.remove(MANIFEST_PATH)
     try:
-        copy_dir("static/", "docs/")
+        with build_stages.stage("plan"):
+            plan = BuildPlan("content/", "static/", "docs/")
     except IsADirectoryError as error:
-        print(f"Error while copying static files: {error}")
+        print(f"Error while planning the build: {error}")
         return -1
+    with build_stages.stage("static"):
+        os.makedirs("docs/", exist_ok=True)
+        fingerprinted_paths = sync_static_dir(plan, MANIFEST_PATH if args.incremental else None, args.hardlink_static, stats, args.fingerprint)
+    urls = asset_urls(fingerprinted_paths)
     try:
-        generate_pages_recursive("content/", "template.html", "docs/", basepath)
-    except (FileNotFoundError, IsADirectoryError) as error:
+        with build_stages.stage("pages"):
+            if args.incremental:
+                errors = generate_pages_incremental("content/", "template.html", "docs/", args.basepath, MANIFEST_PATH, args.jobs, profile, stats, cache, args.pipeline, plan, index, urls)
+            else:
+                errors = generate_pages(plan.pages, Template.load("template.html", args.basepath, urls), args.jobs, profile, stats, cache, args.pipeline, index)
+        if index is not None:
+            with build_stages.stage("index"):
+                write_site_index(index, plan, stats)
+        if not args.incremental:
+            # Instead of cleaning the output up front, which would touch every unchanged file,
+            # remove whatever earlier builds left behind, including outputs of failed pages
+            outputs = plan.outputs({src_path for src_path, _ in errors}, fingerprinted_paths)
+            if index is not None:
+                outputs |= SiteIndex.outputs(plan.dest_dir)
+            if args.fingerprint:
+                outputs.add(ASSET_MANIFEST_PATH)
+            removed = prune_dir("docs/", outputs | compress.compressed_outputs(outputs, args.compress_levels))
+            if stats is not None:
+                stats.add("files_removed", removed)
+        if len(args.compress_levels) > 0:
+            with build_stages.stage("compress"):
+                compress_output("docs/", args.compress_levels, args.jobs, stats, plan.static_outputs(fingerprinted_paths), COMPRESS_MANIFEST_PATH)
+    except FileNotFoundError as error:
         print(f"Error while generating html pages: {error}")
         return -1
+    if cache is not None:
+        removed = cache.trim()
+        if removed > 0:
+            print(f"Evicted {removed} pages from the render cache")
+    if len(errors) > 0:
+        for src_path, error in errors:
+            print(f"Error while generating '{src_path}': {error}")
+        return -1
+
+    return 0
+
+def print_what_rebuilds(path: str, change: str) -> int:
+    '''Answers from the dependency graph the last incremental build recorded'''
+    manifest = load_manifest(MANIFEST_PATH)
+    if "dependencies" not in manifest:
+        print("No dependency graph recorded, run an incremental build first")
+        return -1
+    graph = DependencyGraph("content/", manifest["dependencies"])
+    pages = graph.what_rebuilds(path, change)
+    print(f"{len(pages)} pages rebuild if '{path}' is {change}:")
+    for page in pages:
+        print(f"  {page}")
+    if path.endswith(".md"):
+        linking_pages = graph.linking_pages(path)
+        print(f"{len(linking_pages)} pages link to it and keep their html:")
+        for page in linking_pages:
+            print(f"  {page}")
+    return 0
+
+def main() -> int:
+    args = parse_args(sys.argv[1:])
+    print(args)
+    if args.what_rebuilds is not None:
+        return print_what_rebuilds(args.what_rebuilds, args.change)
+
+    configure_block_cache(args.block_cache)
+    stats = BuildStats()
+    profile = BuildProfile() if args.profile is not None else None
+    profiler = cProfile.Profile() if args.cprofile is not None else None
+    if profiler is not None:
+        profiler.enable()
+    result = build(args, profile, stats)
+    if profiler is not None:
+        profiler.disable()
+        profiler.dump_stats(args.cprofile)
+    if profile is not None:
+        profile.write_report(args.profile, stats)
+        print(profile.summary())
+    summary = stats.summary()
+    if len(summary) > 0:
+        print(summary)
+    if result != 0:
+        return result
 
+    if args.watch:
+        watch(SiteWatcher("content/", "static/", "template.html", "docs/", args.basepath), args.port)
     return 0
 
 if __name__ == "__main__":
@@ -0,0 +1,91 @@
+import os
+import glob
+import json
+import mmap
+import hashlib
+import functools
+
+MANIFEST_VERSION = 1
+SOURCE_DIR = os.path.dirname(os.path.abspath(__file__))
+# Files from this size on are hashed through a memory map
+MMAP_THRESHOLD = 1 << 20
+
+
+def hash_file(path: str) -> str:
+    '''Returns the sha256 hex digest of a file, read in chunks, or memory mapped if it is large'''
+    digest = hashlib.sha256()
+    with open(path, 'rb') as file:
+        if os.fstat(file.fileno()).st_size >= MMAP_THRESHOLD:
+            # Hashes the pages of the file in place instead of copying them chunk by chunk
+            with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                digest.update(mapped)
+            return digest.hexdigest()
+        for chunk in iter(lambda: file.read(1 << 16), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+@functools.cache
+def generator_version() -> str:
+    '''Returns a digest of the generator sources, so a changed generator never reuses html of an old one'''
+    digest = hashlib.sha256()
+    for path in sorted(glob.glob(os.path.join(SOURCE_DIR, "*.py"))):
+        if not os.path.basename(path).startswith("test_"):
+            digest.update(hash_file(path).encode())
+    return digest.hexdigest()
+
+def load_manifest(path: str) -> dict:
+    '''Returns the stored manifest or an empty one, if it is missing or unreadable'''
+    try:
+        with open(path, 'r') as file:
+            manifest = json.load(file)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {}
+    if not isinstance(manifest, dict) or manifest.get("version") != MANIFEST_VERSION:
+        return {}
+    return manifest
+
+def save_manifest(path: str, manifest: dict) -> None:
+    manifest = dict(manifest, version=MANIFEST_VERSION)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, 'w') as file:
+        json.dump(manifest, file, indent=1, sort_keys=True)
+    os.replace(tmp_path, path)
+
+def plan_incremental_build(pages: list[tuple[str, str]], manifest: dict, template_hash: str, base_path: str, file_stats: dict[str, tuple[int, int]] | None = None) -> tuple[list[tuple[str, str]], list[str], dict]:
+    '''
+    Compares the markdown sources against the manifest of the previous build.
+    Sources with the (mtime, size) of `file_stats` recorded in the manifest keep their hash without being read.
+    Returns the pages to regenerate, the outputs to remove and the new manifest.
+    '''
+    old_pages = manifest.get("pages", {})
+    # A different template, base path or generator changes every generated page
+    generator = generator_version()
+    template_changed = (manifest.get("template") != template_hash or manifest.get("base_path") != base_path
+                        or manifest.get("generator") != generator)
+
+    stale_pages = []
+    new_pages = {}
+    for src_path, dst_path in pages:
+        old_entry = old_pages.get(src_path)
+        stat = file_stats.get(src_path) if file_stats is not None else None
+        if stat is not None and old_entry is not None and [old_entry.get("mtime"), old_entry.get("size")] == list(stat):
+            source_hash = old_entry["hash"]
+        else:
+            source_hash = hash_file(src_path)
+        new_pages[src_path] = {"hash": source_hash, "dest": dst_path}
+        if stat is not None:
+            new_pages[src_path].update(mtime=stat[0], size=stat[1])
+        if (template_changed or old_entry is None or old_entry["hash"] != source_hash or old_entry["dest"] != dst_path
+                or not os.path.isfile(dst_path)):
+            stale_pages.append((src_path, dst_path))
+
+    # Outputs of deleted sources, or of sources whose destination moved
+    new_outputs = {entry["dest"] for entry in new_pages.values()}
+    removed_outputs = sorted({
+        entry["dest"] for entry in manifest.get("pages", {}).values()
+        if entry["dest"] not in new_outputs
+    })
+
+    # Other sections, e.g. the synced static files, are kept
+    new_manifest = dict(manifest, template=template_hash, base_path=base_path, generator=generator, pages=new_pages)
+    return stale_pages, removed_outputs, new_manifest
@@ -1,9 +1,13 @@
 import re
+import functools
 
-from typing import Sequence
+from typing import Callable, Iterable, Iterator, Sequence
 from enum import Enum
+from concurrent.futures import ProcessPoolExecutor
 from htmlnode import ParentNode, LeafNode
 from text_converter import text_to_textnodes, text_node_to_html_node
+from profiler import Profile, NullProfile, NULL_PROFILE
+from block_cache import BlockCache
 
 
 class BlockType(Enum):
@@ -15,84 +19,207 @@ class BlockType(Enum):
     ORDERED_LIST = "ordered_list"
     HORIZONTAL_RULE = "horizontal rule"
 
+def iter_markdown_blocks(lines: Iterable[str]) -> Iterator[str]:
+    '''Yields the stripped blocks between empty lines, so a file can be split while it is read'''
+    block_lines = []
+    for line in lines:
+        line = line.rstrip("\n")
+        if line != "":
+            block_lines.append(line)
+            continue
+        block = "\n".join(block_lines).strip()
+        if block != "":
+            yield block
+        block_lines = []
+
+    block = "\n".join(block_lines).strip()
+    if block != "":
+        yield block
+
 def markdown_to_blocks(markdown: str) -> list[str]:
-    blocks = markdown.split("\n\n")
-    clean_blocks = [block.strip() for block in blocks if block != ""]
+    return list(iter_markdown_blocks(markdown.split("\n")))
 
-    return clean_blocks
+HEADING_PATTERN = re.compile(r"^(#{1,6}) (.+)$")
+CODE_PATTERN = re.compile(r"^```\w*(?:\n.*)+\n```$")
+QUOTE_PATTERN = re.compile(r"^(?:>.*\n?)+$")
+HORIZONTAL_RULE_PATTERN = re.compile(r"^(?: *[*-] *){3,}$")
+UNORDERED_LIST_PATTERN = re.compile(r"^(?:- .*\n?)+$")
 
-def is_ordered_list(markdown: str) -> bool:
+def parse_ordered_list(markdown: str) -> list[str] | None:
+    '''Returns the item texts, if every line is numbered in order starting at 1'''
+    items = []
     for i, line in enumerate(markdown.split("\n")):
-        num = line.split(".")[0]
-        if num != f"{i + 1}":
-            return False
-    return True
+        if line.split(".")[0] != f"{i + 1}":
+            return None
+        items.append(". ".join(line.split(". ")[1:]))
+    return items
+
+def classify_markdown_block(markdown: str) -> tuple[BlockType, str | tuple[int, str] | list[str] | None]:
+    '''
+    Returns the block type with the data parsed while classifying it:
+    (level, text) for headings, the item texts for lists, the text for code, quotes and paragraphs.
+    '''
+    # Only one pattern can match for a given first character
+    match markdown[:1]:
+        case "#":
+            heading = HEADING_PATTERN.match(markdown)
+            if heading is not None:
+                return BlockType.HEADING, (len(heading[1]), heading[2])
+        case "`":
+            # TODO: avoid matching code blocks with an injected tripple backtick
+            if CODE_PATTERN.match(markdown) is not None:
+                return BlockType.CODE, markdown.strip("`\n")
+        case ">":
+            if QUOTE_PATTERN.match(markdown) is not None:
+                return BlockType.QUOTE, " ".join([line.lstrip(">").strip() for line in markdown.split("\n")])
+        case "*" | "-" | " ":
+            if HORIZONTAL_RULE_PATTERN.match(markdown) is not None:
+                return BlockType.HORIZONTAL_RULE, None
+            if UNORDERED_LIST_PATTERN.match(markdown) is not None:
+                return BlockType.UNORDERED_LIST, [line.lstrip("- ") for line in markdown.split("\n")]
+        case "1":
+            items = parse_ordered_list(markdown)
+            if items is not None:
+                return BlockType.ORDERED_LIST, items
+    return BlockType.PARAGRAPH, " ".join(markdown.split("\n"))
 
 def get_markdown_block_type(markdown: str) -> BlockType:
-    # TODO: avoid matching code blocks with an injected tripple backtick
-    if re.match(r"^#{1,6} .+$", markdown) is not None:
-        return BlockType.HEADING
-    if re.match(r"^```\w*(?:\n.*)+\n```$", markdown):
-        return BlockType.CODE
-    if re.match(r"^(?:>.*\n?)+$", markdown):
-        return BlockType.QUOTE
-    if re.match(r"^(?: *[*-] *){3,}$", markdown):
-        return BlockType.HORIZONTAL_RULE
-    if re.match(r"^(?:- .*\n?)+$", markdown):
-        return BlockType.UNORDERED_LIST
-    if is_ordered_list(markdown):
-        return BlockType.ORDERED_LIST
-    return BlockType.PARAGRAPH
-
-def text_to_child_nodes(text: str) -> Sequence[LeafNode | ParentNode]:
+    return classify_markdown_block(markdown)[0]
+
+def text_to_child_nodes(text: str, base_path: str = "/") -> Sequence[LeafNode | ParentNode]:
     text_nodes = text_to_textnodes(text)
-    child_nodes = [text_node_to_html_node(node) for node in text_nodes]
+    child_nodes = [text_node_to_html_node(node, base_path) for node in text_nodes]
     return child_nodes
 
-def lines_to_list_items(lines: list[str]) -> list[ParentNode]:
+def lines_to_list_items(lines: list[str], base_path: str = "/") -> list[ParentNode]:
     nodes = []
     for line in lines:
-        nodes.append(ParentNode("li", text_to_child_nodes(line)))
+        nodes.append(ParentNode("li", text_to_child_nodes(line, base_path)))
     return nodes
 
-def markdown_block_to_html(markdown: str) -> LeafNode | ParentNode:
-    block_type = get_markdown_block_type(markdown)
+def block_to_html_node(block_type: BlockType, data: str | tuple[int, str] | list[str] | None, base_path: str = "/") -> LeafNode | ParentNode:
+    '''
+    Builds the html node of a block from the output of `classify_markdown_block`.
+    Absolute urls of links and images are moved below the base path, code is left as it is.
+    '''
     match block_type:
         case BlockType.HEADING:
-            level, text = re.findall(r"^(#{1,6}) (.+)$", markdown, )[0]
-            return ParentNode(f"h{len(level)}", text_to_child_nodes(text))
+            level, text = data
+            return ParentNode(f"h{level}", text_to_child_nodes(text, base_path))
         case BlockType.QUOTE:
-            text = " ".join([line.lstrip(">").strip() for line in markdown.split("\n")])
-            return ParentNode("blockquote", text_to_child_nodes(text))
+            return ParentNode("blockquote", text_to_child_nodes(data, base_path))
         case BlockType.CODE:
-            text = markdown.strip("`\n")
-            return ParentNode("pre", [ParentNode("code", [LeafNode(None, text)])])
+            return ParentNode("pre", [ParentNode("code", [LeafNode(None, data)])])
         case BlockType.ORDERED_LIST:
-            lines = markdown.split("\n")
-            text_lines = [". ".join(line.split(". ")[1:]) for line in lines]
-            return ParentNode("ol", lines_to_list_items(text_lines))
+            return ParentNode("ol", lines_to_list_items(data, base_path))
         case BlockType.UNORDERED_LIST:
-            lines = markdown.split("\n")
-            text_lines = [line.lstrip("- ") for line in lines]
-            return ParentNode("ul", lines_to_list_items(text_lines))
+            return ParentNode("ul", lines_to_list_items(data, base_path))
         case BlockType.HORIZONTAL_RULE:
             return LeafNode("hr", "")
         case _:
-            return ParentNode("p", text_to_child_nodes(" ".join(markdown.split("\n"))))
+            return ParentNode("p", text_to_child_nodes(data, base_path))
 
-def markdown_to_html_nodes(markdown: str) -> ParentNode:
+# Elements whose children are separate words in plain text, the children of other elements are inline
+TEXT_SEPARATED_TAGS = frozenset(("div", "ul", "ol"))
+
+def node_text(node: LeafNode | ParentNode) -> str:
+    '''Returns the unescaped text of a node without markup, with the alt text of images and the code as written'''
+    if node.children is None:
+        return node.props.get("alt", "") if node.tag == "img" and node.props else node.value
+    separator = " " if node.tag in TEXT_SEPARATED_TAGS else ""
+    return separator.join([node_text(child) for child in node.children])
+
+def markdown_block_to_html(markdown: str, base_path: str = "/") -> LeafNode | ParentNode:
+    return block_to_html_node(*classify_markdown_block(markdown), base_path)
+
+def markdown_to_html_nodes(markdown: str, base_path: str = "/") -> ParentNode:
     blocks = markdown_to_blocks(markdown)
     if len(blocks) == 0:
         raise ValueError("no valid markdown found")
 
     child_nodes = []
     for block in blocks:
-        child_nodes.append(markdown_block_to_html(block))
+        child_nodes.append(markdown_block_to_html(block, base_path))
 
     return ParentNode("div", child_nodes)
 
-def extract_markdown_heading(markdown: str) -> str:
-    lines = markdown.split("\n")
+def write_markdown_html(blocks: Iterable[str], write: Callable[[str], object], profile: Profile | NullProfile = NULL_PROFILE, cache: BlockCache | None = None, base_path: str = "/", texts: list[str] | None = None) -> None:
+    '''
+    Converts and writes one block at a time, the html matches `markdown_to_html_nodes(...).to_html()`.
+    Each step of the conversion is timed as a stage of `profile`, blocks found in `cache` skip the conversion.
+    The plain text of every block is appended to `texts`, if it is given, from the nodes built for its html.
+    '''
+    blocks = iter(blocks)
+    with profile.stage("read"):
+        block = next(blocks, None)
+    if block is None:
+        raise ValueError("no valid markdown found")
+
+    write("<div>")
+    while block is not None:
+        entry = cache.get(block, base_path) if cache is not None else None
+        html, text = entry if entry is not None else (None, None)
+        if html is None or (texts is not None and text is None):
+            with profile.stage("classify"):
+                block_type, data = classify_markdown_block(block)
+            with profile.stage("inline"):
+                node = block_to_html_node(block_type, data, base_path)
+            if html is None:
+                with profile.stage("to_html"):
+                    html = node.to_html()
+                profile.count_nodes(node)
+            if texts is not None:
+                text = node_text(node)
+            if cache is not None:
+                cache.put(block, html, base_path, text)
+        if texts is not None:
+            texts.append(text)
+        with profile.stage("write"):
+            write(html)
+        with profile.stage("read"):
+            block = next(blocks, None)
+    write("</div>")
+
+# Blocks cached by a `convert_many` call without a cache of its own
+CONVERT_CACHE_SIZE = 1024
+
+def convert_many(documents: Iterable[str], base_path: str = "/", cache: BlockCache | None = None, jobs: int = 1) -> list[str]:
+    '''
+    Converts many markdown documents to html, in the order of `documents`, each like `markdown_to_html_nodes(...).to_html()`.
+    Documents share one output buffer and a block cache, so blocks repeated across documents are converted once.
+    Pass the same `cache` to later calls to keep reusing it, or `BlockCache(0)` to disable caching. With `jobs` > 1 the documents are spread over a pool of processes with a cache of the same size each,
+    which only pays off for batches large enough to cover the start of the pool.
+    '''
+    if cache is None:
+        cache = BlockCache(CONVERT_CACHE_SIZE)
+    if jobs > 1:
+        documents = list(documents)
+        # Several chunks per process balance uneven document sizes without paying IPC per document
+        chunksize = max(1, len(documents) // (jobs * 4))
+        with ProcessPoolExecutor(max_workers=jobs, initializer=init_convert_worker, initargs=(cache.size,)) as executor:
+            return list(executor.map(functools.partial(convert_in_worker, base_path=base_path), documents, chunksize=chunksize))
+
+    buffer = []
+    results = []
+    for markdown in documents:
+        write_markdown_html(iter_markdown_blocks(markdown.split("\n")), buffer.append, NULL_PROFILE, cache, base_path)
+        results.append("".join(buffer))
+        buffer.clear()
+    return results
+
+# Block cache of a worker process of `convert_many`
+worker_cache = BlockCache(0)
+
+def init_convert_worker(cache_size: int) -> None:
+    global worker_cache
+    worker_cache = BlockCache(cache_size)
+
+def convert_in_worker(markdown: str, base_path: str) -> str:
+    return convert_many((markdown,), base_path, worker_cache)[0]
+
+def extract_markdown_heading(markdown: str | Iterable[str]) -> str:
+    '''Returns the first h1 heading of a markdown string or an iterable of lines, e.g. a file'''
+    lines = markdown.split("\n") if isinstance(markdown, str) else markdown
     for line in lines:
         if line.startswith("# "):
             return line[2:].strip()
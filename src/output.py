@@ -0,0 +1,93 @@
+import os
+import threading
+
+from typing import TextIO
+
+# Generated files written and skipped because their content did not change, in this process
+counters = {"files_written": 0, "files_skipped": 0}
+
+
+def output_counters() -> dict[str, int]:
+    return dict(counters)
+
+def temp_path(path: str) -> str:
+    '''Returns a temp file name next to `path`, unique for concurrent writers'''
+    return f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+
+def same_content(path: str, other_path: str) -> bool:
+    try:
+        if os.path.getsize(path) != os.path.getsize(other_path):
+            return False
+        with open(path, 'rb') as file, open(other_path, 'rb') as other_file:
+            while True:
+                chunk = file.read(1 << 16)
+                if chunk != other_file.read(1 << 16):
+                    return False
+                if chunk == b"":
+                    return True
+    except FileNotFoundError:
+        return False
+
+def replace_if_changed(tmp_path: str, path: str) -> bool:
+    '''Moves a finished temp file to `path`, or drops it if `path` has the same content. Returns True if it was moved.'''
+    if same_content(tmp_path, path):
+        os.remove(tmp_path)
+        counters["files_skipped"] += 1
+        return False
+    os.replace(tmp_path, path)
+    counters["files_written"] += 1
+    return True
+
+def write_if_changed(path: str, text: str) -> bool:
+    '''Atomically writes `text` to `path`, unless it already holds exactly that text. Returns True if it was written.'''
+    try:
+        with open(path, 'r') as file:
+            if file.read() == text:
+                counters["files_skipped"] += 1
+                return False
+    except (FileNotFoundError, UnicodeDecodeError):
+        pass
+    tmp_path = temp_path(path)
+    with open(tmp_path, 'w') as file:
+        file.write(text)
+    os.replace(tmp_path, path)
+    counters["files_written"] += 1
+    return True
+
+
+class OutputFile():
+    '''
+    Text file written to a temp file next to `path`, which atomically replaces `path` when closed.
+    An identical existing file is left untouched, so it keeps its mtime for rsync, uploads and caches.
+    '''
+    def __init__(self, path: str):
+        self.path = path
+        self.tmp_path = temp_path(path)
+        self.file = None
+        self.written = False
+
+    def __enter__(self) -> TextIO:
+        self.file = open(self.tmp_path, 'w')
+        return self.file
+
+    def __exit__(self, exception_type, *_) -> None:
+        self.file.close()
+        if exception_type is not None:
+            os.remove(self.tmp_path)
+            return
+        self.written = replace_if_changed(self.tmp_path, self.path)
+
+
+def prune_dir(path: str, keep: set[str]) -> int:
+    '''Removes all files below `path` that are not in `keep`, and directories left empty. Returns the number of removed files.'''
+    keep = {os.path.normpath(file_path) for file_path in keep}
+    removed = 0
+    for dir_path, _, names in os.walk(path, topdown=False):
+        for name in names:
+            file_path = os.path.join(dir_path, name)
+            if os.path.normpath(file_path) not in keep:
+                os.remove(file_path)
+                removed += 1
+        if os.path.normpath(dir_path) != os.path.normpath(path) and len(os.listdir(dir_path)) == 0:
+            os.rmdir(dir_path)
+    return removed
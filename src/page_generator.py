@@ -0,0 +1,326 @@
+import os
+import json
+import pickle
+import hashlib
+import functools
+
+from typing import Callable, Iterable, Iterator
+from concurrent.futures import ProcessPoolExecutor
+from markdown_converter import extract_markdown_heading, iter_markdown_blocks, write_markdown_html
+from manifest import hash_file, load_manifest, save_manifest, plan_incremental_build
+from template import Template
+from profiler import Profile, NullProfile, BuildProfile, NULL_PROFILE
+from block_cache import BlockCache
+from render_cache import RenderCache
+from depgraph import DependencyGraph, scan_page
+from pipeline import run_pipeline
+from plan import BuildPlan, scan_dir, plan_pages
+from output import OutputFile, write_if_changed, output_counters
+from stats import BuildStats
+from htmlnode import escape_text
+import text_converter
+from site_index import SiteIndex, join_text, markdown_info
+
+# Cache of rendered blocks shared by all pages generated in this process
+block_cache = BlockCache(0)
+
+
+def configure_block_cache(size: int) -> None:
+    '''Replaces the block cache of this process, a size of 0 disables caching'''
+    global block_cache
+    block_cache = BlockCache(size)
+
+def configure_asset_urls(urls: dict[str, str]) -> None:
+    '''Points links to static files at their fingerprinted names in this process'''
+    if urls != text_converter.asset_urls:
+        text_converter.configure_asset_urls(urls)
+        # Cached blocks link to the previous names
+        configure_block_cache(block_cache.size)
+
+def block_cache_counters() -> dict[str, int]:
+    return {"block_cache_hits": block_cache.hits, "block_cache_misses": block_cache.misses}
+
+
+def page_content(blocks: Iterable[str], base_path: str, profile: Profile | NullProfile = NULL_PROFILE, texts: list[str] | None = None) -> Callable[[Callable[[str], object]], None]:
+    '''
+    Returns the value of the content slot, writing the html of the blocks with absolute links moved below the base path.
+    The plain text of the blocks is appended to `texts`, if it is given.
+    '''
+    def write_content(write: Callable[[str], object]) -> None:
+        write_markdown_html(blocks, write, profile, block_cache if block_cache.size > 0 else None, base_path, texts)
+    return write_content
+
+def generate_page(from_path: str, template: Template, dest_path: str, profile: Profile | NullProfile = NULL_PROFILE, cache: RenderCache | None = None, index: bool = False) -> tuple[str, str] | None:
+    '''Generates a page, returns its title and plain text for the site index if `index` is set'''
+    print(f"Generating page from '{from_path}' to '{dest_path}' using '{template.path}' as template...")
+
+    if not os.path.exists(dest_path):
+        os.makedirs(os.path.dirname(dest_path), exist_ok=True)
+
+    if cache is not None:
+        with profile.stage("cache"):
+            key = cache.key(from_path, template.digest)
+            html = cache.read(key)
+        if html is not None:
+            with profile.stage("write"):
+                write_if_changed(dest_path, html)
+            if not index:
+                return None
+            # Only the source is read, it was just hashed for the cache key anyway
+            with profile.stage("read"), open(from_path, 'r') as markdown_file:
+                return markdown_info(markdown_file.read())
+
+    # Stream the page block by block, so memory depends on the largest block instead of the file size
+    with open(from_path, 'r') as markdown_file:
+        with profile.stage("read"):
+            title = extract_markdown_heading(markdown_file)
+            markdown_file.seek(0)
+
+        # Unchanged pages are left untouched, changed ones are replaced atomically
+        texts = [] if index else None
+        with profile.stage("write"), OutputFile(dest_path) as file:
+            with profile.stage("template"):
+                content = page_content(iter_markdown_blocks(markdown_file), template.base_path, profile, texts)
+                template.write(file.write, {"Title": escape_text(title), "Content": content})
+
+    if cache is not None:
+        with profile.stage("cache"):
+            cache.store(key, dest_path)
+    return (title, join_text(texts)) if index else None
+
+def render_page(markdown: str, template: Template, profile: Profile | NullProfile = NULL_PROFILE, texts: list[str] | None = None) -> str:
+    '''
+    Returns the html of a page, like `generate_page` but from markdown already in memory.
+    The plain text of its blocks is appended to `texts`, if it is given.
+    '''
+    lines = markdown.split("\n")
+    with profile.stage("read"):
+        title = extract_markdown_heading(lines)
+    buffer = []
+    with profile.stage("template"):
+        template.write(buffer.append, {"Title": escape_text(title), "Content": page_content(iter_markdown_blocks(lines), template.base_path, profile, texts)})
+    return "".join(buffer)
+
+def find_markdown_files(dir_path_content: str, dest_dir_path: str) -> list[tuple[str, str]]:
+    '''Returns (source, destination) pairs for all markdown files below the content directory'''
+    return plan_pages(scan_dir(dir_path_content), dir_path_content, dest_dir_path)
+
+def format_error(exception: Exception) -> str:
+    return f"{type(exception).__name__}: {exception}"
+
+def try_generate_page(page: tuple[str, str], template: Template, profile: bool = False, cache: RenderCache | None = None, index: bool = False) -> tuple[str, str | None, Profile | None, dict[str, int], tuple[str, str] | None]:
+    '''
+    Generates a single page and returns its source path with an error message, if it failed,
+    the profile of the page, if `profile` is set, the build stat counters of the page
+    and its title and plain text, if `index` is set
+    '''
+    src_path, dst_path = page
+    page_profile = Profile(src_path) if profile else NULL_PROFILE
+    before = page_counters(cache)
+    info = None
+    try:
+        info = generate_page(src_path, template, dst_path, page_profile, cache, index)
+        error = None
+    except Exception as exception:
+        error = format_error(exception)
+    counters = {name: count - before[name] for name, count in page_counters(cache).items()}
+    return src_path, error, page_profile if profile and error is None else None, counters, info
+
+def page_counters(cache: RenderCache | None) -> dict[str, int]:
+    counters = block_cache_counters() | output_counters()
+    if cache is not None:
+        counters.update(render_cache_hits=cache.hits, render_cache_misses=cache.misses, render_cache_errors=cache.errors)
+    return counters
+
+def generate_pages(pages: list[tuple[str, str]], template: Template, jobs: int = 1, profile: BuildProfile | None = None, stats: BuildStats | None = None, cache: RenderCache | None = None, pipeline_depth: int = 0, index: SiteIndex | None = None) -> list[tuple[str, str]]:
+    '''
+    Generates all pages, either in order, overlapping reads and writes with rendering in a pipeline of `pipeline_depth` pages,
+    or spread over a pool of `jobs` processes. Returns (source, error) pairs for every page that failed, in the order of `pages`.
+    Title and plain text of the generated pages are added to `index`, if it is given.
+    '''
+    configure_asset_urls(template.asset_urls)
+    if jobs <= 1 and pipeline_depth > 0:
+        return generate_pages_pipelined(pages, template, pipeline_depth, profile, stats, cache, index)
+
+    if jobs <= 1 or len(pages) <= 1:
+        worker = functools.partial(try_generate_page, template=template, profile=profile is not None, cache=cache, index=index is not None)
+        return collect_results(map(worker, pages), profile, stats, index)
+
+    # Workers get the template once and only paths per page, they read the markdown and write the html themselves
+    worker_arguments = (block_cache.size, template, profile is not None, cache, index is not None)
+    # Several chunks per process balance uneven page sizes without paying IPC per page
+    chunksize = max(1, len(pages) // (jobs * 4))
+    with ProcessPoolExecutor(max_workers=jobs, initializer=init_page_worker, initargs=worker_arguments) as executor:
+        results = executor.map(generate_page_in_worker, pages, chunksize=chunksize)
+        if stats is None:
+            return collect_results(results, profile, stats, index)
+        sent = len(pickle.dumps(worker_arguments)) * jobs
+        sent += sum(len(pickle.dumps(pages[i:i + chunksize])) for i in range(0, len(pages), chunksize))
+        stats.add("ipc_bytes_sent", sent)
+        return collect_results(count_received_bytes(results, stats), profile, stats, index)
+
+# Template, profile flag, render cache and index flag of a worker process of `generate_pages`
+worker_arguments = None
+
+def init_page_worker(block_cache_size: int, template: Template, profile: bool, cache: RenderCache | None, index: bool = False) -> None:
+    global worker_arguments
+    configure_block_cache(block_cache_size)
+    configure_asset_urls(template.asset_urls)
+    worker_arguments = (template, profile, cache, index)
+
+def generate_page_in_worker(page: tuple[str, str]) -> tuple[str, str | None, Profile | None, dict[str, int], tuple[str, str] | None]:
+    return try_generate_page(page, *worker_arguments)
+
+def count_received_bytes(results: Iterable[tuple], stats: BuildStats) -> Iterator[tuple]:
+    '''Passes on the results of worker processes and counts their pickled size'''
+    for result in results:
+        stats.add("ipc_bytes_received", len(pickle.dumps(result)))
+        yield result
+
+def generate_pages_pipelined(pages: list[tuple[str, str]], template: Template, depth: int = 16, profile: BuildProfile | None = None, stats: BuildStats | None = None, cache: RenderCache | None = None, index: SiteIndex | None = None) -> list[tuple[str, str]]:
+    '''
+    Generates all pages with a reader, a render and a writer thread, so disk and network latency overlaps with parsing.
+    At most `depth` pages wait between two stages. The output is identical to `generate_pages`.
+    '''
+    def read(page: tuple[str, str]) -> tuple:
+        src_path, dst_path = page
+        page_profile = Profile(src_path) if profile is not None else NULL_PROFILE
+        key, markdown, html, error = None, None, None, None
+        try:
+            os.makedirs(os.path.dirname(dst_path), exist_ok=True)
+            if cache is not None:
+                with page_profile.stage("cache"):
+                    key = cache.key(src_path, template.digest)
+                    html = cache.read(key)
+                if html is not None:
+                    key = None
+            # Cached pages still need their markdown for the site index
+            if html is None or index is not None:
+                with page_profile.stage("read"), open(src_path, 'r') as file:
+                    markdown = file.read()
+        except Exception as exception:
+            error = format_error(exception)
+        return page, page_profile, key, markdown, html, error
+
+    def render(item: tuple) -> tuple:
+        page, page_profile, key, markdown, html, error = item
+        if markdown is None:
+            return page, page_profile, key, html, None, error
+        try:
+            if html is not None:
+                return page, page_profile, key, html, markdown_info(markdown), None
+            print(f"Generating page from '{page[0]}' to '{page[1]}' using '{template.path}' as template...")
+            texts = [] if index is not None else None
+            html = render_page(markdown, template, page_profile, texts)
+            return page, page_profile, key, html, (extract_markdown_heading(markdown), join_text(texts)) if index is not None else None, None
+        except Exception as exception:
+            return page, page_profile, key, None, None, format_error(exception)
+
+    def write(item: tuple) -> tuple[str, str | None, Profile | None, dict[str, int], tuple[str, str] | None]:
+        (src_path, dst_path), page_profile, key, html, info, error = item
+        if html is not None:
+            try:
+                with page_profile.stage("write"):
+                    write_if_changed(dst_path, html)
+                if cache is not None and key is not None:
+                    with page_profile.stage("cache"):
+                        cache.store(key, dst_path)
+            except Exception as exception:
+                error = format_error(exception)
+        return src_path, error, page_profile if profile is not None and error is None else None, {}, info
+
+    # The counters of a page are spread over several threads, only the totals are exact
+    before = page_counters(cache)
+    errors = collect_results(run_pipeline(pages, read, render, write, depth), profile, stats, index)
+    if stats is not None:
+        stats.merge({name: count - before[name] for name, count in page_counters(cache).items()})
+    return errors
+
+def collect_results(results: Iterable[tuple[str, str | None, Profile | None, dict[str, int], tuple[str, str] | None]], profile: BuildProfile | None, stats: BuildStats | None, index: SiteIndex | None = None) -> list[tuple[str, str]]:
+    errors = []
+    for src_path, error, page_profile, counters, info in results:
+        if error is not None:
+            errors.append((src_path, error))
+        if index is not None and info is not None:
+            index.add(src_path, *info)
+        if profile is not None and page_profile is not None:
+            profile.add_page(page_profile)
+        if stats is not None:
+            stats.merge(counters)
+    return errors
+
+def generate_pages_incremental(dir_path_content: str, template_path: str, dest_dir_path: str, base_path: str, manifest_path: str, jobs: int = 1, profile: BuildProfile | None = None, stats: BuildStats | None = None, cache: RenderCache | None = None, pipeline_depth: int = 0, plan: BuildPlan | None = None, index: SiteIndex | None = None, asset_urls: dict[str, str] | None = None) -> list[tuple[str, str]]:
+    '''
+    Regenerates only pages whose source, the template, the base path or the generator changed since the last build.
+    Sources whose size and mtime in `plan` match the manifest are not hashed again.
+    Pages that are not regenerated keep their `index` entries, read back from the search index of the last build.
+    A changed fingerprint of `asset_urls` regenerates the pages referring to the asset, or every page if the template does.
+    '''
+    if plan is not None:
+        pages, file_stats = plan.pages, plan.sources
+    else:
+        file_stats = scan_dir(dir_path_content)
+        pages = plan_pages(file_stats, dir_path_content, dest_dir_path)
+    manifest = load_manifest(manifest_path)
+    asset_urls = asset_urls or {}
+    template = Template.load(template_path, base_path, asset_urls)
+    template_hash = hash_file(template_path)
+    # Only the fingerprints of the assets the template itself refers to change every page
+    template_assets = {url: asset_urls[url] for url in template.urls if url in asset_urls}
+    if template_assets:
+        template_hash = hashlib.sha256(f"{template_hash}\0{json.dumps(template_assets, sort_keys=True)}".encode()).hexdigest()
+    stale_pages, removed_outputs, new_manifest = plan_incremental_build(pages, manifest, template_hash, base_path, file_stats)
+
+    old_graph = DependencyGraph(dir_path_content, manifest.get("dependencies"))
+    graph = update_dependency_graph(old_graph, pages, stale_pages, template_path)
+    # Pages referring to an asset whose fingerprinted name changed, appeared or disappeared.
+    # Links to pages are only recorded for --what-rebuilds, they render the same whether their target exists or not
+    asset_pages = set()
+    old_asset_urls = manifest.get("asset_urls", {})
+    for url in set(old_asset_urls).union(asset_urls):
+        if old_asset_urls.get(url) != asset_urls.get(url):
+            asset_pages.update(graph.dependents(url))
+    stale_sources = {src_path for src_path, _ in stale_pages}
+    stale_pages += [page for page in pages if os.path.normpath(page[0]) in asset_pages and page[0] not in stale_sources]
+    if index is not None:
+        old_index = manifest.get("index", {})
+        texts = SiteIndex.read_texts(dest_dir_path)
+        stale_sources = {src_path for src_path, _ in stale_pages}
+        for page in pages:
+            # Pages not indexed by the last build, e.g. because it ran without a site index, are rendered again
+            if page[0] not in stale_sources and not index.restore(page[0], dir_path_content, old_index.get(page[0]), texts):
+                stale_pages.append(page)
+
+    for dst_path in removed_outputs:
+        if os.path.isfile(dst_path):
+            print(f"Removing stale page '{dst_path}'...")
+            os.remove(dst_path)
+            if stats is not None:
+                stats.add("files_removed")
+    errors = generate_pages(stale_pages, template, jobs, profile, stats, cache, pipeline_depth, index)
+    print(f"{len(stale_pages) - len(errors)} of {len(pages)} pages regenerated")
+
+    # Failed pages are left out, so the next build retries them
+    for src_path, _ in errors:
+        del new_manifest["pages"][src_path]
+        if index is not None:
+            index.pages.pop(src_path, None)
+    new_manifest["dependencies"] = graph.to_dict()
+    new_manifest["asset_urls"] = asset_urls
+    if index is not None:
+        new_manifest["index"] = index.to_dict()
+    else:
+        new_manifest.pop("index", None)
+    save_manifest(manifest_path, new_manifest)
+    return errors
+
+def update_dependency_graph(old_graph: DependencyGraph, pages: list[tuple[str, str]], stale_pages: list[tuple[str, str]], template_path: str) -> DependencyGraph:
+    '''Builds the graph of the current pages, only the sources of stale pages and of pages recorded without assets are scanned again'''
+    stale_sources = {src_path for src_path, _ in stale_pages}
+    graph = DependencyGraph(old_graph.content_dir)
+    for src_path, _ in pages:
+        links, assets = (old_graph.links(src_path), old_graph.assets(src_path)) if src_path not in stale_sources else (None, None)
+        if links is None or assets is None:
+            links, assets = scan_page(src_path)
+        graph.add_page(src_path, template_path, links, assets)
+    return graph
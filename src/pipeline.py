@@ -0,0 +1,58 @@
+import queue
+import threading
+
+from typing import Callable, Iterable
+
+# Marks the end of the items passed between two stages
+DONE = object()
+
+
+def run_pipeline(items: Iterable, read: Callable, render: Callable, write: Callable, depth: int = 16) -> list:
+    '''
+    Passes every item through `read` in a reader thread, `render` in the calling thread and `write` in a writer thread,
+    so waiting for I/O overlaps with rendering. Stages are joined by queues of at most `depth` items,
+    which caps the number of items in flight. Returns the results of `write` in the order of `items`.
+    '''
+    read_queue = queue.Queue(maxsize=depth)
+    write_queue = queue.Queue(maxsize=depth)
+    results = []
+    # After the first exception the remaining items are drained, so no stage blocks on a full queue
+    failures = []
+
+    def reader() -> None:
+        try:
+            for item in items:
+                read_queue.put(read(item))
+        except BaseException as exception:
+            failures.append(exception)
+        finally:
+            read_queue.put(DONE)
+
+    def writer() -> None:
+        while (item := write_queue.get()) is not DONE:
+            if len(failures) > 0:
+                continue
+            try:
+                results.append(write(item))
+            except BaseException as exception:
+                failures.append(exception)
+
+    threads = [threading.Thread(target=reader, daemon=True), threading.Thread(target=writer, daemon=True)]
+    for thread in threads:
+        thread.start()
+    try:
+        while (item := read_queue.get()) is not DONE:
+            if len(failures) > 0:
+                continue
+            try:
+                write_queue.put(render(item))
+            except BaseException as exception:
+                failures.append(exception)
+    finally:
+        write_queue.put(DONE)
+        for thread in threads:
+            thread.join()
+
+    if len(failures) > 0:
+        raise failures[0]
+    return results
@@ -0,0 +1,59 @@
+import os
+
+from assets import scan_files
+
+
+def scan_dir(path: str) -> dict[str, tuple[int, int]]:
+    '''Returns (mtime, size) of every file below a directory, found in a single os.scandir walk'''
+    # Check if source directory exists
+    if not os.path.isdir(path):
+        raise IsADirectoryError(f"no such directory: '{path}'")
+    return scan_files(path)
+
+def path_key(path: str) -> list[str]:
+    # Sorting by components keeps `a/` next to `a` instead of after `a-b`
+    return path.split(os.sep)
+
+def plan_pages(files: dict[str, tuple[int, int]], content_dir: str, dest_dir: str) -> list[tuple[str, str]]:
+    '''Returns sorted (source, destination) pairs for the markdown files of a content directory scan'''
+    pages = []
+    for src_path in sorted(files, key=path_key):
+        if src_path.endswith(".md"):
+            dst_path = os.path.join(dest_dir, os.path.relpath(src_path, content_dir))
+            pages.append((src_path, dst_path.removesuffix(".md") + ".html"))
+    return pages
+
+
+class BuildPlan():
+    '''
+    Pages and static files of a build, collected before anything is generated.
+    Keeps the stat results of the directory walks, so later steps do not stat the sources again.
+    '''
+    def __init__(self, content_dir: str, static_dir: str, dest_dir: str):
+        self.content_dir = content_dir
+        self.static_dir = static_dir
+        self.dest_dir = dest_dir
+        self.static_files = scan_dir(static_dir)
+        self.sources = scan_dir(content_dir)
+        self.pages = plan_pages(self.sources, content_dir, dest_dir)
+
+    def __repr__(self) -> str:
+        return f"BuildPlan({len(self.pages)} pages, {len(self.static_files)} static files)"
+
+    def outputs(self, failed: set[str] = frozenset(), asset_paths: dict[str, str] | None = None) -> set[str]:
+        '''
+        Returns the paths of all files the build writes, leaving out the pages of `failed` sources.
+        Static files of `asset_paths` are written to the relative path they are mapped to as well.
+        '''
+        outputs = {dst_path for src_path, dst_path in self.pages if src_path not in failed}
+        return outputs | self.static_outputs(asset_paths)
+
+    def static_outputs(self, asset_paths: dict[str, str] | None = None) -> set[str]:
+        '''Returns the paths the static files are copied to, the files of `asset_paths` also to the relative path they are mapped to'''
+        outputs = set()
+        for path in self.static_files:
+            relative_path = os.path.relpath(path, self.static_dir)
+            outputs.add(os.path.join(self.dest_dir, relative_path))
+            if asset_paths is not None and relative_path in asset_paths:
+                outputs.add(os.path.join(self.dest_dir, asset_paths[relative_path]))
+        return outputs
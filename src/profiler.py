@@ -0,0 +1,141 @@
+import json
+import time
+import contextlib
+
+from stats import BuildStats
+
+# Stages of a page, in pipeline order
+PAGE_STAGES = ("read", "classify", "inline", "to_html", "template", "write")
+
+
+class Stage():
+    '''Context manager measuring one stage of a profile, see `Profile.stage`'''
+    __slots__ = ("profile", "name")
+
+    def __init__(self, profile: "Profile", name: str):
+        self.profile = profile
+        self.name = name
+
+    def __enter__(self) -> None:
+        self.profile.enter(self.name)
+
+    def __exit__(self, *_) -> None:
+        self.profile.exit()
+
+
+class Profile():
+    '''
+    Accumulates wall and CPU time per stage. Stages can be nested,
+    the time of an inner stage is not counted for the outer one.
+    '''
+    def __init__(self, name: str):
+        self.name = name
+        self.wall = {}
+        self.cpu = {}
+        self.nodes = 0
+        self._stack = []
+
+    def stage(self, name: str) -> Stage:
+        return Stage(self, name)
+
+    def _pause(self, wall: float, cpu: float) -> None:
+        name, start_wall, start_cpu = self._stack[-1]
+        self.wall[name] = self.wall.get(name, 0.0) + wall - start_wall
+        self.cpu[name] = self.cpu.get(name, 0.0) + cpu - start_cpu
+
+    def enter(self, name: str) -> None:
+        wall, cpu = time.perf_counter(), time.thread_time()
+        if len(self._stack) > 0:
+            self._pause(wall, cpu)
+        self._stack.append((name, wall, cpu))
+
+    def exit(self) -> None:
+        wall, cpu = time.perf_counter(), time.thread_time()
+        self._pause(wall, cpu)
+        self._stack.pop()
+        if len(self._stack) > 0:
+            # Resume the outer stage
+            self._stack[-1] = (self._stack[-1][0], wall, cpu)
+
+    def count_nodes(self, node) -> None:
+        stack = [node]
+        while len(stack) > 0:
+            node = stack.pop()
+            self.nodes += 1
+            if node.children is not None:
+                stack.extend(node.children)
+
+    def total_wall(self) -> float:
+        return sum(self.wall.values())
+
+    def total_cpu(self) -> float:
+        return sum(self.cpu.values())
+
+    def to_dict(self) -> dict:
+        return {
+            "name": self.name,
+            "wall": self.total_wall(),
+            "cpu": self.total_cpu(),
+            "nodes": self.nodes,
+            "stages": {name: {"wall": self.wall[name], "cpu": self.cpu[name]} for name in self.wall},
+        }
+
+
+class NullProfile():
+    '''Stand-in for `Profile` that records nothing, so stages cost next to nothing when profiling is off'''
+    _context = contextlib.nullcontext()
+
+    def stage(self, _: str) -> contextlib.nullcontext:
+        return self._context
+
+    def count_nodes(self, _) -> None:
+        pass
+
+NULL_PROFILE = NullProfile()
+
+
+class BuildProfile(Profile):
+    '''Build level stages, e.g. static files and pages, plus the profiles of all generated pages'''
+    def __init__(self):
+        super().__init__("build")
+        self.pages = []
+
+    def add_page(self, page: Profile) -> None:
+        self.pages.append(page)
+
+    def page_totals(self) -> dict:
+        totals = {}
+        for page in self.pages:
+            for name in page.wall:
+                total = totals.setdefault(name, {"wall": 0.0, "cpu": 0.0})
+                total["wall"] += page.wall[name]
+                total["cpu"] += page.cpu[name]
+        names = [name for name in PAGE_STAGES if name in totals] + sorted(set(totals).difference(PAGE_STAGES))
+        return {name: totals[name] for name in names}
+
+    def report(self, slowest: int = 10, stats: BuildStats | None = None) -> dict:
+        pages = sorted(self.pages, key=lambda page: page.total_wall(), reverse=True)
+        report = {
+            "build": self.to_dict(),
+            "pages": len(self.pages),
+            "nodes": sum(page.nodes for page in self.pages),
+            "page_stages": self.page_totals(),
+            "slowest_pages": [page.to_dict() for page in pages[:slowest]],
+        }
+        if stats is not None:
+            report["stats"] = stats.to_dict()
+        return report
+
+    def write_report(self, path: str, stats: BuildStats | None = None, slowest: int = 10) -> None:
+        with open(path, 'w') as file:
+            json.dump(self.report(slowest, stats), file, indent=1)
+
+    def summary(self) -> str:
+        report = self.report(slowest=5)
+        lines = [f"Generated {report['pages']} pages with {report['nodes']} html nodes"]
+        for name, total in report["page_stages"].items():
+            lines.append(f"  {name:<10} {total['wall'] * 1000:>10.1f} ms wall {total['cpu'] * 1000:>10.1f} ms cpu")
+        lines.append("Slowest pages:")
+        for page in report["slowest_pages"]:
+            lines.append(f"  {page['wall'] * 1000:>10.1f} ms  {page['name']}")
+        return "\n".join(lines)
@@ -0,0 +1,117 @@
+import os
+import glob
+import time
+import shutil
+import hashlib
+import tempfile
+
+from manifest import hash_file, generator_version
+
+# Temporary files of `store` older than this were left behind by a crashed build, younger ones may still be written
+STALE_TMP_AGE_NS = 3600 * 10**9
+
+
+class RenderCache():
+    '''
+    Content addressed directory of rendered pages, keyed by the markdown, the template and the generator version.
+    Entries are written atomically and never modified, so several builds can share one directory.
+    The cache is best effort: a directory that cannot be read or written, e.g. a full disk, only costs hits, never pages.
+    '''
+    def __init__(self, path: str, max_bytes: int = 512 << 20):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.errors = 0
+
+    def __repr__(self) -> str:
+        return f"RenderCache('{self.path}', hits: {self.hits}, misses: {self.misses}, errors: {self.errors})"
+
+    def key(self, markdown_path: str, template_digest: str) -> str:
+        digest = hashlib.sha256()
+        for part in (generator_version(), template_digest, hash_file(markdown_path)):
+            digest.update(part.encode())
+            digest.update(b"\0")
+        return digest.hexdigest()
+
+    def entry_path(self, key: str) -> str:
+        return os.path.join(self.path, key[:2], key + ".html")
+
+    def read(self, key: str) -> str | None:
+        '''Returns the cached page, if there is one'''
+        entry_path = self.entry_path(key)
+        try:
+            with open(entry_path, 'r') as file:
+                html = file.read()
+            # The modification time tracks the last use for eviction
+            os.utime(entry_path)
+        except FileNotFoundError:
+            # Missing, or evicted by another build in the meantime
+            self.misses += 1
+            return None
+        except OSError:
+            # The page is rendered instead
+            self.misses += 1
+            self.errors += 1
+            return None
+        self.hits += 1
+        return html
+
+    def store(self, key: str, page_path: str) -> bool:
+        '''Stores a written page, returns False if the cache directory could not be written'''
+        entry_path = self.entry_path(key)
+        try:
+            os.makedirs(os.path.dirname(entry_path), exist_ok=True)
+            # Readers only ever see complete entries, os.replace is atomic on the same file system
+            fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(entry_path), suffix=".tmp")
+        except OSError:
+            self.errors += 1
+            return False
+        try:
+            with os.fdopen(fd, 'wb') as file, open(page_path, 'rb') as page:
+                shutil.copyfileobj(page, file)
+            os.replace(tmp_path, entry_path)
+        except BaseException as exception:
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+            if not isinstance(exception, OSError):
+                raise
+            self.errors += 1
+            return False
+        return True
+
+    def trim(self) -> int:
+        '''
+        Removes the temporary files of crashed builds and the least recently used entries until the cache fits into `max_bytes`.
+        Returns the number of removed entries. Temporary files of stores in progress count towards the size, but are kept.
+        '''
+        entries = []
+        total = 0
+        stale_before = time.time_ns() - STALE_TMP_AGE_NS
+        for entry_path in glob.glob(os.path.join(self.path, "*", "*.html")) + glob.glob(os.path.join(self.path, "*", "*.tmp")):
+            try:
+                stat = os.stat(entry_path)
+                if entry_path.endswith(".tmp"):
+                    if stat.st_mtime_ns < stale_before:
+                        os.remove(entry_path)
+                    else:
+                        total += stat.st_size
+                    continue
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime_ns, stat.st_size, entry_path))
+            total += stat.st_size
+
+        removed = 0
+        for _, size, entry_path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(entry_path)
+                removed += 1
+            except FileNotFoundError:
+                pass
+            total -= size
+        return removed
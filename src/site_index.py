@@ -0,0 +1,138 @@
+import os
+import json
+import hashlib
+import datetime
+
+from typing import Iterable
+from email.utils import format_datetime
+from htmlnode import escape_text
+from markdown_converter import extract_markdown_heading, iter_markdown_blocks, markdown_block_to_html, node_text
+from output import write_if_changed
+from plan import BuildPlan
+
+# Pages below this content directory are the posts of the feed
+FEED_DIR = "blog"
+# Length of the plain text used as the description of a feed item
+DESCRIPTION_LENGTH = 280
+
+def join_text(texts: Iterable[str]) -> str:
+    '''Joins the plain text of the blocks of a page, with whitespace collapsed'''
+    return " ".join(" ".join(texts).split())
+
+def markdown_info(markdown: str) -> tuple[str, str]:
+    '''Returns the title and the plain text of a page, for pages whose html is not rendered'''
+    lines = markdown.split("\n")
+    return extract_markdown_heading(lines), join_text(node_text(markdown_block_to_html(block)) for block in iter_markdown_blocks(lines))
+
+
+def text_hash(text: str) -> str:
+    return hashlib.sha256(text.encode()).hexdigest()
+
+def page_path(src_path: str, content_dir: str) -> str:
+    '''Returns the path of a page below the base path, e.g. `blog/tom/` for `content/blog/tom/index.md`'''
+    path = os.path.relpath(src_path, content_dir).replace(os.sep, "/")
+    if path == "index.md":
+        return ""
+    if path.endswith("/index.md"):
+        return path.removesuffix("index.md")
+    return path.removesuffix(".md") + ".html"
+
+def is_post(path: str) -> bool:
+    '''Returns whether a page path is a post of the feed, e.g. `blog/tom/`, but not the landing page `blog/` listing the posts'''
+    return path.startswith(FEED_DIR + "/") and path != FEED_DIR + "/"
+
+
+class SiteIndex():
+    '''
+    Title and plain text of every page, collected while the pages are rendered.
+    Written as `sitemap.xml`, an RSS feed of the pages below `content/blog/` and a json search index at the end of the build.
+    '''
+    def __init__(self, site_url: str, base_path: str = "/", pages: dict[str, dict] | None = None):
+        self.site_url = site_url.rstrip("/")
+        self.base_path = base_path
+        self.pages = dict(pages or {})
+
+    def __repr__(self) -> str:
+        return f"SiteIndex('{self.site_url}', pages: {len(self.pages)})"
+
+    def add(self, src_path: str, title: str, text: str) -> None:
+        self.pages[src_path] = {"title": title, "text": text}
+
+    def to_dict(self) -> dict[str, dict]:
+        '''Returns the title and a hash of the text of every page for the manifest, the text itself is kept in the search index'''
+        return {src_path: {"title": page["title"], "hash": text_hash(page["text"])} for src_path, page in self.pages.items()}
+
+    @staticmethod
+    def read_texts(dest_dir: str) -> dict[str, str]:
+        '''Returns the text of every page by its url from the search index of the last build, or nothing if it is missing or unreadable'''
+        try:
+            with open(os.path.join(dest_dir, "search_index.json"), 'r') as file:
+                return {page["url"]: page["text"] for page in json.load(file)}
+        except (FileNotFoundError, json.JSONDecodeError, KeyError, TypeError):
+            return {}
+
+    def restore(self, src_path: str, content_dir: str, entry: dict | None, texts: dict[str, str]) -> bool:
+        '''
+        Adds a page that is not rendered again from its manifest `entry` and the `texts` of the last search index.
+        Returns False if either is missing or the text does not match the hash, then the page has to be rendered.
+        '''
+        if entry is None:
+            return False
+        text = texts.get(self.base_path + page_path(src_path, content_dir))
+        if text is None or text_hash(text) != entry.get("hash"):
+            return False
+        self.add(src_path, entry["title"], text)
+        return True
+
+    @staticmethod
+    def outputs(dest_dir: str) -> set[str]:
+        return {os.path.join(dest_dir, name) for name in ("sitemap.xml", "feed.xml", "search_index.json")}
+
+    def entries(self, plan: BuildPlan) -> list[tuple[str, str, datetime.datetime, dict]]:
+        '''Returns (source, url, modification time, page) of the indexed pages of a build, in the order of its pages'''
+        entries = []
+        for src_path, _ in plan.pages:
+            page = self.pages.get(src_path)
+            if page is not None:
+                mtime = datetime.datetime.fromtimestamp(plan.sources[src_path][0] / 1e9, datetime.timezone.utc)
+                entries.append((src_path, self.base_path + page_path(src_path, plan.content_dir), mtime, page))
+        return entries
+
+    def write(self, plan: BuildPlan) -> int:
+        '''Writes the sitemap, the feed and the search index of a build to its output directory, returns the number of changed files'''
+        entries = self.entries(plan)
+        sitemap_path, feed_path, search_index_path = (os.path.join(plan.dest_dir, name) for name in ("sitemap.xml", "feed.xml", "search_index.json"))
+        written = write_if_changed(sitemap_path, self.sitemap(entries))
+        written += write_if_changed(feed_path, self.feed(entries, plan.content_dir))
+        written += write_if_changed(search_index_path, self.search_index(entries))
+        return written
+
+    def sitemap(self, entries: list[tuple]) -> str:
+        lines = ['<?xml version="1.0" encoding="UTF-8"?>', '<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">']
+        for _, url, mtime, _ in entries:
+            lines.append(f"<url><loc>{escape_text(self.site_url + url)}</loc><lastmod>{mtime.date().isoformat()}</lastmod></url>")
+        lines.append("</urlset>")
+        return "\n".join(lines) + "\n"
+
+    def feed(self, entries: list[tuple], content_dir: str) -> str:
+        '''Returns an RSS 2.0 feed of the posts below `FEED_DIR`, newest first, titled after the home page'''
+        home = next((page for _, url, _, page in entries if url == self.base_path), None)
+        title = escape_text(home["title"] if home is not None else self.site_url)
+        lines = [
+            '<?xml version="1.0" encoding="UTF-8"?>',
+            '<rss version="2.0"><channel>',
+            f"<title>{title}</title><link>{escape_text(self.site_url + self.base_path)}</link><description>{title}</description>",
+        ]
+        posts = [entry for entry in entries if is_post(page_path(entry[0], content_dir))]
+        for _, url, mtime, page in sorted(posts, key=lambda entry: entry[2], reverse=True):
+            link = escape_text(self.site_url + url)
+            description = page["text"][:DESCRIPTION_LENGTH]
+            lines.append(
+                f"<item><title>{escape_text(page['title'])}</title><link>{link}</link><guid>{link}</guid>"
+                f"<pubDate>{format_datetime(mtime)}</pubDate><description>{escape_text(description)}</description></item>"
+            )
+        lines.append("</channel></rss>")
+        return "\n".join(lines) + "\n"
+
+    def search_index(self, entries: list[tuple]) -> str:
+        return json.dumps([{"url": url, "title": page["title"], "text": page["text"]} for _, url, _, page in entries], ensure_ascii=False)
@@ -0,0 +1,34 @@
+class BuildStats():
+    '''Counters of a build, e.g. cache hits, summed over all pages and worker processes'''
+    def __init__(self):
+        self.counters = {}
+
+    def __repr__(self) -> str:
+        return f"BuildStats({self.counters})"
+
+    def add(self, name: str, amount: int = 1) -> None:
+        self.counters[name] = self.counters.get(name, 0) + amount
+
+    def merge(self, counters: dict[str, int]) -> None:
+        for name, amount in counters.items():
+            self.add(name, amount)
+
+    def get(self, name: str) -> int:
+        return self.counters.get(name, 0)
+
+    def to_dict(self) -> dict[str, int]:
+        return dict(sorted(self.counters.items()))
+
+    def summary(self) -> str:
+        lines = []
+        for name, label in (("block_cache", "Block cache"), ("render_cache", "Render cache")):
+            hits, misses = self.get(f"{name}_hits"), self.get(f"{name}_misses")
+            if hits + misses > 0:
+                lines.append(f"{label}: {hits} hits, {misses} misses ({hits / (hits + misses):.0%} hit rate)")
+        if any(name.startswith("ipc_") for name in self.counters):
+            lines.append(f"IPC: {self.get('ipc_bytes_sent') / 1000:.1f} KB sent to workers, {self.get('ipc_bytes_received') / 1000:.1f} KB received")
+        if any(name.startswith("files_") for name in self.counters):
+            lines.append(f"Output: {self.get('files_written')} files written, {self.get('files_skipped')} unchanged, {self.get('files_removed')} removed")
+        if self.get("files_compressed") > 0:
+            lines.append(f"Compression: {self.get('files_compressed')} compressed files written")
+        return "\n".join(lines)
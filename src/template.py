@@ -0,0 +1,57 @@
+import re
+import json
+import hashlib
+
+from typing import Callable
+
+SLOT_PATTERN = re.compile(r"\{\{ (\w+) \}\}")
+# Absolute urls of links, stylesheets, scripts and images, protocol relative urls like `//cdn.example.com/lib.js` point to other hosts
+URL_ATTRIBUTE_PATTERN = re.compile(r'(href|src)="(/(?!/)[^"]*)"')
+
+
+class Template():
+    '''
+    HTML template split into static segments and named `{{ Slot }}` placeholders.
+    The base path and the fingerprinted names of `asset_urls` are applied to the static segments once, when the template is compiled.
+    '''
+    def __init__(self, text: str, base_path: str = "/", path: str | None = None, asset_urls: dict[str, str] | None = None):
+        self.asset_urls = dict(asset_urls or {})
+        # Absolute urls the template refers to, before the base path and fingerprinted names are applied
+        self.urls = sorted({url for _, url in URL_ATTRIBUTE_PATTERN.findall(text)})
+        text = URL_ATTRIBUTE_PATTERN.sub(lambda match: f'{match[1]}="{base_path + self.asset_urls.get(match[2], match[2])[1:]}"', text)
+        # Identifies the compiled template, pages are rendered with the base path and the asset urls as well
+        self.digest = hashlib.sha256(f"{base_path}\0{text}\0{json.dumps(self.asset_urls, sort_keys=True)}".encode()).hexdigest()
+        parts = SLOT_PATTERN.split(text)
+        self.segments = parts[0::2]
+        self.slots = parts[1::2]
+        self.base_path = base_path
+        self.path = path
+
+    def __repr__(self) -> str:
+        return f"Template({self.path}, slots: {self.slots})"
+
+    @classmethod
+    def load(cls, path: str, base_path: str = "/", asset_urls: dict[str, str] | None = None) -> "Template":
+        with open(path, 'r') as file:
+            return cls(file.read(), base_path, path, asset_urls)
+
+    def render(self, values: dict[str, str | Callable]) -> str:
+        buffer = []
+        self.write(buffer.append, values)
+        return "".join(buffer)
+
+    def write(self, write: Callable[[str], object], values: dict[str, str | Callable]) -> None:
+        '''
+        Passes the rendered template piece by piece to `write`.
+        A slot value is either a string or a function that writes the slot content itself, e.g. `node.write_html`.
+        '''
+        write(self.segments[0])
+        for slot, segment in zip(self.slots, self.segments[1:]):
+            if slot not in values:
+                raise ValueError(f"missing value for template slot '{slot}'")
+            value = values[slot]
+            if isinstance(value, str):
+                write(value)
+            else:
+                value(write)
+            write(segment)
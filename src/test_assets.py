@@ -0,0 +1,78 @@
+import os
+import unittest
+
+from assets import scan_files, sync_dir
+from test_helpers import TempDirTestCase
+
+class TestAssets(TempDirTestCase):
+    def setUp(self):
+        super().setUp()
+        self.src_dir = self.path("static")
+        self.dst_dir = self.path("docs")
+        self.write("static/index.css", "body {}")
+        self.write("static/images/logo.png", "png")
+
+    def test_scan_files(self):
+        files = scan_files(self.src_dir)
+
+        self.assertListEqual(sorted(files), [self.path("static", "images", "logo.png"), self.path("static", "index.css")])
+        self.assertEqual(files[self.path("static", "index.css")][1], len("body {}"))
+
+    def test_first_sync(self):
+        files, copied, removed = sync_dir(self.src_dir, self.dst_dir)
+
+        self.assertListEqual(files, [os.path.join("images", "logo.png"), "index.css"])
+        self.assertEqual((copied, removed), (2, 0))
+        self.assertEqual(self.read("docs/images/logo.png"), "png")
+
+    def test_unchanged(self):
+        sync_dir(self.src_dir, self.dst_dir)
+        _, copied, removed = sync_dir(self.src_dir, self.dst_dir)
+
+        self.assertEqual((copied, removed), (0, 0))
+
+    def test_changed_file(self):
+        sync_dir(self.src_dir, self.dst_dir)
+        self.write("static/index.css", "body { margin: 0 }")
+        _, copied, _ = sync_dir(self.src_dir, self.dst_dir)
+
+        self.assertEqual(copied, 1)
+        self.assertEqual(self.read("docs/index.css"), "body { margin: 0 }")
+
+    def test_removed_file(self):
+        files, _, _ = sync_dir(self.src_dir, self.dst_dir)
+        self.write("docs/index.html", "generated page")
+        os.remove(self.path("static", "index.css"))
+        files, _, removed = sync_dir(self.src_dir, self.dst_dir, files)
+
+        self.assertEqual(removed, 1)
+        self.assertFalse(os.path.exists(self.path("docs", "index.css")))
+        # Files that were not synced before are left alone
+        self.assertTrue(os.path.exists(self.path("docs", "index.html")))
+
+    def test_dst_paths(self):
+        files, _, _ = sync_dir(self.src_dir, self.dst_dir)
+        files, copied, removed = sync_dir(self.src_dir, self.dst_dir, files, dst_paths={"index.css": "index.3f2a9c1d.css"})
+
+        self.assertListEqual(files, [os.path.join("images", "logo.png"), "index.css", "index.3f2a9c1d.css"])
+        self.assertEqual((copied, removed), (1, 0))
+        self.assertEqual(self.read("docs/index.3f2a9c1d.css"), "body {}")
+        # The plain name stays for urls that are not rewritten, e.g. in css or on other sites
+        self.assertEqual(self.read("docs/index.css"), "body {}")
+
+        files, copied, removed = sync_dir(self.src_dir, self.dst_dir, files, dst_paths={"index.css": "index.0a1b2c3d.css"})
+        self.assertEqual((copied, removed), (1, 1))
+        self.assertFalse(os.path.exists(self.path("docs", "index.3f2a9c1d.css")))
+
+    def test_hardlink(self):
+        sync_dir(self.src_dir, self.dst_dir, hardlink=True)
+
+        self.assertTrue(os.path.samefile(self.path("static", "index.css"), self.path("docs", "index.css")))
+
+    def test_missing_dir(self):
+        with self.assertRaises(IsADirectoryError):
+            sync_dir(self.path("missing"), self.dst_dir)
+
+
+if __name__ == "__main__":
+    unittest.main()
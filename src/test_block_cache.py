@@ -0,0 +1,46 @@
+import unittest
+
+from block_cache import BlockCache
+
+class TestBlockCache(unittest.TestCase):
+    def test_get_put(self):
+        cache = BlockCache(2)
+        self.assertIsNone(cache.get("text"))
+        cache.put("text", "<p>text</p>")
+
+        self.assertEqual(cache.get("text"), ("<p>text</p>", None))
+        self.assertEqual((cache.hits, cache.misses), (1, 1))
+
+    def test_put_text(self):
+        cache = BlockCache(2)
+        cache.put("`a_b`", "<p><code>a_b</code></p>", text="a_b")
+
+        self.assertEqual(cache.get("`a_b`"), ("<p><code>a_b</code></p>", "a_b"))
+
+    def test_evicts_least_recently_used(self):
+        cache = BlockCache(2)
+        cache.put("a", "<p>a</p>")
+        cache.put("b", "<p>b</p>")
+        cache.get("a")
+        cache.put("c", "<p>c</p>")
+
+        self.assertIsNone(cache.get("b"))
+        self.assertEqual(cache.get("a"), ("<p>a</p>", None))
+        self.assertEqual(cache.get("c"), ("<p>c</p>", None))
+
+    def test_disabled(self):
+        cache = BlockCache(0)
+        cache.put("a", "<p>a</p>")
+
+        self.assertIsNone(cache.get("a"))
+        self.assertEqual(len(cache.entries), 0)
+
+    def test_long_block(self):
+        cache = BlockCache(2, max_block_length=4)
+        cache.put("long block", "<p>long block</p>")
+
+        self.assertIsNone(cache.get("long block"))
+
+
+if __name__ == "__main__":
+    unittest.main()
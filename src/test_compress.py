@@ -0,0 +1,109 @@
+import os
+import gzip
+import unittest
+
+from compress import compress_dir, compress_file, compressed_outputs, plan_compression
+from test_helpers import TempDirTestCase
+
+class TestCompress(TempDirTestCase):
+    def setUp(self):
+        super().setUp()
+        self.write("docs/index.html", "<p>home</p>" * 100)
+        self.write("docs/index.css", "body {}")
+        self.write("docs/images/logo.png", "png")
+        self.write("docs/release.tar.gz", "archive")
+
+    def test_compress_dir(self):
+        self.assertEqual(compress_dir(self.path("docs"), {"gzip": 9}), (2, 0))
+
+        with gzip.open(self.path("docs", "index.html.gz"), 'rt') as file:
+            self.assertEqual(file.read(), "<p>home</p>" * 100)
+        self.assertEqual(os.stat(self.path("docs", "index.html.gz")).st_mtime_ns, os.stat(self.path("docs", "index.html")).st_mtime_ns)
+        self.assertFalse(os.path.exists(self.path("docs", "images", "logo.png.gz")))
+        self.assertFalse(os.path.exists(self.path("docs", "release.tar.gz.gz")))
+
+    def test_compress_dir_only_changed(self):
+        compress_dir(self.path("docs"), {"gzip": 9})
+        self.assertEqual(compress_dir(self.path("docs"), {"gzip": 9}), (0, 0))
+
+        self.write("docs/index.css", "body { margin: 0 }")
+        os.utime(self.path("docs", "index.css"), ns=(0, 0))
+        self.assertEqual(compress_dir(self.path("docs"), {"gzip": 9}), (1, 0))
+        with gzip.open(self.path("docs", "index.css.gz"), 'rt') as file:
+            self.assertEqual(file.read(), "body { margin: 0 }")
+
+    def test_compress_dir_removes_orphans(self):
+        compress_dir(self.path("docs"), {"gzip": 9})
+        os.remove(self.path("docs", "index.css"))
+
+        self.assertEqual(compress_dir(self.path("docs"), {"gzip": 9}), (0, 1))
+        self.assertFalse(os.path.exists(self.path("docs", "index.css.gz")))
+        self.assertTrue(os.path.exists(self.path("docs", "release.tar.gz")))
+
+    def test_compress_dir_changed_level(self):
+        compress_dir(self.path("docs"), {"gzip": 1})
+        self.assertEqual(compress_dir(self.path("docs"), {"gzip": 9}, previous_methods={"gzip": 1}), (2, 0))
+        self.assertEqual(compress_dir(self.path("docs"), {"gzip": 9}, previous_methods={"gzip": 9}), (0, 0))
+        # Siblings of an unknown level are written again
+        self.assertEqual(compress_dir(self.path("docs"), {"gzip": 9}, previous_methods={}), (2, 0))
+
+    def test_compress_dir_dropped_method(self):
+        compress_dir(self.path("docs"), {"gzip": 9})
+        self.write("docs/data.json.br", "own")
+
+        self.assertEqual(compress_dir(self.path("docs"), {}, static_paths={self.path("docs", "data.json.br")}, previous_methods={"gzip": 9}), (0, 2))
+        self.assertFalse(os.path.exists(self.path("docs", "index.html.gz")))
+        self.assertTrue(os.path.exists(self.path("docs", "release.tar.gz")))
+        self.assertTrue(os.path.exists(self.path("docs", "data.json.br")))
+
+    def test_compress_file_failure_removes_tmp_file(self):
+        # A directory in place of the sibling fails the replace
+        os.makedirs(self.path("docs", "index.css.gz", "dir"))
+
+        with self.assertRaises(OSError):
+            compress_file(self.path("docs", "index.css"), 0, {"gzip": 9})
+        self.assertListEqual(sorted(os.listdir(self.path("docs"))), ["images", "index.css", "index.css.gz", "index.html", "release.tar.gz"])
+
+    def test_compress_dir_parallel(self):
+        for i in range(10):
+            self.write(f"docs/pages/{i}.html", f"<p>{i}</p>")
+
+        self.assertEqual(compress_dir(self.path("docs"), {"gzip": 1}, jobs=2), (12, 0))
+        with gzip.open(self.path("docs", "pages", "7.html.gz"), 'rt') as file:
+            self.assertEqual(file.read(), "<p>7</p>")
+
+    def test_compress_reproducible(self):
+        compress_dir(self.path("docs"), {"gzip": 9})
+        with open(self.path("docs", "index.css.gz"), 'rb') as file:
+            first = file.read()
+        os.remove(self.path("docs", "index.css.gz"))
+        compress_dir(self.path("docs"), {"gzip": 9})
+        with open(self.path("docs", "index.css.gz"), 'rb') as file:
+            self.assertEqual(file.read(), first)
+
+    def test_compress_dir_keeps_static_files(self):
+        # Precompressed files of the static directory are neither orphans nor rewritten
+        self.write("docs/data.json.gz", "archive")
+        self.write("docs/feed.xml", "<rss></rss>")
+        self.write("docs/feed.xml.gz", "own")
+        static_paths = {self.path("docs", "data.json.gz"), self.path("docs", "feed.xml.gz")}
+
+        self.assertEqual(compress_dir(self.path("docs"), {"gzip": 9}, static_paths=static_paths), (2, 0))
+        self.assertEqual(self.read("docs", "data.json.gz"), "archive")
+        self.assertEqual(self.read("docs", "feed.xml.gz"), "own")
+
+    def test_plan_compression_missing_method(self):
+        files = {"index.html": (1, 10), "index.html.gz": (1, 5)}
+        stale, orphans = plan_compression(files, {"gzip": 9, "br": 11})
+
+        self.assertListEqual(stale, [("index.html", 1, {"br": 11})])
+        self.assertListEqual(orphans, [])
+
+    def test_compressed_outputs(self):
+        self.assertSetEqual(
+            compressed_outputs({"docs/index.html", "docs/logo.png"}, {"gzip": 9, "br": 11}),
+            {"docs/index.html.gz", "docs/index.html.br"},
+        )
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,65 @@
+import unittest
+
+from depgraph import DependencyGraph, scan_links, scan_page, normalize_url
+from test_helpers import TempDirTestCase
+
+class TestDependencyGraph(TempDirTestCase):
+    def setUp(self):
+        super().setUp()
+        self.graph = DependencyGraph("content")
+        self.graph.add_page("content/index.md", "template.html", ["/blog/tom", "/contact"])
+        self.graph.add_page("content/blog/tom/index.md", "template.html", ["/"])
+        self.graph.add_page("content/contact/index.md", "template.html", [])
+
+    def test_normalize_url(self):
+        self.assertEqual(normalize_url("/"), "/")
+        self.assertEqual(normalize_url("/blog/tom/"), "/blog/tom")
+        self.assertEqual(normalize_url("/blog/tom/index.html"), "/blog/tom")
+
+    def test_scan_links(self):
+        path = self.write("index.md", "[Home](/) and [Tom](/blog/tom/#top)\n\n![Image](/images/tom.png) [External](https://boot.dev)")
+
+        self.assertListEqual(scan_links(path), ["/", "/blog/tom"])
+
+    def test_scan_page(self):
+        path = self.write("index.md", "[Home](/) and [Notes](/notes.html)\n\n![Image](/images/tom.png) [Slides](/files/talk.pdf#page=2)")
+
+        self.assertEqual(scan_page(path), (["/", "/files/talk.pdf", "/notes.html"], ["/files/talk.pdf", "/images/tom.png"]))
+
+    def test_asset_dependents(self):
+        self.graph.add_page("content/contact/index.md", "template.html", [], ["/images/tom.png"])
+
+        self.assertListEqual(self.graph.dependents("/images/tom.png"), ["content/contact/index.md"])
+        self.assertListEqual(DependencyGraph("content", self.graph.to_dict()).dependents("/images/tom.png"), ["content/contact/index.md"])
+
+    def test_page_url(self):
+        self.assertEqual(self.graph.page_url("content/index.md"), "/")
+        self.assertEqual(self.graph.page_url("content/blog/tom/index.md"), "/blog/tom")
+        self.assertEqual(self.graph.page_url("./content/notes.md"), "/notes.html")
+
+    def test_dependents(self):
+        self.assertListEqual(self.graph.dependents("template.html"), ["content/blog/tom/index.md", "content/contact/index.md", "content/index.md"])
+        self.assertListEqual(self.graph.dependents("content/blog/tom/index.md"), ["content/index.md"])
+        self.assertListEqual(self.graph.dependents("content/missing/index.md"), [])
+
+    def test_what_rebuilds(self):
+        self.assertListEqual(self.graph.what_rebuilds("./content/contact/index.md"), ["content/contact/index.md"])
+        # Pages linking to an added or removed page render the same html
+        self.assertListEqual(self.graph.what_rebuilds("./content/contact/index.md", "added"), ["content/contact/index.md"])
+        self.assertListEqual(self.graph.what_rebuilds("content/contact/index.md", "removed"), [])
+        self.assertListEqual(self.graph.what_rebuilds("template.html"), self.graph.dependents("template.html"))
+
+    def test_linking_pages(self):
+        self.assertListEqual(self.graph.linking_pages("./content/contact/index.md"), ["content/index.md"])
+        self.assertListEqual(self.graph.linking_pages("content/index.md"), ["content/blog/tom/index.md"])
+        self.assertListEqual(self.graph.linking_pages("content/missing/index.md"), [])
+
+    def test_to_dict(self):
+        graph = DependencyGraph("content", self.graph.to_dict())
+
+        self.assertEqual(graph.to_dict(), self.graph.to_dict())
+        self.assertListEqual(graph.dependents("content/index.md"), ["content/blog/tom/index.md"])
+
+
+if __name__ == "__main__":
+    unittest.main()
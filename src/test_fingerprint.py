@@ -0,0 +1,50 @@
+import os
+import unittest
+
+from assets import scan_files
+from fingerprint import fingerprinted_path, fingerprint_assets, asset_paths, asset_urls
+from manifest import hash_file
+from test_helpers import TempDirTestCase
+
+class TestFingerprint(TempDirTestCase):
+    def setUp(self):
+        super().setUp()
+        self.static_dir = self.path("static")
+        self.write("static/index.css", "body {}")
+        self.write("static/images/logo.png", "png")
+        self.write("static/robots.txt", "User-agent: *")
+
+    def test_fingerprinted_path(self):
+        self.assertEqual(fingerprinted_path("index.css", "3f2a9c1d00ff"), "index.3f2a9c1d.css")
+        self.assertEqual(fingerprinted_path(os.path.join("images", "tom.min.png"), "3f2a9c1d00ff"), os.path.join("images", "tom.min.3f2a9c1d.png"))
+
+    def test_fingerprint_assets(self):
+        fingerprints = fingerprint_assets(scan_files(self.static_dir), self.static_dir)
+
+        self.assertListEqual(sorted(fingerprints), [os.path.join("images", "logo.png"), "index.css"])
+        self.assertEqual(fingerprints["index.css"]["hash"], hash_file(self.path("static", "index.css")))
+
+    def test_fingerprint_assets_reuses_hashes(self):
+        files = scan_files(self.static_dir)
+        previous = fingerprint_assets(files, self.static_dir)
+        previous["index.css"]["hash"] = "recorded"
+
+        self.assertEqual(fingerprint_assets(files, self.static_dir, previous)["index.css"]["hash"], "recorded")
+
+        self.write("static/index.css", "body { margin: 0 }")
+        fingerprints = fingerprint_assets(scan_files(self.static_dir), self.static_dir, previous)
+        self.assertEqual(fingerprints["index.css"]["hash"], hash_file(self.path("static", "index.css")))
+
+    def test_same_content_same_url(self):
+        paths = asset_paths(fingerprint_assets(scan_files(self.static_dir), self.static_dir))
+        os.utime(self.path("static", "index.css"), ns=(0, 0))
+
+        self.assertEqual(asset_paths(fingerprint_assets(scan_files(self.static_dir), self.static_dir)), paths)
+
+    def test_asset_urls(self):
+        paths = {"index.css": "index.3f2a9c1d.css", os.path.join("images", "logo.png"): os.path.join("images", "logo.0a1b2c3d.png")}
+
+        self.assertDictEqual(asset_urls(paths), {"/index.css": "/index.3f2a9c1d.css", "/images/logo.png": "/images/logo.0a1b2c3d.png"})
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,25 @@
+import os
+import tempfile
+import unittest
+
+
+class TempDirTestCase(unittest.TestCase):
+    '''Test case with a temporary directory, removed after each test, and helpers for the files in it'''
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp_dir.cleanup)
+
+    def path(self, *names):
+        return os.path.join(self.tmp_dir.name, *names)
+
+    def write(self, name, text):
+        path = self.path(name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'w') as file:
+            file.write(text)
+        return path
+
+    def read(self, *names):
+        # Absolute paths are read as they are
+        with open(self.path(*names), 'r') as file:
+            return file.read()
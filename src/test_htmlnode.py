@@ -1,6 +1,7 @@
+import io
 import unittest
 
-from htmlnode import HTMLNode, LeafNode, ParentNode
+from htmlnode import HTMLNode, LeafNode, ParentNode, escape_text, escape_attribute
 
 class TestHTMLNode(unittest.TestCase):
     ##################################
@@ -46,6 +47,20 @@ class TestHTMLNode(unittest.TestCase):
 
         self.assertEqual(node.props_to_html(), ' target="_blank" href="https://www.boot.dev"')
 
+    def test_props_to_html_escaped(self):
+        node = HTMLNode("img", "", None, {'src': '/a.png?x=1&y=2', 'alt': 'Say "hi" <3'})
+
+        self.assertEqual(node.props_to_html(), ' src="/a.png?x=1&amp;y=2" alt="Say &quot;hi&quot; &lt;3"')
+
+    def test_escape_text(self):
+        self.assertEqual(escape_text("plain text"), "plain text")
+        self.assertEqual(escape_text("a < b && c > d"), "a &lt; b &amp;&amp; c &gt; d")
+        self.assertEqual(escape_text("&lt;"), "&amp;lt;")
+        self.assertEqual(escape_text('"quoted"'), '"quoted"')
+
+    def test_escape_attribute(self):
+        self.assertEqual(escape_attribute('"a" & <b>'), "&quot;a&quot; &amp; &lt;b&gt;")
+
 
     ##################################
     # LeafNode
@@ -75,6 +90,21 @@ class TestHTMLNode(unittest.TestCase):
 
         self.assertEqual(node.to_html(), 'plain text')
 
+    def test_leaf_to_html_escaped(self):
+        self.assertEqual(LeafNode("code", "<a href='x'>").to_html(), "<code>&lt;a href='x'&gt;</code>")
+        self.assertEqual(LeafNode(None, "< Back & forth").to_html(), "&lt; Back &amp; forth")
+
+    def test_leaf_to_html_void(self):
+        self.assertEqual(LeafNode("hr", "").to_html(), "<hr>")
+        self.assertEqual(LeafNode("img", "", {"src": "/a.png", "alt": "A"}).to_html(), '<img src="/a.png" alt="A">')
+
+    def test_leaf_to_html_same_shape(self):
+        # Nodes with the same tag share the cached tag strings, their attributes are formatted per node
+        first = LeafNode("a", "one", {"href": "/1"})
+        second = LeafNode("a", "two", {"href": "/2"})
+
+        self.assertEqual(first.to_html() + second.to_html(), '<a href="/1">one</a><a href="/2">two</a>')
+
     def test_leaf_to_html_exept(self):
         node = LeafNode("p", None)
 
@@ -119,6 +149,30 @@ class TestHTMLNode(unittest.TestCase):
             '<a target="_blank" href="https://www.boot.dev"><span>child</span></a>'
         )
 
+    def test_write_html_stream(self):
+        child_node = ParentNode("li", [LeafNode("b", "bold"), LeafNode(None, " item")])
+        parent_node = ParentNode("ul", [child_node, child_node])
+        stream = io.StringIO()
+        parent_node.write_html(stream.write)
+
+        self.assertEqual(stream.getvalue(), "<ul><li><b>bold</b> item</li><li><b>bold</b> item</li></ul>")
+
+    def test_to_html_many_children(self):
+        parent_node = ParentNode("ol", [ParentNode("li", [LeafNode(None, str(i))]) for i in range(100000)])
+        html = parent_node.to_html()
+
+        self.assertTrue(html.startswith("<ol><li>0</li><li>1</li>"))
+        self.assertTrue(html.endswith("<li>99999</li></ol>"))
+
+    def test_no_instance_dict(self):
+        leaf_node = LeafNode("b", "bold")
+        parent_node = ParentNode("p", [leaf_node])
+
+        self.assertFalse(hasattr(leaf_node, "__dict__"))
+        self.assertFalse(hasattr(parent_node, "__dict__"))
+        with self.assertRaises(AttributeError):
+            leaf_node.unknown = "value"
+
     def test_to_html_no_children(self):
         parent_node = ParentNode("div", None)
 
@@ -0,0 +1,114 @@
+import os
+import hashlib
+import unittest
+
+from manifest import MMAP_THRESHOLD, hash_file, generator_version, load_manifest, save_manifest, plan_incremental_build
+from test_helpers import TempDirTestCase
+
+class TestManifest(TempDirTestCase):
+    def setUp(self):
+        super().setUp()
+        self.src_path = self.write("index.md", "# Heading")
+        self.dst_path = self.write("index.html", "<h1>Heading</h1>")
+        self.pages = [(self.src_path, self.dst_path)]
+
+    def test_save_and_load(self):
+        path = self.path("manifest.json")
+        save_manifest(path, {"template": "abc", "pages": {}})
+
+        self.assertEqual(load_manifest(path), {"template": "abc", "pages": {}, "version": 1})
+
+    def test_hash_large_file(self):
+        text = "# Heading\n" * (MMAP_THRESHOLD // 5)
+        path = self.write("large.md", text)
+
+        self.assertEqual(hash_file(path), hashlib.sha256(text.encode()).hexdigest())
+
+    def test_load_missing(self):
+        self.assertEqual(load_manifest(self.path("missing.json")), {})
+
+    def test_load_corrupt(self):
+        path = self.write("manifest.json", "{not json")
+        self.assertEqual(load_manifest(path), {})
+
+    def test_first_build(self):
+        stale, removed, manifest = plan_incremental_build(self.pages, {}, "t", "/")
+
+        self.assertListEqual(stale, self.pages)
+        self.assertListEqual(removed, [])
+        self.assertEqual(manifest["pages"][self.src_path], {"hash": hash_file(self.src_path), "dest": self.dst_path})
+
+    def test_unchanged(self):
+        _, _, manifest = plan_incremental_build(self.pages, {}, "t", "/")
+        stale, removed, _ = plan_incremental_build(self.pages, manifest, "t", "/")
+
+        self.assertListEqual(stale, [])
+        self.assertListEqual(removed, [])
+
+    def test_changed_source(self):
+        _, _, manifest = plan_incremental_build(self.pages, {}, "t", "/")
+        self.write("index.md", "# Changed heading")
+        stale, _, _ = plan_incremental_build(self.pages, manifest, "t", "/")
+
+        self.assertListEqual(stale, self.pages)
+
+    def test_unchanged_stat(self):
+        stat = os.stat(self.src_path)
+        file_stats = {self.src_path: (stat.st_mtime_ns, stat.st_size)}
+        _, _, manifest = plan_incremental_build(self.pages, {}, "t", "/", file_stats)
+        # Same size and mtime, the source is not read again
+        self.write("index.md", "# Changed")
+        stale, _, new_manifest = plan_incremental_build(self.pages, manifest, "t", "/", file_stats)
+
+        self.assertListEqual(stale, [])
+        self.assertEqual(new_manifest["pages"][self.src_path], manifest["pages"][self.src_path])
+
+    def test_changed_stat(self):
+        stat = os.stat(self.src_path)
+        _, _, manifest = plan_incremental_build(self.pages, {}, "t", "/", {self.src_path: (stat.st_mtime_ns, stat.st_size)})
+        os.utime(self.src_path, ns=(0, 0))
+        stale, _, new_manifest = plan_incremental_build(self.pages, manifest, "t", "/", {self.src_path: (0, stat.st_size)})
+
+        # Touched but identical sources are hashed again and stay up to date
+        self.assertListEqual(stale, [])
+        self.assertEqual(new_manifest["pages"][self.src_path]["mtime"], 0)
+
+    def test_missing_output(self):
+        _, _, manifest = plan_incremental_build(self.pages, {}, "t", "/")
+        os.remove(self.dst_path)
+        stale, _, _ = plan_incremental_build(self.pages, manifest, "t", "/")
+
+        self.assertListEqual(stale, self.pages)
+
+    def test_changed_template(self):
+        _, _, manifest = plan_incremental_build(self.pages, {}, "t", "/")
+        stale, _, _ = plan_incremental_build(self.pages, manifest, "t2", "/")
+
+        self.assertListEqual(stale, self.pages)
+
+    def test_changed_base_path(self):
+        _, _, manifest = plan_incremental_build(self.pages, {}, "t", "/")
+        stale, _, _ = plan_incremental_build(self.pages, manifest, "t", "/repo/")
+
+        self.assertListEqual(stale, self.pages)
+
+    def test_changed_generator(self):
+        _, _, manifest = plan_incremental_build(self.pages, {}, "t", "/")
+        self.assertEqual(manifest["generator"], generator_version())
+        # Written by another version of the generator, or by one that did not record it yet
+        for generator in ("0" * 64, None):
+            stale, _, _ = plan_incremental_build(self.pages, dict(manifest, generator=generator), "t", "/")
+
+            self.assertListEqual(stale, self.pages)
+
+    def test_removed_source(self):
+        _, _, manifest = plan_incremental_build(self.pages, {}, "t", "/")
+        stale, removed, new_manifest = plan_incremental_build([], manifest, "t", "/")
+
+        self.assertListEqual(stale, [])
+        self.assertListEqual(removed, [self.dst_path])
+        self.assertEqual(new_manifest["pages"], {})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,10 +1,17 @@
+import io
 import unittest
 
+from block_cache import BlockCache
+
 from markdown_converter import (
     BlockType,
     markdown_to_html_nodes,
     markdown_to_blocks,
+    iter_markdown_blocks,
+    write_markdown_html,
+    convert_many,
     get_markdown_block_type,
+    classify_markdown_block,
     extract_markdown_heading,
 )
 
@@ -49,6 +56,14 @@ This paragraph is too far down
             ],
         )
 
+    def test_iter_markdown_blocks_file(self):
+        file = io.StringIO("# Heading\n\n\nFirst line\nsecond line\n\n   \n- item\n")
+        blocks = iter_markdown_blocks(file)
+
+        self.assertEqual(next(blocks), "# Heading")
+        self.assertEqual(file.tell(), len("# Heading\n\n"))
+        self.assertListEqual(list(blocks), ["First line\nsecond line", "- item"])
+
     def test_get_block_type_heading(self):
         h1 = "# This is a h1 heading"
         h2 = "## This is a h2 heading"
@@ -124,6 +139,15 @@ third"""
         self.assertEqual(get_markdown_block_type(wrong_order), BlockType.PARAGRAPH)
         self.assertEqual(get_markdown_block_type(missing_point), BlockType.PARAGRAPH)
 
+    def test_classify_block_data(self):
+        self.assertEqual(classify_markdown_block("### Heading"), (BlockType.HEADING, (3, "Heading")))
+        self.assertEqual(classify_markdown_block("```\nprint()\n```"), (BlockType.CODE, "print()"))
+        self.assertEqual(classify_markdown_block("> To be\n> or not"), (BlockType.QUOTE, "To be or not"))
+        self.assertEqual(classify_markdown_block("- - -"), (BlockType.HORIZONTAL_RULE, None))
+        self.assertEqual(classify_markdown_block("- first\n- second"), (BlockType.UNORDERED_LIST, ["first", "second"]))
+        self.assertEqual(classify_markdown_block("1. first\n2. second"), (BlockType.ORDERED_LIST, ["first", "second"]))
+        self.assertEqual(classify_markdown_block("1 first\nsecond"), (BlockType.PARAGRAPH, "1 first second"))
+
     def test_headings(self):
         md ="""
 # Heading 1
@@ -182,6 +206,21 @@ the **same** even with inline stuff
             "<div><pre><code>This is text that _should_ remain\nthe **same** even with inline stuff</code></pre></div>",
         )
 
+    def test_base_path(self):
+        md = """
+[Home](/) and ![Logo](/images/logo.png)
+
+```
+<a href="/not-a-link">
+```
+"""
+
+        html = markdown_to_html_nodes(md, "/site/").to_html()
+        self.assertEqual(
+            html,
+            '<div><p><a href="/site/">Home</a> and <img src="/site/images/logo.png" alt="Logo"></p><pre><code>&lt;a href="/not-a-link"&gt;</code></pre></div>',
+        )
+
     def test_ordered_list(self):
         md = """
 1. This is a **bold item**
@@ -213,7 +252,7 @@ the **same** even with inline stuff
         md = "---"
 
         html = markdown_to_html_nodes(md).to_html()
-        self.assertEqual(html, "<div><hr></hr></div>")
+        self.assertEqual(html, "<div><hr></div>")
 
     def test_markdown_to_html(self):
         md ="""
@@ -233,10 +272,83 @@ and a [link](www.xyz.com)
         node = markdown_to_html_nodes(md)
         html = node.to_html()
 
-        expected_result = '<div><h1>Heading</h1><hr></hr><p>Text paragraph with two <b>lines</b> and a <a href="www.xyz.com">link</a></p><hr></hr><blockquote>Quote with two <i>lines</i></blockquote></div>'
+        expected_result = '<div><h1>Heading</h1><hr><p>Text paragraph with two <b>lines</b> and a <a href="www.xyz.com">link</a></p><hr><blockquote>Quote with two <i>lines</i></blockquote></div>'
 
         self.assertEqual(html, expected_result)
 
+    def test_write_markdown_html(self):
+        md = """
+# Heading
+
+- first **item**
+- second item
+
+> Quote
+"""
+        stream = io.StringIO()
+        write_markdown_html(iter_markdown_blocks(io.StringIO(md)), stream.write)
+
+        self.assertEqual(stream.getvalue(), markdown_to_html_nodes(md).to_html())
+
+    def test_write_markdown_html_cache(self):
+        md = "Footer with a [link](/about)\n\n# Heading\n\nFooter with a [link](/about)"
+        cache = BlockCache(8)
+        stream = io.StringIO()
+        write_markdown_html(iter_markdown_blocks(io.StringIO(md)), stream.write, cache=cache)
+
+        self.assertEqual(stream.getvalue(), markdown_to_html_nodes(md).to_html())
+        self.assertEqual((cache.hits, cache.misses), (1, 2))
+
+    def test_write_markdown_html_texts(self):
+        md = "# Heading\n\n- first **item**\n- `snake_case`\n\n![A logo](/logo.png)"
+        cache = BlockCache(8)
+        for _ in range(2):
+            texts = []
+            stream = io.StringIO()
+            write_markdown_html(iter_markdown_blocks(io.StringIO(md)), stream.write, cache=cache, texts=texts)
+
+            self.assertEqual(stream.getvalue(), markdown_to_html_nodes(md).to_html())
+            self.assertListEqual(texts, ["Heading", "first item snake_case", "A logo"])
+        self.assertEqual((cache.hits, cache.misses), (3, 3))
+
+    def test_write_markdown_html_texts_of_cached_blocks(self):
+        # Blocks cached without their text get it on the next page that needs it
+        cache = BlockCache(8)
+        write_markdown_html(["Some `code`"], io.StringIO().write, cache=cache)
+        texts = []
+        write_markdown_html(["Some `code`"], io.StringIO().write, cache=cache, texts=texts)
+
+        self.assertListEqual(texts, ["Some code"])
+        self.assertEqual(cache.get("Some `code`"), ("<p>Some <code>code</code></p>", "Some code"))
+
+    def test_write_markdown_html_cache_base_path(self):
+        cache = BlockCache(8)
+        for base_path in ("/", "/site/"):
+            stream = io.StringIO()
+            write_markdown_html(["[Home](/)"], stream.write, cache=cache, base_path=base_path)
+            self.assertEqual(stream.getvalue(), f'<div><p><a href="{base_path}">Home</a></p></div>')
+
+    def test_convert_many(self):
+        documents = [f"# Page {i}\n\nShared [footer](/about)" for i in range(10)]
+        expected = [markdown_to_html_nodes(md, "/site/").to_html() for md in documents]
+        cache = BlockCache(8)
+
+        self.assertListEqual(convert_many(documents, "/site/", cache), expected)
+        self.assertEqual(cache.hits, 9)
+        self.assertListEqual(convert_many(iter(documents), "/site/", cache, jobs=2), expected)
+
+    def test_convert_many_error(self):
+        with self.assertRaises(ValueError):
+            convert_many(["# Fine", "Unmatched **bold"])
+
+    def test_write_markdown_html_empty(self):
+        with self.assertRaises(ValueError):
+            write_markdown_html(iter_markdown_blocks(io.StringIO("\n\n")), print)
+
+    def test_extract_heading_lines(self):
+        file = io.StringIO("Text before the heading\n\n# Heading\n\nThis is a paragraph\n")
+        self.assertEqual(extract_markdown_heading(file), "Heading")
+
     def test_extract_heading(self):
         md ="""
 # Heading
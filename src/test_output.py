@@ -0,0 +1,64 @@
+import os
+import unittest
+
+from output import OutputFile, write_if_changed, prune_dir, same_content
+from test_helpers import TempDirTestCase
+
+class TestOutput(TempDirTestCase):
+    def test_same_content(self):
+        self.write("a.html", "<p>a</p>")
+        self.write("b.html", "<p>a</p>")
+        self.write("c.html", "<p>c</p>")
+
+        self.assertTrue(same_content(self.path("a.html"), self.path("b.html")))
+        self.assertFalse(same_content(self.path("a.html"), self.path("c.html")))
+        self.assertFalse(same_content(self.path("a.html"), self.path("missing.html")))
+
+    def test_write_if_changed(self):
+        self.assertTrue(write_if_changed(self.path("index.html"), "<p>a</p>"))
+        os.utime(self.path("index.html"), ns=(0, 0))
+
+        self.assertFalse(write_if_changed(self.path("index.html"), "<p>a</p>"))
+        self.assertEqual(os.stat(self.path("index.html")).st_mtime_ns, 0)
+        self.assertTrue(write_if_changed(self.path("index.html"), "<p>b</p>"))
+        self.assertEqual(self.read("index.html"), "<p>b</p>")
+        self.assertListEqual(os.listdir(self.tmp_dir.name), ["index.html"])
+
+    def test_output_file(self):
+        self.write("index.html", "<p>a</p>")
+        os.utime(self.path("index.html"), ns=(0, 0))
+        output = OutputFile(self.path("index.html"))
+        with output as file:
+            file.write("<p>a</p>")
+
+        self.assertFalse(output.written)
+        self.assertEqual(os.stat(self.path("index.html")).st_mtime_ns, 0)
+
+        output = OutputFile(self.path("index.html"))
+        with output as file:
+            file.write("<p>b</p>")
+        self.assertTrue(output.written)
+        self.assertEqual(self.read("index.html"), "<p>b</p>")
+
+    def test_output_file_error(self):
+        self.write("index.html", "<p>a</p>")
+        with self.assertRaises(ValueError):
+            with OutputFile(self.path("index.html")) as file:
+                file.write("<p>partial")
+                raise ValueError("render failed")
+
+        self.assertEqual(self.read("index.html"), "<p>a</p>")
+        self.assertListEqual(os.listdir(self.tmp_dir.name), ["index.html"])
+
+    def test_prune_dir(self):
+        keep = {self.write("docs/index.html", ""), self.write("docs/images/logo.png", "")}
+        self.write("docs/old/index.html", "")
+        self.write("docs/images/old.png", "")
+
+        self.assertEqual(prune_dir(self.path("docs"), keep), 2)
+        self.assertFalse(os.path.exists(self.path("docs", "old")))
+        self.assertListEqual(os.listdir(self.path("docs", "images")), ["logo.png"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,210 @@
+import os
+import unittest
+
+from page_generator import render_page, find_markdown_files, generate_pages, generate_pages_incremental, configure_block_cache, configure_asset_urls
+from template import Template
+from profiler import BuildProfile
+from stats import BuildStats
+from depgraph import DependencyGraph
+from manifest import load_manifest
+from test_helpers import TempDirTestCase
+
+TEMPLATE = "<title>{{ Title }}</title><body>{{ Content }}</body>"
+
+class TestPageGenerator(TempDirTestCase):
+    def setUp(self):
+        super().setUp()
+        self.content_dir = self.path("content")
+        self.dest_dir = self.path("docs")
+        self.template_path = self.write("template.html", TEMPLATE)
+
+    def test_find_markdown_files(self):
+        self.write("content/index.md", "# Home")
+        self.write("content/blog/post/index.md", "# Post")
+        self.write("content/blog/notes.txt", "not markdown")
+
+        self.assertListEqual(
+            find_markdown_files(self.content_dir, self.dest_dir),
+            [
+                (self.path("content", "blog", "post", "index.md"), self.path("docs", "blog", "post", "index.html")),
+                (self.path("content", "index.md"), self.path("docs", "index.html")),
+            ],
+        )
+
+    def test_render_page_escaped(self):
+        html = render_page("# Fish & Chips\n\n[< Back](/)", Template(TEMPLATE))
+
+        self.assertEqual(html, '<title>Fish &amp; Chips</title><body><div><h1>Fish &amp; Chips</h1><p><a href="/">&lt; Back</a></p></div></body>')
+
+    def test_find_markdown_files_missing_dir(self):
+        with self.assertRaises(IsADirectoryError):
+            find_markdown_files(self.path("missing"), self.dest_dir)
+
+    def test_generate_pages_asset_urls(self):
+        self.addCleanup(configure_asset_urls, {})
+        self.write("content/index.md", "# Home\n\n![Tom](/images/tom.png)")
+        pages = find_markdown_files(self.content_dir, self.dest_dir)
+        asset_urls = {"/images/tom.png": "/images/tom.444582ce.png"}
+        expected = '<title>Home</title><body><div><h1>Home</h1><p><img src="/base/images/tom{}.png" alt="Tom"></p></div></body>'
+
+        for jobs in (1, 2):
+            generate_pages(pages, Template.load(self.template_path, "/base/", asset_urls), jobs)
+            self.assertEqual(self.read(self.path("docs", "index.html")), expected.format(".444582ce"))
+
+        # Blocks cached with the fingerprinted names are not reused without them
+        generate_pages(pages, Template.load(self.template_path, "/base/"))
+        self.assertEqual(self.read(self.path("docs", "index.html")), expected.format(""))
+
+    def test_incremental_rebuilds_pages_of_changed_assets(self):
+        self.addCleanup(configure_asset_urls, {})
+        self.write("template.html", '<link href="/index.css">' + TEMPLATE)
+        self.write("content/index.md", "# Home\n\n![Tom](/images/tom.png)")
+        self.write("content/contact/index.md", "# Contact")
+        asset_urls = {"/index.css": "/index.3f2a9c1d.css", "/images/tom.png": "/images/tom.444582ce.png"}
+        build = lambda urls: generate_pages_incremental(self.content_dir, self.template_path, self.dest_dir, "/", self.path("manifest.json"), asset_urls=urls)
+        build(asset_urls)
+        self.write("docs/contact/index.html", "old")
+
+        # Only the page showing the changed image is regenerated
+        build(dict(asset_urls, **{"/images/tom.png": "/images/tom.0a1b2c3d.png"}))
+        self.assertIn('src="/images/tom.0a1b2c3d.png"', self.read(self.path("docs", "index.html")))
+        self.assertEqual(self.read(self.path("docs", "contact", "index.html")), "old")
+
+        # The template refers to the stylesheet, so every page changes with it
+        build(dict(asset_urls, **{"/index.css": "/index.0a1b2c3d.css"}))
+        self.assertIn('href="/index.0a1b2c3d.css"', self.read(self.path("docs", "contact", "index.html")))
+
+    def test_generate_pages_parallel(self):
+        for i in range(8):
+            self.write(f"content/page{i}/index.md", f"# Page {i}\n\nSome **text** with a [link](/page{i})")
+        pages = find_markdown_files(self.content_dir, self.dest_dir)
+
+        stats = BuildStats()
+        errors = generate_pages(pages, Template.load(self.template_path, "/base/"), jobs=3, stats=stats)
+
+        self.assertListEqual(errors, [])
+        # Only paths and small results cross process boundaries, not page bodies
+        self.assertLess(stats.get("ipc_bytes_sent"), 3000)
+        self.assertLess(stats.get("ipc_bytes_received"), 8 * 300)
+        self.assertEqual(
+            self.read(self.path("docs", "page5", "index.html")),
+            '<title>Page 5</title><body><div><h1>Page 5</h1><p>Some <b>text</b> with a <a href="/base/page5">link</a></p></div></body>',
+        )
+
+    def test_generate_pages_pipelined(self):
+        for i in range(8):
+            self.write(f"content/page{i}/index.md", f"# Page {i}\n\nSome **text** with a [link](/page{i})")
+        pages = find_markdown_files(self.content_dir, self.dest_dir)
+        profile = BuildProfile()
+
+        errors = generate_pages(pages, Template.load(self.template_path, "/base/"), profile=profile, pipeline_depth=2)
+
+        self.assertListEqual(errors, [])
+        self.assertEqual(
+            self.read(self.path("docs", "page5", "index.html")),
+            '<title>Page 5</title><body><div><h1>Page 5</h1><p>Some <b>text</b> with a <a href="/base/page5">link</a></p></div></body>',
+        )
+        self.assertListEqual([page.name for page in profile.pages], [src_path for src_path, _ in pages])
+
+    def test_generate_pages_profile(self):
+        self.write("content/a/index.md", "# Page a\n\nSome **text**")
+        self.write("content/b/index.md", "# Page b\n\n- item")
+        pages = find_markdown_files(self.content_dir, self.dest_dir)
+        profile = BuildProfile()
+
+        errors = generate_pages(pages, Template.load(self.template_path), profile=profile)
+
+        self.assertListEqual(errors, [])
+        self.assertListEqual([page.name for page in profile.pages], [src_path for src_path, _ in pages])
+        self.assertEqual(profile.pages[0].nodes, 5)
+        self.assertListEqual(sorted(profile.pages[0].wall), sorted(["read", "classify", "inline", "to_html", "template", "write"]))
+
+    def test_generate_pages_block_cache(self):
+        configure_block_cache(16)
+        self.addCleanup(configure_block_cache, 0)
+        for i in range(4):
+            self.write(f"content/page{i}/index.md", f"# Page {i}\n\nShared [footer](/about)")
+        pages = find_markdown_files(self.content_dir, self.dest_dir)
+        stats = BuildStats()
+
+        errors = generate_pages(pages, Template.load(self.template_path, "/base/"), stats=stats)
+
+        self.assertListEqual(errors, [])
+        self.assertEqual(stats.get("block_cache_hits"), 3)
+        self.assertEqual(stats.get("block_cache_misses"), 5)
+        self.assertEqual(
+            self.read(self.path("docs", "page3", "index.html")),
+            '<title>Page 3</title><body><div><h1>Page 3</h1><p>Shared <a href="/base/about">footer</a></p></div></body>',
+        )
+
+    def test_generate_pages_skips_unchanged(self):
+        self.write("content/a/index.md", "# Page a")
+        self.write("content/b/index.md", "# Page b")
+        pages = find_markdown_files(self.content_dir, self.dest_dir)
+        generate_pages(pages, Template.load(self.template_path))
+        os.utime(self.path("docs", "a", "index.html"), ns=(0, 0))
+        self.write("content/b/index.md", "# Changed page b")
+
+        # The second build finds both pages unchanged
+        for pipeline_depth, counts in ((0, (1, 1)), (2, (0, 2))):
+            stats = BuildStats()
+            generate_pages(pages, Template.load(self.template_path), stats=stats, pipeline_depth=pipeline_depth)
+
+            self.assertEqual(os.stat(self.path("docs", "a", "index.html")).st_mtime_ns, 0)
+            self.assertEqual(self.read(self.path("docs", "b", "index.html")), "<title>Changed page b</title><body><div><h1>Changed page b</h1></div></body>")
+            self.assertEqual((stats.get("files_written"), stats.get("files_skipped")), counts)
+        self.assertListEqual(sorted(os.listdir(self.path("docs", "a"))), ["index.html"])
+
+    def test_generate_pages_collects_errors(self):
+        self.write("content/a/index.md", "# Fine")
+        self.write("content/b/index.md", "No title here")
+        self.write("content/c/index.md", "# Broken\n\nUnmatched **bold")
+        pages = find_markdown_files(self.content_dir, self.dest_dir)
+
+        for jobs, pipeline_depth in ((1, 0), (2, 0), (1, 2)):
+            errors = generate_pages(pages, Template.load(self.template_path), jobs, pipeline_depth=pipeline_depth)
+
+            self.assertListEqual(
+                [src_path for src_path, _ in errors],
+                [self.path("content", "b", "index.md"), self.path("content", "c", "index.md")],
+            )
+            self.assertTrue(os.path.isfile(self.path("docs", "a", "index.html")))
+
+    def test_incremental_keeps_linking_pages(self):
+        self.write("content/index.md", "# Home\n\n[Tom](/blog/tom)")
+        self.write("content/contact/index.md", "# Contact")
+        self.write("content/blog/tom/index.md", "# Tom")
+        build = lambda: generate_pages_incremental(self.content_dir, self.template_path, self.dest_dir, "/", self.path("manifest.json"))
+        build()
+        home_html = self.read("docs/index.html")
+        self.write("docs/contact/index.html", "old")
+
+        # An edited page is regenerated alone, as --what-rebuilds reports
+        tom_path = self.path("content", "blog", "tom", "index.md")
+        self.write("content/blog/tom/index.md", "# Tom Smith")
+        self.write("docs/index.html", "old")
+        build()
+        graph = DependencyGraph(self.content_dir, load_manifest(self.path("manifest.json"))["dependencies"])
+        self.assertListEqual(graph.what_rebuilds(tom_path), [os.path.normpath(tom_path)])
+        self.assertListEqual(graph.what_rebuilds(tom_path, "removed"), [])
+        self.assertListEqual(graph.linking_pages(tom_path), [os.path.normpath(self.path("content", "index.md"))])
+        self.assertEqual(self.read("docs/index.html"), "old")
+
+        # Pages linking to a removed or added page are kept
+        os.remove(tom_path)
+        build()
+        self.assertEqual(self.read("docs/index.html"), "old")
+        self.assertFalse(os.path.exists(self.path("docs", "blog", "tom", "index.html")))
+        self.write("content/blog/tom/index.md", "# Tom")
+        build()
+        self.assertEqual(self.read("docs/index.html"), "old")
+        self.assertEqual(self.read("docs/contact/index.html"), "old")
+
+        # Their html does not depend on whether the target exists
+        os.remove(tom_path)
+        os.remove(self.path("docs", "index.html"))
+        build()
+        self.assertEqual(self.read("docs/index.html"), home_html)
+
+if __name__ == "__main__":
+    unittest.main()
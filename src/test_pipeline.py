@@ -0,0 +1,41 @@
+import threading
+import unittest
+
+from pipeline import run_pipeline
+
+class TestPipeline(unittest.TestCase):
+    def test_order(self):
+        results = run_pipeline(range(100), lambda i: i * 2, lambda i: i + 1, str, depth=3)
+
+        self.assertListEqual(results, [str(i * 2 + 1) for i in range(100)])
+
+    def test_stages_run_in_threads(self):
+        threads = {}
+        record = lambda stage: lambda item: threads.setdefault(stage, threading.get_ident()) and item
+
+        run_pipeline([1, 2], record("read"), record("render"), record("write"))
+
+        self.assertEqual(threads["render"], threading.get_ident())
+        self.assertEqual(len(set(threads.values())), 3)
+
+    def test_bounded(self):
+        in_flight = []
+        read = lambda item: in_flight.append(item) or item
+        write = lambda item: (len(in_flight), in_flight.remove(item))[0]
+
+        # Every queue holds at most `depth` items, plus one item in each stage
+        for count in run_pipeline(range(200), read, lambda item: item, write, depth=2):
+            self.assertLessEqual(count, 2 * 2 + 3)
+
+    def test_failure(self):
+        def render(item):
+            if item == 5:
+                raise RuntimeError("render failed")
+            return item
+
+        with self.assertRaisesRegex(RuntimeError, "render failed"):
+            run_pipeline(range(1000), lambda item: item, render, lambda item: item, depth=1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,52 @@
+import unittest
+
+from plan import BuildPlan, scan_dir, plan_pages
+from test_helpers import TempDirTestCase
+
+class TestPlan(TempDirTestCase):
+    def setUp(self):
+        super().setUp()
+        self.write("content/index.md", "# Home")
+        self.write("content/a/index.md", "# A")
+        self.write("content/a-b/index.md", "# A-B")
+        self.write("content/a/notes.txt", "not markdown")
+        self.write("static/index.css", "body {}")
+        self.write("static/images/logo.png", "png")
+
+    def test_plan_pages(self):
+        pages = plan_pages(scan_dir(self.path("content")), self.path("content"), self.path("docs"))
+
+        self.assertListEqual(pages, [
+            (self.path("content", "a", "index.md"), self.path("docs", "a", "index.html")),
+            (self.path("content", "a-b", "index.md"), self.path("docs", "a-b", "index.html")),
+            (self.path("content", "index.md"), self.path("docs", "index.html")),
+        ])
+
+    def test_build_plan(self):
+        plan = BuildPlan(self.path("content"), self.path("static"), self.path("docs"))
+
+        self.assertEqual(len(plan.pages), 3)
+        self.assertEqual(plan.sources[self.path("content", "index.md")][1], len("# Home"))
+        self.assertSetEqual(plan.outputs({self.path("content", "a-b", "index.md")}), {
+            self.path("docs", "a", "index.html"),
+            self.path("docs", "index.html"),
+            self.path("docs", "index.css"),
+            self.path("docs", "images", "logo.png"),
+        })
+        self.assertSetEqual(plan.static_outputs(), {self.path("docs", "index.css"), self.path("docs", "images", "logo.png")})
+
+    def test_build_plan_asset_paths(self):
+        plan = BuildPlan(self.path("content"), self.path("static"), self.path("docs"))
+        outputs = plan.outputs(asset_paths={"index.css": "index.3f2a9c1d.css"})
+
+        self.assertIn(self.path("docs", "index.3f2a9c1d.css"), outputs)
+        self.assertIn(self.path("docs", "index.css"), outputs)
+        self.assertIn(self.path("docs", "images", "logo.png"), outputs)
+
+    def test_missing_dir(self):
+        with self.assertRaises(IsADirectoryError):
+            BuildPlan(self.path("content"), self.path("missing"), self.path("docs"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,58 @@
+import time
+import unittest
+
+from profiler import Profile, BuildProfile, NULL_PROFILE
+from htmlnode import LeafNode, ParentNode
+
+class TestProfiler(unittest.TestCase):
+    def test_stages(self):
+        profile = Profile("page")
+        with profile.stage("read"):
+            pass
+        with profile.stage("read"):
+            pass
+
+        self.assertListEqual(list(profile.wall), ["read"])
+        self.assertGreaterEqual(profile.wall["read"], 0.0)
+        self.assertEqual(profile.total_wall(), profile.wall["read"])
+
+    def test_nested_stages(self):
+        profile = Profile("page")
+        with profile.stage("template"):
+            with profile.stage("inline"):
+                time.sleep(0.02)
+
+        self.assertGreaterEqual(profile.wall["inline"], 0.02)
+        # Time spent in the inner stage is not counted twice
+        self.assertLess(profile.wall["template"], 0.02)
+
+    def test_count_nodes(self):
+        profile = Profile("page")
+        profile.count_nodes(ParentNode("ul", [ParentNode("li", [LeafNode("b", "bold")]), ParentNode("li", [LeafNode(None, "text")])]))
+
+        self.assertEqual(profile.nodes, 5)
+
+    def test_null_profile(self):
+        with NULL_PROFILE.stage("read"):
+            NULL_PROFILE.count_nodes(LeafNode(None, "text"))
+
+    def test_report(self):
+        build = BuildProfile()
+        for name, seconds in [("fast.md", 0.0), ("slow.md", 0.01)]:
+            page = Profile(name)
+            with page.stage("write"):
+                time.sleep(seconds)
+            with page.stage("read"):
+                pass
+            page.nodes = 3
+            build.add_page(page)
+        report = build.report(slowest=1)
+
+        self.assertEqual(report["pages"], 2)
+        self.assertEqual(report["nodes"], 6)
+        self.assertListEqual(list(report["page_stages"]), ["read", "write"])
+        self.assertListEqual([page["name"] for page in report["slowest_pages"]], ["slow.md"])
+
+
+if __name__ == "__main__":
+    unittest.main()
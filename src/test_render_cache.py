@@ -0,0 +1,91 @@
+import os
+import unittest
+
+from render_cache import RenderCache, generator_version
+from template import Template
+from page_generator import generate_page
+from test_helpers import TempDirTestCase
+
+class TestRenderCache(TempDirTestCase):
+    def setUp(self):
+        super().setUp()
+        self.cache = RenderCache(self.path("cache"))
+        self.template = Template("<title>{{ Title }}</title>{{ Content }}")
+        self.markdown_path = self.write("content/index.md", "# Home\n\n[About](/about)")
+
+    def test_generator_version(self):
+        self.assertEqual(len(generator_version()), 64)
+
+    def test_key(self):
+        key = self.cache.key(self.markdown_path, self.template.digest)
+
+        self.assertEqual(key, self.cache.key(self.markdown_path, self.template.digest))
+        self.assertNotEqual(key, self.cache.key(self.markdown_path, Template("{{ Content }}").digest))
+        self.assertNotEqual(key, self.cache.key(self.markdown_path, Template("<title>{{ Title }}</title>{{ Content }}", "/base/").digest))
+        self.write("content/index.md", "# Changed")
+        self.assertNotEqual(key, self.cache.key(self.markdown_path, self.template.digest))
+
+    def test_store_read(self):
+        page_path = self.write("page.html", "<p>page</p>")
+        self.assertIsNone(self.cache.read("ab" * 32))
+
+        self.cache.store("ab" * 32, page_path)
+
+        self.assertEqual(self.cache.read("ab" * 32), "<p>page</p>")
+        self.assertEqual((self.cache.hits, self.cache.misses), (1, 1))
+        self.assertListEqual(os.listdir(self.path("cache", "ab")), ["ab" * 32 + ".html"])
+
+    def test_generate_page(self):
+        generate_page(self.markdown_path, self.template, self.path("docs", "index.html"), cache=self.cache)
+        # A cached page is used as is, even when the output was deleted
+        os.remove(self.path("docs", "index.html"))
+        generate_page(self.markdown_path, self.template, self.path("docs", "index.html"), cache=self.cache)
+
+        self.assertEqual(self.read("docs/index.html"), '<title>Home</title><div><h1>Home</h1><p><a href="/about">About</a></p></div>')
+        self.assertEqual((self.cache.hits, self.cache.misses), (1, 1))
+
+    def test_unwritable_cache(self):
+        # A file in place of the cache directory fails like a read-only or full disk
+        self.write("cache", "")
+        cache = RenderCache(self.path("cache"))
+        generate_page(self.markdown_path, self.template, self.path("docs", "index.html"), cache=cache)
+
+        self.assertEqual(self.read("docs/index.html"), '<title>Home</title><div><h1>Home</h1><p><a href="/about">About</a></p></div>')
+        self.assertEqual((cache.hits, cache.misses, cache.errors), (0, 1, 2))
+
+    def test_store_failure_removes_tmp_file(self):
+        # A directory in place of the page fails the copy after the temporary file was created
+        os.makedirs(self.path("page.html"))
+
+        self.assertFalse(self.cache.store("ab" * 32, self.path("page.html")))
+        self.assertListEqual(os.listdir(self.path("cache", "ab")), [])
+        self.assertEqual(self.cache.errors, 1)
+
+    def test_trim(self):
+        cache = RenderCache(self.path("cache"), max_bytes=10)
+        for i, key in enumerate(("aa" * 32, "bb" * 32, "cc" * 32)):
+            cache.store(key, self.write("page.html", "12345"))
+            entry_path = cache.entry_path(key)
+            os.utime(entry_path, ns=(i * 1_000_000_000, i * 1_000_000_000))
+
+        self.assertEqual(cache.trim(), 1)
+        self.assertFalse(os.path.exists(cache.entry_path("aa" * 32)))
+        self.assertTrue(os.path.exists(cache.entry_path("cc" * 32)))
+
+    def test_trim_tmp_files(self):
+        cache = RenderCache(self.path("cache"), max_bytes=10)
+        cache.store("aa" * 32, self.write("page.html", "12345"))
+        os.utime(cache.entry_path("aa" * 32), ns=(0, 0))
+        # Left behind by a crashed build an hour ago, and written by a concurrent build right now
+        stale_path = self.write("cache/bb/stale.tmp", "12345")
+        os.utime(stale_path, ns=(0, 0))
+        fresh_path = self.write("cache/bb/fresh.tmp", "123456")
+
+        self.assertEqual(cache.trim(), 1)
+        self.assertFalse(os.path.exists(stale_path))
+        self.assertTrue(os.path.exists(fresh_path))
+        self.assertFalse(os.path.exists(cache.entry_path("aa" * 32)))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,136 @@
+import os
+import json
+import unittest
+
+from plan import BuildPlan
+from template import Template
+from page_generator import generate_pages, generate_pages_incremental
+from site_index import SiteIndex, markdown_info, page_path
+from test_helpers import TempDirTestCase
+
+class TestSiteIndex(TempDirTestCase):
+    def setUp(self):
+        super().setUp()
+        self.write("content/index.md", "# Home\n\nWelcome **home**.")
+        self.write("content/blog/post/index.md", "# Fish & Chips\n\n[< Back](/)\n\n- one\n- `two`")
+        self.write("content/contact.md", "# Contact\n\n> Call _me_")
+        self.write("static/index.css", "body {}")
+        self.template_path = self.write("template.html", "<title>{{ Title }}</title>{{ Content }}")
+        os.utime(self.path("content", "blog", "post", "index.md"), ns=(0, 86400 * 10**9))
+
+    def plan(self):
+        return BuildPlan(self.path("content"), self.path("static"), self.path("docs"))
+
+    def test_markdown_info(self):
+        self.assertEqual(markdown_info("# Title\n\nSome *text*.\n\n---\n\nMore."), ("Title", "Title Some text. More."))
+        self.assertEqual(markdown_info("# A **bold** and _italic_ `code`"), ("A **bold** and _italic_ `code`", "A bold and italic code"))
+        self.assertEqual(markdown_info("# Links\n\nSee [the docs](/docs) and ![a logo](/logo.png)")[1], "Links See the docs and a logo")
+        self.assertEqual(markdown_info("# Lists\n\n> quoted\n> lines\n\n- one\n- two\n\n1. three")[1], "Lists quoted lines one two three")
+
+    def test_markdown_info_keeps_literal_text(self):
+        # The text comes from the rendered nodes, so code and escaped characters are kept as written
+        self.assertEqual(markdown_info("# Code\n\nUse `snake_case`, `2*3` and `a_b`")[1], "Code Use snake_case, 2*3 and a_b")
+        self.assertEqual(markdown_info("# Code\n\n```\n[link](/docs) **not bold**\n```")[1], "Code [link](/docs) **not bold**")
+        self.assertEqual(markdown_info("# A < b & c")[1], "A < b & c")
+
+    def test_page_path(self):
+        content_dir = self.path("content")
+
+        self.assertEqual(page_path(self.path("content", "index.md"), content_dir), "")
+        self.assertEqual(page_path(self.path("content", "blog", "post", "index.md"), content_dir), "blog/post/")
+        self.assertEqual(page_path(self.path("content", "contact.md"), content_dir), "contact.html")
+
+    def test_generate_pages_collects_index(self):
+        plan = self.plan()
+        index = SiteIndex("https://example.com/", "/site/")
+        os.makedirs(self.path("docs"))
+        errors = generate_pages(plan.pages, Template.load(self.template_path, "/site/"), index=index)
+
+        self.assertListEqual(errors, [])
+        self.assertEqual(index.pages[self.path("content", "blog", "post", "index.md")], {"title": "Fish & Chips", "text": "Fish & Chips < Back one two"})
+        self.assertEqual(index.write(plan), 3)
+
+        self.assertEqual(self.read("docs", "sitemap.xml").splitlines()[2], "<url><loc>https://example.com/site/blog/post/</loc><lastmod>1970-01-02</lastmod></url>")
+        feed = self.read("docs", "feed.xml")
+        self.assertIn("<title>Home</title><link>https://example.com/site/</link>", feed)
+        self.assertIn("<item><title>Fish &amp; Chips</title><link>https://example.com/site/blog/post/</link>", feed)
+        self.assertIn("<pubDate>Fri, 02 Jan 1970 00:00:00 +0000</pubDate>", feed)
+        self.assertNotIn("Contact", feed)
+        self.assertListEqual(json.loads(self.read("docs", "search_index.json")), [
+            {"url": "/site/blog/post/", "title": "Fish & Chips", "text": "Fish & Chips < Back one two"},
+            {"url": "/site/contact.html", "title": "Contact", "text": "Contact Call me"},
+            {"url": "/site/", "title": "Home", "text": "Home Welcome home."},
+        ])
+
+        # Unchanged artifacts are not written again
+        self.assertEqual(index.write(plan), 0)
+
+    def test_feed_excludes_section_index(self):
+        self.write("content/blog/index.md", "# All posts\n\n[Fish & Chips](/blog/post)")
+        plan = self.plan()
+        index = SiteIndex("https://example.com")
+        os.makedirs(self.path("docs"))
+        generate_pages(plan.pages, Template.load(self.template_path), index=index)
+        index.write(plan)
+
+        feed = self.read("docs", "feed.xml")
+        self.assertIn("<item><title>Fish &amp; Chips</title>", feed)
+        self.assertNotIn("All posts", feed)
+        self.assertIn("<loc>https://example.com/blog/</loc>", self.read("docs", "sitemap.xml"))
+
+    def test_generate_pages_parallel_collects_index(self):
+        plan = self.plan()
+        sequential = SiteIndex("https://example.com")
+        parallel = SiteIndex("https://example.com")
+        pipelined = SiteIndex("https://example.com")
+        template = Template.load(self.template_path)
+        generate_pages(plan.pages, template, index=sequential)
+        generate_pages(plan.pages, template, jobs=2, index=parallel)
+        generate_pages(plan.pages, template, pipeline_depth=2, index=pipelined)
+
+        self.assertEqual(parallel.pages, sequential.pages)
+        self.assertEqual(pipelined.pages, sequential.pages)
+
+    def test_incremental_keeps_index(self):
+        manifest_path = self.path("manifest.json")
+        arguments = (self.path("content"), self.template_path, self.path("docs"), "/", manifest_path)
+        first = SiteIndex("https://example.com")
+        generate_pages_incremental(*arguments, plan=self.plan(), index=first)
+        first.write(self.plan())
+        self.write("content/contact.md", "# Contact us")
+        self.write("docs/index.html", "old")
+        second = SiteIndex("https://example.com")
+        generate_pages_incremental(*arguments, plan=self.plan(), index=second)
+
+        self.assertEqual(len(second.pages), 3)
+        self.assertEqual(second.pages[self.path("content", "contact.md")], {"title": "Contact us", "text": "Contact us"})
+        # Unchanged pages are not rendered again, their text is read back from the search index
+        self.assertEqual(second.pages[self.path("content", "index.md")], first.pages[self.path("content", "index.md")])
+        self.assertEqual(self.read("docs", "index.html"), "old")
+        # The manifest only keeps the title and a hash of the text
+        entry = json.loads(self.read("manifest.json"))["index"][self.path("content", "index.md")]
+        self.assertEqual(set(entry), {"title", "hash"})
+
+    def test_incremental_indexes_pages_missing_from_search_index(self):
+        manifest_path = self.path("manifest.json")
+        arguments = (self.path("content"), self.template_path, self.path("docs"), "/", manifest_path)
+        first = SiteIndex("https://example.com")
+        generate_pages_incremental(*arguments, plan=self.plan(), index=first)
+        first.write(self.plan())
+        self.write("docs/search_index.json", json.dumps([{"url": "/", "title": "Home", "text": "Edited"}]))
+        second = SiteIndex("https://example.com")
+        generate_pages_incremental(*arguments, plan=self.plan(), index=second)
+
+        self.assertEqual(second.pages, first.pages)
+
+    def test_incremental_indexes_unindexed_pages(self):
+        manifest_path = self.path("manifest.json")
+        arguments = (self.path("content"), self.template_path, self.path("docs"), "/", manifest_path)
+        generate_pages_incremental(*arguments, plan=self.plan())
+        index = SiteIndex("https://example.com")
+        generate_pages_incremental(*arguments, plan=self.plan(), index=index)
+
+        self.assertEqual(len(index.pages), 3)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,22 @@
+import unittest
+
+from stats import BuildStats
+
+class TestBuildStats(unittest.TestCase):
+    def test_merge(self):
+        stats = BuildStats()
+        stats.add("block_cache_hits")
+        stats.merge({"block_cache_hits": 2, "block_cache_misses": 1})
+
+        self.assertEqual(stats.to_dict(), {"block_cache_hits": 3, "block_cache_misses": 1})
+
+    def test_summary(self):
+        stats = BuildStats()
+        self.assertEqual(stats.summary(), "")
+
+        stats.merge({"block_cache_hits": 3, "block_cache_misses": 1})
+        self.assertEqual(stats.summary(), "Block cache: 3 hits, 1 misses (75% hit rate)")
+
+
+if __name__ == "__main__":
+    unittest.main()
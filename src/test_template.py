@@ -0,0 +1,64 @@
+import unittest
+
+from template import Template
+
+class TestTemplate(unittest.TestCase):
+    def test_slots(self):
+        template = Template("<title>{{ Title }}</title><article>{{ Content }}</article>")
+
+        self.assertListEqual(template.slots, ["Title", "Content"])
+        self.assertListEqual(template.segments, ["<title>", "</title><article>", "</article>"])
+
+    def test_render(self):
+        template = Template("<title>{{ Title }}</title><article>{{ Content }}</article>")
+        html = template.render({"Title": "Heading", "Content": "<p>text</p>"})
+
+        self.assertEqual(html, "<title>Heading</title><article><p>text</p></article>")
+
+    def test_write_stream(self):
+        template = Template("<title>{{ Title }}</title><article>{{ Content }}</article>")
+        buffer = []
+        template.write(buffer.append, {"Title": "Heading", "Content": lambda write: write("<p>streamed</p>")})
+
+        self.assertEqual("".join(buffer), "<title>Heading</title><article><p>streamed</p></article>")
+
+    def test_render_no_slots(self):
+        template = Template("<p>static</p>")
+
+        self.assertEqual(template.render({}), "<p>static</p>")
+
+    def test_render_missing_value(self):
+        template = Template("<title>{{ Title }}</title>")
+
+        with self.assertRaises(ValueError):
+            template.render({"Content": "text"})
+
+    def test_base_path(self):
+        template = Template('<link href="/index.css" /><img src="/logo.png" />{{ Content }}', "/repo/")
+        html = template.render({"Content": '<a href="/about">about</a>'})
+
+        # Slot values are inserted unchanged
+        self.assertEqual(html, '<link href="/repo/index.css" /><img src="/repo/logo.png" /><a href="/about">about</a>')
+
+    def test_base_path_protocol_relative_url(self):
+        template = Template('<script src="//cdn.example.com/lib.js"></script><a href="/">home</a>{{ Content }}', "/repo/")
+
+        self.assertEqual(template.render({"Content": ""}), '<script src="//cdn.example.com/lib.js"></script><a href="/repo/">home</a>')
+        self.assertListEqual(template.urls, ["/"])
+
+    def test_asset_urls(self):
+        asset_urls = {"/index.css": "/index.3f2a9c1d.css"}
+        template = Template('<link href="/index.css" /><a href="/index.css.map">map</a>{{ Content }}', "/repo/", asset_urls=asset_urls)
+
+        self.assertEqual(template.render({"Content": ""}), '<link href="/repo/index.3f2a9c1d.css" /><a href="/repo/index.css.map">map</a>')
+        self.assertNotEqual(template.digest, Template('<link href="/index.css" />{{ Content }}', "/repo/").digest)
+        self.assertListEqual(template.urls, ["/index.css", "/index.css.map"])
+
+    def test_repr(self):
+        template = Template("{{ Title }}", path="template.html")
+
+        self.assertEqual(repr(template), "Template(template.html, slots: ['Title'])")
+
+
+if __name__ == "__main__":
+    unittest.main()
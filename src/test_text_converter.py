@@ -9,6 +9,8 @@ from text_converter import (
                            split_nodes_delimiter,
                            text_to_textnodes,
                            text_node_to_html_node,
+                           rebase_url,
+                           configure_asset_urls,
                            )
 
 class TestConversion(unittest.TestCase):
@@ -50,6 +52,26 @@ class TestConversion(unittest.TestCase):
         self.assertEqual(html_node.value, "")
         self.assertEqual(html_node.props, {"src": "./cat.png", "alt": "This is a image node"})
 
+    def test_base_path(self):
+        link = text_node_to_html_node(TextNode("Home", TextType.LINK, "/blog/tom"), "/site/")
+        image = text_node_to_html_node(TextNode("Tom", TextType.IMAGE, "/images/tom.png"), "/site/")
+        self.assertEqual(link.props, {"href": "/site/blog/tom"})
+        self.assertEqual(image.props, {"src": "/site/images/tom.png", "alt": "Tom"})
+
+    def test_rebase_url(self):
+        self.assertEqual(rebase_url("/", "/site/"), "/site/")
+        self.assertEqual(rebase_url("https://boot.dev/", "/site/"), "https://boot.dev/")
+        self.assertEqual(rebase_url("//cdn.example.com/a.png", "/site/"), "//cdn.example.com/a.png")
+        self.assertEqual(rebase_url("./cat.png", "/site/"), "./cat.png")
+
+    def test_rebase_url_asset_urls(self):
+        configure_asset_urls({"/images/tom.png": "/images/tom.444582ce.png"})
+        self.addCleanup(configure_asset_urls, {})
+
+        self.assertEqual(rebase_url("/images/tom.png", "/"), "/images/tom.444582ce.png")
+        self.assertEqual(rebase_url("/images/tom.png", "/site/"), "/site/images/tom.444582ce.png")
+        self.assertEqual(rebase_url("/images/cat.png", "/site/"), "/site/images/cat.png")
+
     def test_split_nodes_delimiter_bold(self):
         text_node = TextNode("This text contains **bold** text", TextType.PLAIN)
         nodes = split_nodes_delimiter([text_node], "**", TextType.BOLD)
@@ -275,6 +297,79 @@ This is **text** with an _italic_ word and a `code block` and an \
 
         self.assertListEqual(nodes, expected_result)
 
+    def test_text_to_textnodes_code_is_literal(self):
+        text = "Use `a * b` or `snake_case` here"
+
+        nodes = text_to_textnodes(text)
+        expected_result = [
+            TextNode("Use ", TextType.PLAIN),
+            TextNode("a * b", TextType.CODE),
+            TextNode(" or ", TextType.PLAIN),
+            TextNode("snake_case", TextType.CODE),
+            TextNode(" here", TextType.PLAIN),
+        ]
+
+        self.assertListEqual(nodes, expected_result)
+
+    def test_text_to_textnodes_brackets_without_url(self):
+        text = "A [link](/about) before a [note] and ![no image]"
+
+        nodes = text_to_textnodes(text)
+        expected_result = [
+            TextNode("A ", TextType.PLAIN),
+            TextNode("link", TextType.LINK, "/about"),
+            TextNode(" before a [note] and ![no image]", TextType.PLAIN),
+        ]
+
+        self.assertListEqual(nodes, expected_result)
+
+    def test_text_to_textnodes_bracket_before_link(self):
+        text = "A [note] and ![figure] before a [link](/about)"
+
+        nodes = text_to_textnodes(text)
+        expected_result = [
+            TextNode("A [note] and ![figure] before a ", TextType.PLAIN),
+            TextNode("link", TextType.LINK, "/about"),
+        ]
+
+        self.assertListEqual(nodes, expected_result)
+
+    def test_text_to_textnodes_url_parentheses(self):
+        text = "See [Foo](https://en.wikipedia.org/wiki/Foo_(bar)) and ![Bar](https://upload.wikimedia.org/Bar_(baz).png)."
+
+        nodes = text_to_textnodes(text)
+        expected_result = [
+            TextNode("See ", TextType.PLAIN),
+            TextNode("Foo", TextType.LINK, "https://en.wikipedia.org/wiki/Foo_(bar)"),
+            TextNode(" and ", TextType.PLAIN),
+            TextNode("Bar", TextType.IMAGE, "https://upload.wikimedia.org/Bar_(baz).png"),
+            TextNode(".", TextType.PLAIN),
+        ]
+
+        self.assertListEqual(nodes, expected_result)
+
+    def test_text_to_textnodes_url_unbalanced_parentheses(self):
+        # Only one level of balanced parentheses belongs to the url, like whitespace the rest ends it
+        for text in ("[x](a(b)", "[x](a((b)))", "[my link](a b)"):
+            self.assertListEqual(text_to_textnodes(text), [TextNode(text, TextType.PLAIN)])
+
+    def test_text_to_textnodes_many_unmatched_brackets(self):
+        # Each `[` without a url used to search the rest of the text, which took seconds here
+        for text in ("[x] " * 20000, "![x] " * 20000, "[x](y " * 20000, "[x](y(z " * 20000):
+            self.assertListEqual(text_to_textnodes(text), [TextNode(text.strip(), TextType.PLAIN)])
+
+    def test_text_to_textnodes_unmatched(self):
+        with self.assertRaises(ValueError):
+            text_to_textnodes("This **text** contains invalid **syntax")
+
+    def test_text_to_textnodes_many_links(self):
+        text = " ".join(f"[link {i}](/page/{i})" for i in range(1000))
+
+        nodes = text_to_textnodes(text)
+
+        self.assertEqual(len(nodes), 1999)
+        self.assertEqual(nodes[-1], TextNode("link 999", TextType.LINK, "/page/999"))
+
     def test_extract_markdown_images(self):
         matches = extract_markdown_images(
             "This is text with an ![image](https://i.imgur.com/zjjcJKZ.png)"
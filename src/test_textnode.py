@@ -28,6 +28,10 @@ class TestTextNode(unittest.TestCase):
         node = TextNode("test", TextType.PLAIN, "www.abc.com")
         self.assertEqual(repr(node), "TextNode(test, plain, www.abc.com)")
 
+    def test_no_instance_dict(self):
+        node = TextNode("test", TextType.PLAIN)
+        self.assertFalse(hasattr(node, "__dict__"))
+
 
 if __name__ == "__main__":
     unittest.main()
\ No newline at end of file
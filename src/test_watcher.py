@@ -0,0 +1,114 @@
+import os
+import sys
+import unittest
+
+from inotify import Inotify
+from watcher import SiteWatcher, diff_files, start_inotify
+from test_helpers import TempDirTestCase
+
+class TestWatcher(TempDirTestCase):
+    def setUp(self):
+        super().setUp()
+        self.write("template.html", "<title>{{ Title }}</title>{{ Content }}")
+        self.write("content/index.md", "# Home")
+        self.write("content/blog/index.md", "# Blog")
+        self.write("static/index.css", "body {}")
+        self.watcher = SiteWatcher(self.path("content"), self.path("static"), self.path("template.html"), self.path("docs"), "/")
+
+    def write(self, name, text):
+        path = super().write(name, text)
+        # Make sure the change is visible, even with a coarse mtime resolution
+        stat = os.stat(path)
+        os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+        return path
+
+    def test_diff_files(self):
+        old_files = {"a": (1, 1), "b": (1, 1), "c": (1, 1)}
+        new_files = {"a": (1, 1), "b": (2, 1), "d": (1, 1)}
+
+        self.assertEqual(diff_files(old_files, new_files), (["b", "d"], ["c"]))
+
+    def test_no_changes(self):
+        self.assertEqual(self.watcher.rebuild_changes(), 0)
+
+    def test_changed_page(self):
+        self.write("content/blog/index.md", "# New blog")
+
+        self.assertEqual(self.watcher.rebuild_changes(), 1)
+        self.assertEqual(self.read("docs/blog/index.html"), "<title>New blog</title><div><h1>New blog</h1></div>")
+        self.assertFalse(os.path.exists(self.path("docs", "index.html")))
+        self.assertEqual(self.watcher.rebuild_changes(), 0)
+
+    def test_removed_page(self):
+        self.write("docs/blog/index.html", "old")
+        os.remove(self.path("content", "blog", "index.md"))
+
+        self.assertEqual(self.watcher.rebuild_changes(), 1)
+        self.assertFalse(os.path.exists(self.path("docs", "blog", "index.html")))
+
+    def test_changed_template(self):
+        self.write("template.html", "<h1>{{ Title }}</h1>")
+
+        self.assertEqual(self.watcher.rebuild_changes(), 2)
+        self.assertEqual(self.read("docs/index.html"), "<h1>Home</h1>")
+        self.assertEqual(self.read("docs/blog/index.html"), "<h1>Blog</h1>")
+
+    def test_static_files(self):
+        self.write("static/images/logo.svg", "<svg></svg>")
+        os.remove(self.path("static", "index.css"))
+        self.write("docs/index.css", "body {}")
+
+        self.assertEqual(self.watcher.rebuild_changes(), 2)
+        self.assertEqual(self.read("docs/images/logo.svg"), "<svg></svg>")
+        self.assertFalse(os.path.exists(self.path("docs", "index.css")))
+
+    def test_changed_paths(self):
+        self.write("content/blog/index.md", "# New blog")
+        self.write("content/index.md", "# New home")
+
+        # Only the reported paths are scanned
+        self.assertEqual(self.watcher.rebuild_changes({self.path("content", "blog", "index.md"): False}), 1)
+        self.assertEqual(self.read("docs/blog/index.html"), "<title>New blog</title><div><h1>New blog</h1></div>")
+        self.assertFalse(os.path.exists(self.path("docs", "index.html")))
+        self.assertEqual(self.watcher.rebuild_changes(), 1)
+
+    def test_changed_paths_directories(self):
+        self.write("docs/blog/index.html", "old")
+        os.rename(self.path("content", "blog"), self.path("content", "news"))
+        paths = {self.path("content", "blog"): True, self.path("content", "news"): True, self.path("content", "unknown.md"): False}
+
+        self.assertEqual(self.watcher.rebuild_changes(paths), 2)
+        self.assertEqual(self.read("docs/news/index.html"), "<title>Blog</title><div><h1>Blog</h1></div>")
+        self.assertFalse(os.path.exists(self.path("docs", "blog", "index.html")))
+        self.assertEqual(self.watcher.rebuild_changes(), 0)
+
+    def test_changed_paths_template(self):
+        self.write("template.html", "<h1>{{ Title }}</h1>")
+
+        self.assertEqual(self.watcher.rebuild_changes({self.path("other.html"): False}), 0)
+        self.assertEqual(self.watcher.rebuild_changes({self.path("template.html"): False}), 2)
+        self.assertEqual(self.read("docs/index.html"), "<h1>Home</h1>")
+
+    @unittest.skipUnless(sys.platform.startswith("linux"), "inotify is only available on Linux")
+    def test_inotify(self):
+        inotify = start_inotify(self.watcher)
+        self.assertIsInstance(inotify, Inotify)
+        with inotify:
+            self.write("content/blog/index.md", "# New blog")
+            self.write("content/about/index.md", "# About")
+            self.write("template.html", "<h1>{{ Title }}</h1>")
+            self.write("other.txt", "ignored")
+
+            paths = inotify.read(1)
+            self.assertEqual(self.watcher.rebuild_changes(paths), 3)
+            self.assertEqual(self.read("docs/about/index.html"), "<h1>About</h1>")
+
+            # The new directory is watched as well
+            self.write("content/about/team.md", "# Team")
+            self.assertEqual(self.watcher.rebuild_changes(inotify.read(1)), 1)
+            self.assertEqual(self.read("docs/about/team.html"), "<h1>Team</h1>")
+            self.assertEqual(inotify.read(0), {})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -4,7 +4,26 @@ from typing import Callable
 from textnode import TextNode, TextType
 from htmlnode import LeafNode
 
-def text_node_to_html_node(text_node: TextNode) -> LeafNode:
+# Fingerprinted urls of static files by their plain urls in this process, e.g. `/index.css` to `/index.3f2a9c1d.css`
+asset_urls = {}
+
+
+def configure_asset_urls(urls: dict[str, str]) -> None:
+    global asset_urls
+    asset_urls = dict(urls)
+
+def rebase_url(url: str, base_path: str) -> str:
+    '''
+    Moves an absolute url below the base path, e.g. `/images/tom.png` to `/blog/images/tom.png`,
+    and points urls of fingerprinted static files at their fingerprinted names
+    '''
+    url = asset_urls.get(url, url)
+    # Protocol relative urls like `//example.com` point to other hosts
+    if base_path == "/" or not url.startswith("/") or url.startswith("//"):
+        return url
+    return base_path + url[1:]
+
+def text_node_to_html_node(text_node: TextNode, base_path: str = "/") -> LeafNode:
     match text_node.text_type:
         case TextType.PLAIN:
             return LeafNode(None, text_node.text)
@@ -15,9 +34,9 @@ def text_node_to_html_node(text_node: TextNode) -> LeafNode:
         case TextType.CODE:
             return LeafNode("code", text_node.text)
         case TextType.LINK:
-            return LeafNode("a", text_node.text, {"href": text_node.url})
+            return LeafNode("a", text_node.text, {"href": rebase_url(text_node.url, base_path)})
         case TextType.IMAGE:
-            return LeafNode("img", "", {"src": text_node.url, "alt": text_node.text})
+            return LeafNode("img", "", {"src": rebase_url(text_node.url, base_path), "alt": text_node.text})
 
 def split_nodes_delimiter(old_nodes: list[TextNode], delimiter: str, text_type: TextType) -> list[TextNode]:
     new_nodes = []
@@ -69,14 +88,52 @@ def extract_markdown_links(markdown: str) -> list[tuple]:
 split_nodes_image = split_url_nodes(extract_markdown_images, lambda image: f"![{image[0]}]({image[1]})", TextType.IMAGE)
 split_nodes_link = split_url_nodes(extract_markdown_links, lambda link: f"[{link[0]}]({link[1]})", TextType.LINK)
 
+# Start of any inline element, longer delimiters first
+INLINE_TOKEN_PATTERN = re.compile(r"!?\[|\*\*|__|[*_`]")
+# Text stops at the next bracket and the url at whitespace or an unbalanced parenthesis, so a `[` without
+# a url fails after a short scan instead of searching the rest of the text, which keeps the tokenizer linear.
+# Urls may contain one level of balanced parentheses, e.g. https://en.wikipedia.org/wiki/Foo_(bar)
+URL_GROUP = r"((?:[^()\s]|\([^()\s]*\))*)"
+IMAGE_PATTERN = re.compile(r"!\[([^\[\]]*)\]\(" + URL_GROUP + r"\)")
+LINK_PATTERN = re.compile(r"\[([^\[\]]*)\]\(" + URL_GROUP + r"\)")
+DELIMITER_TYPES = {
+    "**": TextType.BOLD,
+    "__": TextType.BOLD,
+    "*": TextType.ITALIC,
+    "_": TextType.ITALIC,
+    "`": TextType.CODE,
+}
+
 def text_to_textnodes(text: str) -> list[TextNode]:
-    nodes = [TextNode(text.strip(), TextType.PLAIN)]
-    nodes = split_nodes_image(nodes)
-    nodes = split_nodes_link(nodes)
-    nodes = split_nodes_delimiter(nodes, "**", TextType.BOLD)
-    nodes = split_nodes_delimiter(nodes, "__", TextType.BOLD)
-    nodes = split_nodes_delimiter(nodes, "*", TextType.ITALIC)
-    nodes = split_nodes_delimiter(nodes, "_", TextType.ITALIC)
-    nodes = split_nodes_delimiter(nodes, "`", TextType.CODE)
+    '''Splits inline markdown into text nodes in a single pass over the text'''
+    text = text.strip()
+    nodes = []
+    plain_start = 0
+    position = 0
+
+    while (token := INLINE_TOKEN_PATTERN.search(text, position)) is not None:
+        delimiter = token.group()
+        if delimiter.endswith("["):
+            # Brackets without a following url are plain text
+            url_pattern, text_type = (IMAGE_PATTERN, TextType.IMAGE) if delimiter == "![" else (LINK_PATTERN, TextType.LINK)
+            element = url_pattern.match(text, token.start())
+            if element is None:
+                position = token.end()
+                continue
+            content, url, end = element[1], element[2], element.end()
+        else:
+            content_end = text.find(delimiter, token.end())
+            if content_end == -1:
+                raise ValueError("unmatched delimiter in Markdown text")
+            content, url, end = text[token.end():content_end], None, content_end + len(delimiter)
+            text_type = DELIMITER_TYPES[delimiter]
+
+        if token.start() > plain_start:
+            nodes.append(TextNode(text[plain_start:token.start()], TextType.PLAIN))
+        if content != '' or url is not None:
+            nodes.append(TextNode(content, text_type, url))
+        plain_start = position = end
 
+    if plain_start < len(text):
+        nodes.append(TextNode(text[plain_start:], TextType.PLAIN))
     return nodes
@@ -0,0 +1,179 @@
+import os
+import time
+import functools
+import threading
+
+from http.server import ThreadingHTTPServer, SimpleHTTPRequestHandler
+from assets import scan_files, sync_file
+from inotify import Inotify
+from page_generator import try_generate_page
+from template import Template
+
+
+def diff_files(old_files: dict[str, tuple[int, int]], new_files: dict[str, tuple[int, int]]) -> tuple[list[str], list[str]]:
+    '''Returns the changed or added and the removed paths'''
+    changed = sorted(path for path, stat in new_files.items() if old_files.get(path) != stat)
+    removed = sorted(path for path in old_files if path not in new_files)
+    return changed, removed
+
+
+class SiteWatcher():
+    '''
+    Tracks the site inputs and updates only the outputs of files that changed since the last poll.
+    Changes are either found by scanning every input, or given as the paths inotify reported.
+    '''
+    def __init__(self, content_dir: str, static_dir: str, template_path: str, dest_dir: str, base_path: str):
+        self.content_dir = content_dir
+        self.static_dir = static_dir
+        self.template_path = template_path
+        self.dest_dir = dest_dir
+        self.base_path = base_path
+        self.template = Template.load(template_path, base_path)
+        self.files = {path: scan_files(path) for path in (content_dir, static_dir, template_path)}
+
+    def dest_path(self, src_path: str, src_dir: str) -> str:
+        return os.path.join(self.dest_dir, os.path.relpath(src_path, src_dir))
+
+    def page_dest_path(self, src_path: str) -> str:
+        return self.dest_path(src_path, self.content_dir).removesuffix(".md") + ".html"
+
+    def watch_dirs(self) -> list[tuple[str, bool]]:
+        '''Returns the directories to watch for changes of the inputs, and whether to watch their subdirectories'''
+        return [(self.content_dir, True), (self.static_dir, True), (os.path.dirname(self.template_path) or ".", False)]
+
+    def input_of(self, path: str) -> str | None:
+        '''Returns the input a changed path belongs to, if any'''
+        if os.path.normpath(path) == os.path.normpath(self.template_path):
+            return self.template_path
+        for input_dir in (self.content_dir, self.static_dir):
+            if path.startswith(os.path.join(input_dir, "")):
+                return input_dir
+        return None
+
+    def poll(self) -> dict[str, tuple[list[str], list[str]]]:
+        '''Returns the changed and removed files of each input since the last poll'''
+        changes = {}
+        for path, old_files in self.files.items():
+            new_files = scan_files(path)
+            changes[path] = diff_files(old_files, new_files)
+            self.files[path] = new_files
+        return changes
+
+    def poll_paths(self, paths: dict[str, bool]) -> dict[str, tuple[list[str], list[str]]]:
+        '''Like `poll`, but only scans the given paths, mapped to whether they are directories'''
+        changes = {path: ([], []) for path in self.files}
+        for path, is_dir in paths.items():
+            input_path = self.input_of(path)
+            if input_path is None:
+                continue
+            files = self.files[input_path]
+            if input_path == self.template_path:
+                path = self.template_path
+            if is_dir:
+                # Added, moved or removed with everything below it
+                prefix = os.path.join(path, "")
+                old_files = {file_path: stat for file_path, stat in files.items() if file_path.startswith(prefix)}
+            else:
+                old_files = {path: files[path]} if path in files else {}
+            try:
+                new_files = scan_files(path)
+            except FileNotFoundError:
+                # Removed right after the check for a file
+                new_files = {}
+            changed, removed = diff_files(old_files, new_files)
+            for file_path in removed:
+                del files[file_path]
+            files.update(new_files)
+            changes[input_path][0].extend(changed)
+            changes[input_path][1].extend(removed)
+        return {path: (sorted(changed), sorted(removed)) for path, (changed, removed) in changes.items()}
+
+    def rebuild_changes(self, paths: dict[str, bool] | None = None) -> int:
+        '''
+        Regenerates the pages and static files changed since the last call and returns the number of updated outputs.
+        Only `paths` are scanned if they are given, see `poll_paths`, otherwise all inputs are.
+        '''
+        changes = self.poll() if paths is None else self.poll_paths(paths)
+        updated = 0
+
+        changed, removed = changes[self.static_dir]
+        for src_path in changed:
+            sync_file(src_path, self.dest_path(src_path, self.static_dir))
+            print(f"Copied static file '{src_path}'")
+        for src_path in removed:
+            dst_path = self.dest_path(src_path, self.static_dir)
+            if os.path.isfile(dst_path):
+                os.remove(dst_path)
+        updated += len(changed) + len(removed)
+
+        changed, removed = changes[self.content_dir]
+        changed = [path for path in changed if path.endswith(".md")]
+        # A changed template affects every page
+        if len(changes[self.template_path][0]) > 0:
+            self.template = Template.load(self.template_path, self.base_path)
+            changed = sorted(path for path in self.files[self.content_dir] if path.endswith(".md"))
+        for src_path in changed:
+            _, error, _, _, _ = try_generate_page((src_path, self.page_dest_path(src_path)), self.template)
+            if error is not None:
+                print(f"Error while generating '{src_path}': {error}")
+        for src_path in removed:
+            dst_path = self.page_dest_path(src_path)
+            if src_path.endswith(".md") and os.path.isfile(dst_path):
+                os.remove(dst_path)
+        updated += len(changed) + len(removed)
+
+        return updated
+
+def serve_dir(path: str, port: int) -> ThreadingHTTPServer:
+    '''Serves a directory from a background thread'''
+    handler = functools.partial(SimpleHTTPRequestHandler, directory=path)
+    server = ThreadingHTTPServer(("", port), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+def start_inotify(site_watcher: SiteWatcher) -> Inotify | None:
+    '''Returns an inotify instance watching the inputs, or None where inotify is not available'''
+    try:
+        inotify = Inotify()
+    except OSError:
+        return None
+    try:
+        for path, recursive in site_watcher.watch_dirs():
+            if os.path.isdir(path):
+                inotify.watch(path, recursive)
+    except OSError:
+        # e.g. more directories than fs.inotify.max_user_watches
+        inotify.close()
+        return None
+    return inotify
+
+def watch(site_watcher: SiteWatcher, port: int, interval: float = 0.05, poll_interval: float = 1.0) -> None:
+    '''
+    Serves the output and rebuilds changed inputs until interrupted. Changes are reported by inotify where it is available
+    and collected for `interval` seconds, as editors often write a file in several steps.
+    Elsewhere the inputs are scanned every `poll_interval` seconds, a scan walks every file.
+    '''
+    server = serve_dir(site_watcher.dest_dir, port)
+    inotify = start_inotify(site_watcher)
+    print(f"Serving '{site_watcher.dest_dir}' at http://0.0.0.0:{port}/, watching for changes{'' if inotify is not None else ' by polling'}...")
+    try:
+        # Changes between the first scan and the start of inotify
+        paths = None
+        while True:
+            start = time.perf_counter()
+            if site_watcher.rebuild_changes(paths) > 0:
+                print(f"Rebuilt in {(time.perf_counter() - start) * 1000:.0f} ms")
+            if inotify is None:
+                time.sleep(poll_interval)
+                continue
+            paths = inotify.read()
+            time.sleep(interval)
+            more_paths = inotify.read(0)
+            # Events were dropped, only a full scan finds all changes
+            paths = None if paths is None or more_paths is None else paths | more_paths
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.shutdown()
+        if inotify is not None:
+            inotify.close()